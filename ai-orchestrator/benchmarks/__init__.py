@@ -0,0 +1,6 @@
+"""
+AI Orchestrator Benchmarks
+
+Standalone scripts, run from the ai-orchestrator directory:
+    python -m benchmarks.<name> --help
+"""
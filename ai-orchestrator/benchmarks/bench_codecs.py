@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Codec benchmark - L3 disk use and set/get time per codec setting.
+
+Writes the same batch of LLM-response-like entries through L3DiskCache
+once per codec and reports bytes on disk, compression ratio and
+per-operation latency.
+
+Usage:
+    python -m benchmarks.bench_codecs
+    python -m benchmarks.bench_codecs --entries 2000 --size 8192
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.cache import CacheEntry, L3DiskCache
+from memory.codecs import ZSTD_AVAILABLE
+
+WORDS = ("agent", "synthesis", "context", "result", "analysis", "the", "of", "model",
+         "response", "task", "memory", "and", "a", "verification", "plan", "step")
+
+
+def make_text(size: int, rng: random.Random) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def run(codec, values, cache_dir: str):
+    cache = L3DiskCache(cache_dir=cache_dir, access_flush_interval_seconds=0, codec=codec)
+    started = time.perf_counter()
+    for i, value in enumerate(values):
+        cache.set(f"key{i}", CacheEntry(key=f"key{i}", value=value))
+    set_ms = (time.perf_counter() - started) * 1000 / len(values)
+
+    started = time.perf_counter()
+    for i in range(len(values)):
+        cache.get(f"key{i}")
+    get_ms = (time.perf_counter() - started) * 1000 / len(values)
+
+    disk = sum(p.stat().st_size for p in Path(cache_dir).glob("*/*.json"))
+    cache.close()
+    return disk, set_ms, get_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare L3 codecs on LLM-like text")
+    parser.add_argument("--entries", type=int, default=500, help="Entries per run")
+    parser.add_argument("--size", type=int, default=4096, help="Approximate value size in bytes")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    values = [make_text(args.size, rng) for _ in range(args.entries)]
+    codecs = ["none", "zlib", "lzma", "auto"] + (["zstd"] if ZSTD_AVAILABLE else [])
+
+    print(f"\n{args.entries} entries of ~{args.size} bytes\n")
+    print(f"{'codec':<8} {'disk KB':>10} {'ratio':>7} {'set ms':>8} {'get ms':>8}")
+    print("-" * 45)
+    baseline = None
+    for codec in codecs:
+        cache_dir = tempfile.mkdtemp()
+        try:
+            disk, set_ms, get_ms = run(codec, values, cache_dir)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        baseline = baseline or disk
+        print(f"{codec:<8} {disk / 1024:>10,.0f} {baseline / disk:>6.1f}x {set_ms:>8.3f} {get_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Eviction policy benchmark - replays a key trace through L1MemoryCache.
+
+Reports hit rate and ops/sec for every registered eviction policy.
+A trace file holds one access per line: ``key`` or ``key,cost``. Without
+one, a synthetic trace is generated: a skewed hot set interleaved with
+one-off scans, the pattern synthesis prompts produce.
+
+Usage:
+    python -m benchmarks.bench_eviction
+    python -m benchmarks.bench_eviction --trace keys.txt --capacity 500
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.cache import CacheEntry, L1MemoryCache
+from memory.eviction import EVICTION_POLICIES
+
+
+def load_trace(path: str) -> List[Tuple[str, float]]:
+    """Load ``key[,cost]`` lines."""
+    trace = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            key, _, cost = line.partition(",")
+            trace.append((key, float(cost) if cost else 1.0))
+    return trace
+
+
+def synthetic_trace(length: int, hot_keys: int, scan_every: int, scan_length: int,
+                    seed: int = 42) -> List[Tuple[str, float]]:
+    """Skewed hot set with periodic scans of never-repeated keys."""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(hot_keys)]
+    # Hot keys are expensive LLM results, scan keys are cheap fragments
+    hot = rng.choices(range(hot_keys), weights=weights, k=length)
+    trace = []
+    scan_id = 0
+    for i, rank in enumerate(hot):
+        trace.append((f"hot:{rank}", 5.0))
+        if scan_every and i % scan_every == scan_every - 1:
+            for _ in range(scan_length):
+                trace.append((f"scan:{scan_id}", 0.1))
+                scan_id += 1
+    return trace
+
+
+def replay(policy: str, trace: List[Tuple[str, float]], capacity: int) -> Tuple[float, float]:
+    """Return (hit_rate, ops_per_sec) for one policy."""
+    cache = L1MemoryCache(max_size=capacity, max_memory_mb=1024, eviction_policy=policy)
+    hits = 0
+    started = time.perf_counter()
+    for key, cost in trace:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, CacheEntry(key=key, value=key, cost=cost))
+    elapsed = time.perf_counter() - started
+    return hits / len(trace), len(trace) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a key trace through each eviction policy")
+    parser.add_argument("--trace", help="Trace file (key[,cost] per line)")
+    parser.add_argument("--capacity", type=int, default=1000, help="Cache capacity in entries")
+    parser.add_argument("--length", type=int, default=200000, help="Synthetic trace length")
+    parser.add_argument("--hot-keys", type=int, default=5000, help="Synthetic hot set size")
+    parser.add_argument("--scan-every", type=int, default=1000, help="Accesses between scans")
+    parser.add_argument("--scan-length", type=int, default=2000, help="Keys per scan")
+    args = parser.parse_args()
+
+    if args.trace:
+        trace = load_trace(args.trace)
+        source = args.trace
+    else:
+        trace = synthetic_trace(args.length, args.hot_keys, args.scan_every, args.scan_length)
+        source = "synthetic"
+
+    print(f"\nTrace: {source} ({len(trace)} accesses, "
+          f"{len(set(k for k, _ in trace))} distinct keys), capacity {args.capacity}\n")
+    print(f"{'policy':<10} {'hit rate':>10} {'ops/sec':>12}")
+    print("-" * 34)
+    for name in EVICTION_POLICIES:
+        hit_rate, ops = replay(name, trace, args.capacity)
+        print(f"{name:<10} {hit_rate:>10.2%} {ops:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
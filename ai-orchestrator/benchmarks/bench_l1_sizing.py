@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+L1 sizing microbenchmark - set() latency and per-entry memory.
+
+Compares the JSON sizer against the fast/deep sizers and a caller-supplied
+size hint, and CacheEntry against CompactCacheEntry, with 100k entries.
+
+Usage:
+    python -m benchmarks.bench_l1_sizing
+    python -m benchmarks.bench_l1_sizing --entries 20000
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.cache import CacheEntry, CompactCacheEntry, L1MemoryCache
+
+
+RESPONSE_TEXT = 'The "synthesis" step merges worker answers.\n' * 100
+
+
+def make_value(i: int, text_only: bool = False):
+    """An LLM-response-style payload: a few KB of text, optionally wrapped."""
+    if text_only:
+        return RESPONSE_TEXT
+    return {
+        "model": "claude-sonnet-4",
+        "content": RESPONSE_TEXT,
+        "tokens": [i, i * 2, i * 3],
+        "score": i / 7
+    }
+
+
+def bench_set(sizer: str, entries: int, hint: bool = False, text_only: bool = False) -> float:
+    """Return mean set() latency in microseconds."""
+    cache = L1MemoryCache(max_size=entries, max_memory_mb=65536, sizer=sizer)
+    items = [
+        CacheEntry(key=f"k{i}", value=make_value(i, text_only), size_bytes=4500 if hint else 0)
+        for i in range(entries)
+    ]
+    started = time.perf_counter()
+    for entry in items:
+        cache.set(entry.key, entry)
+    return (time.perf_counter() - started) / entries * 1e6
+
+
+def bench_memory(entry_class, entries: int) -> float:
+    """Return bytes per entry object (values excluded)."""
+    value = make_value(0)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [entry_class(key=f"k{i}", value=value) for i in range(entries)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    keys_size = sum(sys.getsizeof(e.key) for e in items)
+    return (after - before - keys_size) / entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="L1 sizing and entry layout microbenchmark")
+    parser.add_argument("--entries", type=int, default=100000, help="Number of entries")
+    args = parser.parse_args()
+
+    print(f"\nL1 set() latency ({args.entries:,} entries)\n")
+    print(f"{'sizer':<12} {'dict us/set':>12} {'str us/set':>12}")
+    print("-" * 38)
+    for sizer in ("json", "deep", "fast"):
+        print(f"{sizer:<12} {bench_set(sizer, args.entries):>12.2f} "
+              f"{bench_set(sizer, args.entries, text_only=True):>12.2f}")
+    print(f"{'size hint':<12} {bench_set('json', args.entries, hint=True):>12.2f} "
+          f"{bench_set('json', args.entries, hint=True, text_only=True):>12.2f}")
+
+    print(f"\nPer-entry memory ({args.entries:,} entries, shared value)\n")
+    print(f"{'entry':<20} {'bytes':>8}")
+    print("-" * 29)
+    for entry_class in (CacheEntry, CompactCacheEntry):
+        print(f"{entry_class.__name__:<20} {bench_memory(entry_class, args.entries):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
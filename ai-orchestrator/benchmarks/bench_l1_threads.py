@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+L1 concurrency benchmark - single-lock L1MemoryCache vs ShardedL1Cache.
+
+Every thread runs the same read-mostly mix over a skewed key space
+(hits, misses and sets), and aggregate ops/sec is reported per thread
+count for each implementation.
+
+Usage:
+    python -m benchmarks.bench_l1_threads
+    python -m benchmarks.bench_l1_threads --threads 1,4,16,64 --shards 32
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.cache import CacheEntry, CacheLevel, L1MemoryCache, ShardedL1Cache
+
+
+def make_ops(count: int, keys: int, write_ratio: float, seed: int) -> List[tuple]:
+    """Pre-generate (is_write, key) pairs so the timed loop only hits the cache."""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(keys)]
+    ranks = rng.choices(range(keys), weights=weights, k=count)
+    return [(rng.random() < write_ratio, f"key:{rank}") for rank in ranks]
+
+
+def run(factory: Callable[[], CacheLevel], threads: int, ops_per_thread: int,
+        keys: int, write_ratio: float) -> float:
+    """Return aggregate ops/sec for ``threads`` workers."""
+    cache = factory()
+    for rank in range(keys // 2):
+        key = f"key:{rank}"
+        cache.set(key, CacheEntry(key=key, value=key, size_bytes=64))
+
+    workloads = [make_ops(ops_per_thread, keys, write_ratio, seed) for seed in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(ops):
+        barrier.wait()
+        for is_write, key in ops:
+            if is_write:
+                cache.set(key, CacheEntry(key=key, value=key, size_bytes=64))
+            elif cache.get(key) is None:
+                cache.set(key, CacheEntry(key=key, value=key, size_bytes=64))
+
+    pool = [threading.Thread(target=worker, args=(ops,)) for ops in workloads]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return threads * ops_per_thread / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-lock and sharded L1 under threads")
+    parser.add_argument("--threads", default="1,4,16,64", help="Comma-separated thread counts")
+    parser.add_argument("--shards", type=int, default=16, help="Shards for ShardedL1Cache")
+    parser.add_argument("--ops", type=int, default=400000, help="Total operations per run")
+    parser.add_argument("--keys", type=int, default=20000, help="Distinct keys")
+    parser.add_argument("--capacity", type=int, default=10000, help="L1 capacity in entries")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="Fraction of sets")
+    args = parser.parse_args()
+
+    variants = {
+        "single-lock": lambda: L1MemoryCache(max_size=args.capacity, max_memory_mb=1024),
+        f"sharded x{args.shards}": lambda: ShardedL1Cache(max_size=args.capacity, max_memory_mb=1024,
+                                                          shards=args.shards),
+    }
+
+    print(f"\n{args.ops:,} ops per run, {args.keys} keys, capacity {args.capacity}, "
+          f"{args.write_ratio:.0%} writes\n")
+    print(f"{'threads':>8} " + " ".join(f"{name:>16}" for name in variants) + f" {'speedup':>9}")
+    print("-" * (9 + 17 * len(variants) + 10))
+    for threads in (int(t) for t in args.threads.split(",")):
+        per_thread = max(1, args.ops // threads)
+        results = [run(factory, threads, per_thread, args.keys, args.write_ratio)
+                   for factory in variants.values()]
+        print(f"{threads:>8} " + " ".join(f"{ops:>16,.0f}" for ops in results)
+              + f" {results[-1] / results[0]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
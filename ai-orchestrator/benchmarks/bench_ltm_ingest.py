@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Long-term memory ingest benchmark - store() per memory against store_many().
+
+Times storing the same synthetic facts one transaction at a time and in
+store_many() batches, with and without the serialization thread pool.
+
+Usage:
+    python -m benchmarks.bench_ltm_ingest
+    python -m benchmarks.bench_ltm_ingest --memories 100000 --batch 5000 --workers 4
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.ltm import LongTermMemory, MemoryType
+
+
+def make_items(count: int):
+    return [
+        {
+            "content": {"fact": f"observation {i} about component {i % 97}",
+                        "source": "omega", "step": i},
+            "memory_type": MemoryType.FACT,
+            "tags": [f"component{i % 97}", "omega"],
+            "importance": (i % 10) / 10
+        }
+        for i in range(count)
+    ]
+
+
+def timed(label: str, count: int, fn):
+    started = time.perf_counter()
+    fn()
+    rate = count / (time.perf_counter() - started)
+    print(f"{label:<28} {rate:>12,.0f}")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare store() and store_many() ingest rates")
+    parser.add_argument("--memories", type=int, default=20000, help="Memories per run")
+    parser.add_argument("--batch", type=int, default=5000, help="store_many() batch size")
+    parser.add_argument("--workers", type=int, default=4, help="Thread pool size for the pooled run")
+    parser.add_argument("--single", type=int, default=2000,
+                        help="Memories for the store() run (it is much slower)")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="nemesis_ltm_bench_")
+    try:
+        def fresh(name: str) -> LongTermMemory:
+            return LongTermMemory(os.path.join(tmpdir, f"{name}.db"))
+
+        items = make_items(args.memories)
+        print(f"\n{args.memories:,} memories, batches of {args.batch:,}\n")
+        print(f"{'mode':<28} {'memories/sec':>12}")
+        print("-" * 41)
+
+        memory = fresh("single")
+        single = timed("store()", args.single,
+                       lambda: [memory.store(**item) for item in items[:args.single]])
+        memory.close()
+
+        for label, workers in (("store_many()", 0), (f"store_many(workers={args.workers})",
+                                                     args.workers)):
+            memory = fresh(f"many{workers}")
+            rate = timed(label, len(items), lambda: [
+                memory.store_many(items[i:i + args.batch], workers=workers)
+                for i in range(0, len(items), args.batch)
+            ])
+            memory.close()
+            print(f"{'':<28} {rate / single:>11.1f}x")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
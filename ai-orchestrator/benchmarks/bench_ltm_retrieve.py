@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Long-term memory retrieve benchmark - persistent connections against
+a new connection per call.
+
+Stores memories once, then times random retrieve() calls through
+LongTermMemory as it is and through a subclass that opens and closes a
+connection for every call, the way LongTermMemory used to.
+
+Usage:
+    python -m benchmarks.bench_ltm_retrieve
+    python -m benchmarks.bench_ltm_retrieve --memories 50000 --ops 20000 --threads 4
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.ltm import LongTermMemory, MemoryType
+
+
+class PerCallConnectionMemory(LongTermMemory):
+    """LongTermMemory with the previous connect-per-call behaviour."""
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def run(memory: LongTermMemory, ids, ops: int, threads: int) -> float:
+    """Return retrieve() calls per second across ``threads`` threads."""
+    per_thread = ops // threads
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        for _ in range(per_thread):
+            memory.retrieve(rng.choice(ids))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare retrieve() throughput by connection mode")
+    parser.add_argument("--memories", type=int, default=10000, help="Memories to store")
+    parser.add_argument("--ops", type=int, default=20000, help="retrieve() calls per run")
+    parser.add_argument("--threads", type=int, default=1, help="Concurrent reader threads")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="nemesis_ltm_bench_")
+    db_path = os.path.join(tmpdir, "memory.db")
+    try:
+        memory = LongTermMemory(db_path)
+        ids = [
+            memory.store({"text": f"memory {i}", "payload": "x" * 200}, MemoryType.FACT,
+                         tags=[f"tag{i % 10}"]).id
+            for i in range(args.memories)
+        ]
+
+        print(f"\n{args.memories:,} memories, {args.ops:,} retrieve() calls, "
+              f"{args.threads} thread(s)\n")
+        print(f"{'connections':<14} {'ops/sec':>12}")
+        print("-" * 27)
+        before = run(PerCallConnectionMemory(db_path), ids, args.ops, args.threads)
+        print(f"{'per call':<14} {before:>12,.0f}")
+        after = run(memory, ids, args.ops, args.threads)
+        print(f"{'persistent':<14} {after:>12,.0f}")
+        print(f"\nSpeedup: {after / before:.1f}x")
+        memory.close()
+    finally:
+        for name in os.listdir(tmpdir):
+            os.remove(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Long-term memory search benchmark - FTS5/BM25 against the LIKE scan.
+
+Bulk-loads synthetic memories, then times the same queries through
+LongTermMemory.search with the full-text index and with it disabled
+(``full_text=False``, the previous ``content LIKE '%query%'`` path).
+
+Usage:
+    python -m benchmarks.bench_ltm_search
+    python -m benchmarks.bench_ltm_search --memories 100000 --repeat 5
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.ltm import LongTermMemory, search_text
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_MEMORY = 24
+QUERIES = ["deadline", "budget review", '"budget review"', "migr*", "rollback postgres"]
+
+
+def build_vocabulary(rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = {"".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(VOCABULARY_SIZE)}
+    return sorted(words) + ["deadline", "budget", "review", "migration", "migrate",
+                            "rollback", "postgres"]
+
+
+def populate(db_path: str, count: int, seed: int = 42, batch: int = 50000):
+    """Insert ``count`` memories and their index rows directly, in batches."""
+    LongTermMemory(db_path).get_stats()
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(rng)
+    # Zipf-like weights so a few words are common and most are rare
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    rng.shuffle(weights)
+    cum_weights = list(itertools.accumulate(weights))
+    now = time.time()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=OFF")
+    for start in range(0, count, batch):
+        rows, index_rows = [], []
+        for i in range(start, min(start + batch, count)):
+            words = rng.choices(vocabulary, cum_weights=cum_weights, k=WORDS_PER_MEMORY)
+            content = {"text": " ".join(words)}
+            updated_at = now - rng.random() * 90 * 86400
+            rows.append((
+                f"mem_{uuid.uuid4().hex[:16]}", json.dumps(content), "fact", "internal",
+                updated_at, updated_at, None, "bench", "[]", "{}", 0, rng.random(), None
+            ))
+            index_rows.append((i + 1, search_text(content), ""))
+        conn.executemany("""
+            INSERT INTO memories
+            (id, content, memory_type, access_level, created_at, updated_at,
+             expires_at, owner_agent, tags, metadata, access_count, importance, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.executemany(
+            "INSERT INTO memories_fts (rowid, text, tag_text) VALUES (?, ?, ?)", index_rows
+        )
+        conn.commit()
+        print(f"  loaded {min(start + batch, count):,} memories", end="\r", flush=True)
+    conn.close()
+    print()
+
+
+def time_query(memory: LongTermMemory, query: str, repeat: int, limit: int):
+    timings = []
+    found = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = len(memory.search(query, limit=limit))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FTS5 and LIKE memory search latency")
+    parser.add_argument("--memories", type=int, default=1000000, help="Memories to load")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query (median reported)")
+    parser.add_argument("--limit", type=int, default=20, help="Results per search")
+    parser.add_argument("--db", help="Database path (default: a temporary file)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    db_path = args.db
+    if db_path is None:
+        tmpdir = tempfile.mkdtemp(prefix="nemesis_ltm_bench_")
+        db_path = os.path.join(tmpdir, "memory.db")
+
+    try:
+        print(f"\nLoading {args.memories:,} memories into {db_path}")
+        started = time.perf_counter()
+        populate(db_path, args.memories)
+        print(f"Loaded in {time.perf_counter() - started:.1f}s\n")
+
+        fts = LongTermMemory(db_path)
+        like = LongTermMemory(db_path, full_text=False)
+        print(f"{'query':<22} {'LIKE ms':>10} {'FTS5 ms':>10} {'speedup':>9} {'hits':>6}")
+        print("-" * 61)
+        for query in QUERIES:
+            fts_seconds, found = time_query(fts, query, args.repeat, args.limit)
+            # LIKE matches the raw substring, so phrase/prefix syntax does not apply
+            like_query = query.strip('"').rstrip("*")
+            like_seconds, _ = time_query(like, like_query, args.repeat, args.limit)
+            print(f"{query:<22} {like_seconds * 1000:>10.1f} {fts_seconds * 1000:>10.1f} "
+                  f"{like_seconds / fts_seconds:>8.1f}x {found:>6}")
+    finally:
+        if tmpdir is not None:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
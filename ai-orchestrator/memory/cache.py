@@ -2,31 +2,62 @@
 NEMESIS Context Cache - Multi-level LRU cache with TTL support.
 Implements L1 (in-memory), L2 (Redis-like), L3 (disk) caching.
 """
+import os
+import copy
 import time
 import json
+import atexit
+import asyncio
+import functools
 import hashlib
 import threading
 import logging
-from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List, Callable, Union
+from typing import Optional, Dict, Any, List, Callable, Union, Tuple, Awaitable, Set
 from pathlib import Path
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from .eviction import EvictionPolicy, create_policy
+from .sizing import Sizer, create_sizer
+from .singleflight import SingleFlight, AsyncSingleFlight
+from .codecs import EncodedValue, ValueCodec, create_codec, json_default
+from .expiry import ExpirySweeper
+from .key_index import KeyIndex
+from .hotset import HotSetManifest
+from .metrics import CacheMetrics, InstrumentedLevel
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class CacheEntry:
-    """A single cache entry."""
-    key: str
-    value: Any
-    created_at: float = field(default_factory=time.time)
-    accessed_at: float = field(default_factory=time.time)
-    expires_at: Optional[float] = None
-    size_bytes: int = 0
-    hit_count: int = 0
-    metadata: Dict[str, Any] = field(default_factory=dict)
+class _Missing:
+    """Type of ``MISS``; distinguishes an absent key from a cached None."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISS"
+
+    def __bool__(self) -> bool:
+        return False
+
+
+MISS = _Missing()
+
+# Prewarming stops once L1 or L2 is this full, leaving room for live traffic
+PREWARM_FILL = 0.9
+
+
+def is_negative(value: Any) -> bool:
+    """True for "nothing found" results: None or an empty container/string."""
+    return value is None or (isinstance(value, (str, bytes, list, tuple, dict, set, frozenset))
+                             and not value)
+
+
+class _EntryMethods:
+    """Behaviour shared by CacheEntry and CompactCacheEntry."""
+
+    __slots__ = ()
 
     @property
     def is_expired(self) -> bool:
@@ -35,6 +66,11 @@ class CacheEntry:
             return False
         return time.time() > self.expires_at
 
+    @property
+    def is_stale(self) -> bool:
+        """Past its fresh window but still servable until ``expires_at``."""
+        return self.stale_at is not None and time.time() > self.stale_at
+
     @property
     def age_seconds(self) -> float:
         """Age of the entry in seconds."""
@@ -45,6 +81,93 @@ class CacheEntry:
         self.accessed_at = time.time()
         self.hit_count += 1
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "value": self.value,
+            "created_at": self.created_at,
+            "accessed_at": self.accessed_at,
+            "expires_at": self.expires_at,
+            "size_bytes": self.size_bytes,
+            "hit_count": self.hit_count,
+            "cost": self.cost,
+            "stale_at": self.stale_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        return cls(
+            key=data["key"],
+            value=data["value"],
+            created_at=data["created_at"],
+            accessed_at=data["accessed_at"],
+            expires_at=data.get("expires_at"),
+            size_bytes=data.get("size_bytes", 0),
+            hit_count=data.get("hit_count", 0),
+            cost=data.get("cost", 1.0),
+            stale_at=data.get("stale_at")
+        )
+
+
+@dataclass
+class CacheEntry(_EntryMethods):
+    """A single cache entry."""
+    key: str
+    value: Any
+    created_at: float = field(default_factory=time.time)
+    accessed_at: float = field(default_factory=time.time)
+    expires_at: Optional[float] = None
+    size_bytes: int = 0
+    hit_count: int = 0
+    cost: float = 1.0  # Recompute cost, used by cost-aware eviction
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    stale_at: Optional[float] = None  # End of the fresh window when serving stale
+
+
+class CompactCacheEntry(_EntryMethods):
+    """
+    Slotted cache entry with the same interface as CacheEntry.
+    No per-instance __dict__, and the metadata dict is only allocated
+    when first used.
+    """
+
+    __slots__ = ("key", "value", "created_at", "accessed_at", "expires_at",
+                 "size_bytes", "hit_count", "cost", "_metadata", "stale_at")
+
+    def __init__(
+        self,
+        key: str,
+        value: Any,
+        created_at: Optional[float] = None,
+        accessed_at: Optional[float] = None,
+        expires_at: Optional[float] = None,
+        size_bytes: int = 0,
+        hit_count: int = 0,
+        cost: float = 1.0,
+        metadata: Optional[Dict[str, Any]] = None,
+        stale_at: Optional[float] = None
+    ):
+        now = time.time()
+        self.key = key
+        self.value = value
+        self.created_at = now if created_at is None else created_at
+        self.accessed_at = now if accessed_at is None else accessed_at
+        self.expires_at = expires_at
+        self.size_bytes = size_bytes
+        self.hit_count = hit_count
+        self.cost = cost
+        self._metadata = metadata
+        self.stale_at = stale_at
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    def __repr__(self) -> str:
+        return f"CompactCacheEntry(key={self.key!r}, expires_at={self.expires_at!r})"
+
 
 class CacheLevel:
     """Base class for cache levels."""
@@ -64,89 +187,394 @@ class CacheLevel:
     def stats(self) -> Dict[str, Any]:
         raise NotImplementedError
 
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        """Entries found for ``keys``. Levels override this to lock once per batch."""
+        found = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                found[key] = entry
+        return found
+
+    def set_many(self, entries: Dict[str, CacheEntry]):
+        for key, entry in entries.items():
+            self.set(key, entry)
+
+    def delete_many(self, keys: List[str]) -> int:
+        """Delete ``keys``; return how many existed."""
+        return sum(1 for key in keys if self.delete(key))
+
+    def contains(self, key: str) -> bool:
+        """Whether the level holds ``key``, without counting a hit or miss."""
+        raise NotImplementedError
+
+    def contains_many(self, keys: List[str]) -> Set[str]:
+        """Those of ``keys`` the level holds. Remote levels override this to batch."""
+        return {key for key in keys if self.contains(key)}
+
+    def expire_many(self, keys: List[str], now: float) -> List[str]:
+        """Drop those of ``keys`` that have expired by ``now``; return the dropped keys."""
+        return []
+
+    def iter_expiry(self) -> List[Tuple[str, float]]:
+        """(key, expires_at) for every entry with a TTL."""
+        return []
+
+    def iter_access(self) -> List[Tuple[str, float, int]]:
+        """(key, accessed_at, hit_count) for entries the level tracks access for."""
+        return []
+
+    def persist(self):
+        """Flush any buffered state to disk."""
+        pass
+
+    def close(self):
+        """Stop background work and release resources."""
+        self.persist()
+
+
+class AccessJournal:
+    """
+    Write-behind journal for access metadata (accessed_at, hit_count).
+    Hits only update an in-memory dirty map; a background thread appends
+    dirty entries to the journal file in batches, so reads never rewrite
+    entry data. Forgotten keys are journaled as null tombstones so replay
+    drops them. The journal is rewritten compactly, live keys only, when
+    it grows too large.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        flush_interval_seconds: float = 5.0,
+        flush_threshold: int = 1000,
+        max_journal_bytes: int = 8 * 1024 * 1024
+    ):
+        self.path = Path(path)
+        self.flush_threshold = flush_threshold
+        self.max_journal_bytes = max_journal_bytes
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._meta: Dict[str, Tuple[float, int]] = {}
+        # None marks a tombstone for a forgotten key
+        self._dirty: Dict[str, Optional[Tuple[float, int]]] = {}
+        self._flushes = 0
+
+        self._load()
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval_seconds > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop,
+                args=(flush_interval_seconds,),
+                name="nemesis-access-journal",
+                daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def _load(self):
+        """Replay journal batches; later batches win."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        batch = json.loads(line)
+                    except ValueError:
+                        # Torn final line from an interrupted flush
+                        continue
+                    for key, meta in batch.items():
+                        if meta is None:
+                            self._meta.pop(key, None)
+                        else:
+                            self._meta[key] = (meta[0], meta[1])
+        except Exception as e:
+            logger.error(f"Failed to load access journal: {e}")
+
+    def record(self, key: str, accessed_at: float, hit_count: int):
+        """Record a hit. Never touches the disk."""
+        with self._lock:
+            self._meta[key] = (accessed_at, hit_count)
+            self._dirty[key] = (accessed_at, hit_count)
+            if len(self._dirty) >= self.flush_threshold:
+                self._wake.set()
+
+    def apply(self, entry: "CacheEntry"):
+        """Overlay journaled metadata onto an entry read from disk."""
+        with self._lock:
+            meta = self._meta.get(entry.key)
+        # Metadata older than the entry belongs to a previous value
+        if meta and meta[0] >= entry.created_at:
+            entry.accessed_at, entry.hit_count = meta
+
+    def lookup(self, key: str) -> Optional[Tuple[float, int]]:
+        with self._lock:
+            return self._meta.get(key)
+
+    def snapshot(self) -> Dict[str, Tuple[float, int]]:
+        with self._lock:
+            return dict(self._meta)
+
+    def forget(self, key: str):
+        with self._lock:
+            if self._meta.pop(key, None) is not None:
+                self._dirty[key] = None
+            else:
+                self._dirty.pop(key, None)
+
+    def _flush_loop(self, interval: float):
+        while not self._stop.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Append all dirty metadata as a single batch."""
+        with self._lock:
+            if not self._dirty:
+                return
+            batch, self._dirty = self._dirty, {}
+
+        with self._io_lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(batch) + "\n")
+                self._flushes += 1
+                if self.path.stat().st_size > self.max_journal_bytes:
+                    self._rewrite()
+            except Exception as e:
+                logger.error(f"Failed to flush access journal: {e}")
+                with self._lock:
+                    for key, meta in batch.items():
+                        self._dirty.setdefault(key, meta)
+
+    def _rewrite(self):
+        """Replace the journal with one batch holding the current metadata, without tombstones."""
+        with self._lock:
+            snapshot = dict(self._meta)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps(snapshot) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        with self._lock, self._io_lock:
+            self._meta.clear()
+            self._dirty.clear()
+            if self.path.exists():
+                self.path.unlink()
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tracked": len(self._meta),
+                "dirty": len(self._dirty),
+                "flushes": self._flushes
+            }
+
+
+class CapacityJanitor:
+    """
+    Keeps a disk level below its high watermark in the background.
+    Once usage passes ``high`` (a fraction of the level's byte budget) it
+    evicts in policy order down to ``low``, so writes rarely have to evict
+    inline. The level provides ``max_size_bytes``, ``used_bytes()`` and
+    ``evict_to(target_bytes)``.
+    """
+
+    def __init__(self, level: CacheLevel, low: float = 0.8, high: float = 0.95,
+                 interval_seconds: float = 30.0):
+        if not 0 < low < high <= 1:
+            raise ValueError(f"Watermarks must satisfy 0 < low < high <= 1, got {low}/{high}")
+        self.level = level
+        self.low = low
+        self.high = high
+        self._runs = 0
+        self._evicted = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if interval_seconds > 0:
+            self._thread = threading.Thread(target=self._run, args=(interval_seconds,),
+                                            name="nemesis-l3-janitor", daemon=True)
+            self._thread.start()
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"L3 janitor failed: {e}")
+
+    def run_once(self) -> int:
+        """Evict down to the low watermark if above the high one."""
+        budget = self.level.max_size_bytes
+        evicted = 0
+        if self.level.used_bytes() > budget * self.high:
+            evicted = self.level.evict_to(int(budget * self.low))
+        self._runs += 1
+        self._evicted += evicted
+        return evicted
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"low": self.low, "high": self.high, "runs": self._runs, "evicted": self._evicted}
+
 
 class L1MemoryCache(CacheLevel):
     """
-    L1 Cache - In-memory LRU cache.
+    L1 Cache - In-memory cache, LRU by default.
     Fastest, limited size, volatile.
     """
 
-    def __init__(self, max_size: int = 1000, max_memory_mb: float = 100):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        max_memory_mb: float = 100,
+        eviction_policy: Union[str, EvictionPolicy] = "lru",
+        sizer: Union[str, Sizer] = "fast"
+    ):
         self.max_size = max_size
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
-        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._cache: Dict[str, CacheEntry] = {}
+        self._policy = create_policy(eviction_policy, max_size)
+        self._sizer = create_sizer(sizer)
         self._lock = threading.RLock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expired = 0
         self._current_memory = 0
 
     def get(self, key: str) -> Optional[CacheEntry]:
         with self._lock:
-            if key not in self._cache:
-                self._misses += 1
-                return None
-
-            entry = self._cache[key]
-
-            # Check expiration
-            if entry.is_expired:
-                del self._cache[key]
-                self._current_memory -= entry.size_bytes
-                self._misses += 1
-                return None
+            return self._get_locked(key)
 
-            # Move to end (most recently used)
-            self._cache.move_to_end(key)
-            entry.touch()
-            self._hits += 1
-            return entry
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._get_locked(key)
+                if entry is not None:
+                    found[key] = entry
+        return found
+
+    def _get_locked(self, key: str) -> Optional[CacheEntry]:
+        if key not in self._cache:
+            self._misses += 1
+            return None
+
+        entry = self._cache[key]
+
+        # Check expiration
+        if entry.is_expired:
+            self._remove(key)
+            self._expired += 1
+            self._misses += 1
+            return None
+
+        self._policy.record_access(key)
+        entry.touch()
+        self._hits += 1
+        return entry
 
     def set(self, key: str, entry: CacheEntry):
         with self._lock:
-            # Remove old entry if exists
-            if key in self._cache:
-                old_entry = self._cache[key]
-                self._current_memory -= old_entry.size_bytes
-                del self._cache[key]
-
-            # Estimate size
-            entry.size_bytes = len(json.dumps(entry.value, default=str).encode())
-
-            # Evict if necessary
-            self._evict_if_needed(entry.size_bytes)
-
-            # Add new entry
-            self._cache[key] = entry
-            self._current_memory += entry.size_bytes
-
-    def _evict_if_needed(self, needed_bytes: int):
-        """Evict entries if cache is full."""
-        # Evict by count
-        while len(self._cache) >= self.max_size:
-            oldest_key = next(iter(self._cache))
-            oldest_entry = self._cache[oldest_key]
-            self._current_memory -= oldest_entry.size_bytes
-            del self._cache[oldest_key]
-
-        # Evict by memory
-        while self._current_memory + needed_bytes > self.max_memory_bytes and self._cache:
-            oldest_key = next(iter(self._cache))
-            oldest_entry = self._cache[oldest_key]
-            self._current_memory -= oldest_entry.size_bytes
-            del self._cache[oldest_key]
+            self._set_locked(key, entry)
+            self._evict_if_needed()
+
+    def set_many(self, entries: Dict[str, CacheEntry]):
+        with self._lock:
+            for key, entry in entries.items():
+                self._set_locked(key, entry)
+            self._evict_if_needed()
+
+    def _set_locked(self, key: str, entry: CacheEntry):
+        # Remove old entry if exists
+        old_entry = self._cache.pop(key, None)
+        if old_entry is not None:
+            self._current_memory -= old_entry.size_bytes
+
+        # Estimate size unless the caller (or an earlier level) already did
+        if entry.size_bytes <= 0:
+            entry.size_bytes = self._sizer(entry.value)
+
+        # Add new entry
+        self._cache[key] = entry
+        self._current_memory += entry.size_bytes
+        if old_entry is not None:
+            self._policy.record_access(key)
+        else:
+            self._policy.record_insert(key, entry.size_bytes, entry.cost)
+
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._current_memory -= entry.size_bytes
+            self._policy.record_remove(key)
+        return entry
+
+    def _evict_if_needed(self):
+        """Evict policy victims while over the entry or memory budget."""
+        while self._cache and (len(self._cache) > self.max_size
+                               or self._current_memory > self.max_memory_bytes):
+            victim = self._policy.victim()
+            if victim is None:
+                break
+            self._remove(victim)
+            self._evictions += 1
 
     def delete(self, key: str) -> bool:
         with self._lock:
-            if key in self._cache:
-                entry = self._cache[key]
-                self._current_memory -= entry.size_bytes
-                del self._cache[key]
-                return True
-            return False
+            return self._remove(key) is not None
+
+    def delete_many(self, keys: List[str]) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._remove(key) is not None)
+
+    def contains(self, key: str) -> bool:
+        return key in self._cache
+
+    def expire_many(self, keys: List[str], now: float) -> List[str]:
+        removed = []
+        with self._lock:
+            for key in keys:
+                entry = self._cache.get(key)
+                if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+                    self._remove(key)
+                    removed.append(key)
+            self._expired += len(removed)
+        return removed
+
+    def iter_expiry(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(k, e.expires_at) for k, e in self._cache.items() if e.expires_at is not None]
+
+    def iter_access(self) -> List[Tuple[str, float, int]]:
+        with self._lock:
+            return [(k, e.accessed_at, e.hit_count) for k, e in self._cache.items()]
 
     def clear(self):
         with self._lock:
             self._cache.clear()
+            self._policy.clear()
             self._current_memory = 0
 
     def stats(self) -> Dict[str, Any]:
@@ -159,123 +587,533 @@ class L1MemoryCache(CacheLevel):
                 "max_entries": self.max_size,
                 "memory_used_mb": self._current_memory / (1024 * 1024),
                 "max_memory_mb": self.max_memory_bytes / (1024 * 1024),
+                "eviction": self._policy.stats(),
+                "evictions": self._evictions,
+                "expired": self._expired,
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate": self._hits / total if total > 0 else 0
             }
 
 
+class ShardedL1Cache(CacheLevel):
+    """
+    L1 Cache split into independent L1MemoryCache shards.
+    Keys hash onto a shard, and each shard has its own lock, eviction
+    policy and slice of the entry and memory budgets, so concurrent
+    threads only contend when they touch the same shard.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        max_memory_mb: float = 100,
+        eviction_policy: str = "lru",
+        sizer: Union[str, Sizer] = "fast",
+        shards: int = 16
+    ):
+        if shards < 1:
+            raise ValueError(f"shards must be >= 1, got {shards}")
+        if isinstance(eviction_policy, EvictionPolicy):
+            raise ValueError("ShardedL1Cache needs a policy name; each shard builds its own")
+        self.max_size = max_size
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self._shards = [
+            L1MemoryCache(max_size=max(1, -(-max_size // shards)),
+                          max_memory_mb=max_memory_mb / shards,
+                          eviction_policy=eviction_policy, sizer=sizer)
+            for _ in range(shards)
+        ]
+
+        self._count = shards
+
+    def _shard(self, key: str) -> L1MemoryCache:
+        return self._shards[hash(key) % self._count]
+
+    # get/set index the shard inline; they are the hot path
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self._shards[hash(key) % self._count].get(key)
+
+    def set(self, key: str, entry: CacheEntry):
+        self._shards[hash(key) % self._count].set(key, entry)
+
+    def delete(self, key: str) -> bool:
+        return self._shard(key).delete(key)
+
+    def _group(self, keys) -> Dict[int, List[str]]:
+        by_shard: Dict[int, List[str]] = {}
+        for key in keys:
+            by_shard.setdefault(hash(key) % self._count, []).append(key)
+        return by_shard
+
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        found = {}
+        for index, shard_keys in self._group(keys).items():
+            found.update(self._shards[index].get_many(shard_keys))
+        return found
+
+    def set_many(self, entries: Dict[str, CacheEntry]):
+        for index, shard_keys in self._group(entries).items():
+            self._shards[index].set_many({key: entries[key] for key in shard_keys})
+
+    def delete_many(self, keys: List[str]) -> int:
+        return sum(self._shards[index].delete_many(shard_keys)
+                   for index, shard_keys in self._group(keys).items())
+
+    def contains(self, key: str) -> bool:
+        return self._shard(key).contains(key)
+
+    def expire_many(self, keys: List[str], now: float) -> List[str]:
+        removed = []
+        for index, shard_keys in self._group(keys).items():
+            removed.extend(self._shards[index].expire_many(shard_keys, now))
+        return removed
+
+    def iter_expiry(self) -> List[Tuple[str, float]]:
+        return [item for shard in self._shards for item in shard.iter_expiry()]
+
+    def iter_access(self) -> List[Tuple[str, float, int]]:
+        return [item for shard in self._shards for item in shard.iter_access()]
+
+    def clear(self):
+        for shard in self._shards:
+            shard.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        shard_stats = [shard.stats() for shard in self._shards]
+        hits = sum(s["hits"] for s in shard_stats)
+        misses = sum(s["misses"] for s in shard_stats)
+        total = hits + misses
+        return {
+            "level": "L1",
+            "type": "memory-sharded",
+            "shards": len(self._shards),
+            "entries": sum(s["entries"] for s in shard_stats),
+            "max_entries": self.max_size,
+            "shard_entries": [s["entries"] for s in shard_stats],
+            "memory_used_mb": sum(s["memory_used_mb"] for s in shard_stats),
+            "max_memory_mb": self.max_memory_bytes / (1024 * 1024),
+            "eviction": {
+                "policy": shard_stats[0]["eviction"]["policy"],
+                "tracked": sum(s["eviction"]["tracked"] for s in shard_stats)
+            },
+            "evictions": sum(s["evictions"] for s in shard_stats),
+            "expired": sum(s["expired"] for s in shard_stats),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total > 0 else 0
+        }
+
+
 class L2RedisLikeCache(CacheLevel):
     """
     L2 Cache - Redis-like in-memory store with persistence.
     Medium speed, larger capacity, semi-persistent.
+
+    Persistence is AOF-style: every set and delete is appended to
+    ``<persistence_file>.journal``, and a background snapshot periodically
+    rewrites the live entries to ``persistence_file`` (one JSON record per
+    line) so the journal stays short. Recovery streams the snapshot and
+    replays the journal on top of it.
     """
 
-    def __init__(self, max_size: int = 10000, persistence_file: Optional[str] = None):
+    FSYNC_POLICIES = ("always", "everysec", "no")
+    SNAPSHOT_FORMAT = "nemesis-l2-snapshot"
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        persistence_file: Optional[str] = None,
+        eviction_policy: Union[str, EvictionPolicy] = "lru",
+        fsync: str = "everysec",
+        snapshot_interval_seconds: float = 300.0,
+        snapshot_journal_bytes: int = 64 * 1024 * 1024,
+        codec: Union[None, str, ValueCodec] = None
+    ):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
         self.max_size = max_size
         self.persistence_file = persistence_file
+        self.fsync = fsync
+        self.snapshot_interval_seconds = snapshot_interval_seconds
+        self.snapshot_journal_bytes = snapshot_journal_bytes
         self._cache: Dict[str, CacheEntry] = {}
+        self._policy = create_policy(eviction_policy, max_size)
         self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        # Values are held compressed; a codec is always present to read old journals
+        self._compress = codec not in (None, "none")
+        self._codec = create_codec(
+            codec, dictionary_path=f"{persistence_file}.zstd.dict" if persistence_file else None
+        )
+
+        self._journal = None
+        self._journal_bytes = 0
+        self._journal_dirty = False
+        self._snapshots = 0
+        self._last_snapshot = time.time()
+        self._stop = threading.Event()
+        self._persister: Optional[threading.Thread] = None
 
         # Load from persistence if available
         if persistence_file:
+            self._snapshot_path = Path(persistence_file)
+            self._journal_path = Path(f"{persistence_file}.journal")
+            self._rewrite_path = Path(f"{persistence_file}.journal.rewrite")
             self._load_from_disk()
+            self._open_journal()
+            self._persister = threading.Thread(
+                target=self._persist_loop,
+                name="nemesis-l2-persistence",
+                daemon=True
+            )
+            self._persister.start()
+            atexit.register(self._sync_journal)
+
+    # -- recovery ---------------------------------------------------------
 
     def _load_from_disk(self):
-        """Load cache from disk."""
-        if not self.persistence_file:
-            return
+        """Stream the snapshot, then replay any journals written after it."""
+        try:
+            loaded = self._load_snapshot(self._snapshot_path)
+            replayed = 0
+            # A rewrite journal exists only if a snapshot was interrupted
+            for journal in (self._rewrite_path, self._journal_path):
+                replayed += self._replay_journal(journal)
+            self._evict_to_capacity()
+            logger.info(f"Loaded {len(self._cache)} entries from L2 cache "
+                        f"({loaded} from snapshot, {replayed} journal records)")
+        except Exception as e:
+            logger.error(f"Failed to load L2 cache: {e}")
 
-        path = Path(self.persistence_file)
+    def _load_snapshot(self, path: Path) -> int:
         if not path.exists():
-            return
+            return 0
 
+        loaded = 0
+        with open(path, 'r') as f:
+            first = f.readline()
+            try:
+                header = json.loads(first) if first.strip() else None
+            except ValueError:
+                header = None
+
+            if not (isinstance(header, dict) and header.get("format") == self.SNAPSHOT_FORMAT):
+                # Legacy snapshot: one JSON document mapping key -> entry
+                if header is None:
+                    f.seek(0)
+                    header = json.load(f) if first.strip() else {}
+                entries = [CacheEntry.from_dict(data) for data in header.values()]
+                # Replay oldest access first so recency-based policies line up
+                for entry in sorted(entries, key=lambda e: e.accessed_at):
+                    loaded += self._restore(entry)
+                return loaded
+
+            # Records are written oldest access first
+            for line in f:
+                try:
+                    loaded += self._restore(CacheEntry.from_dict(json.loads(line)))
+                except ValueError:
+                    logger.warning(f"Skipping corrupt L2 snapshot record in {path}")
+        return loaded
+
+    def _replay_journal(self, path: Path) -> int:
+        if not path.exists():
+            return 0
+
+        replayed = 0
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-append
+                    continue
+                op = record.get("op")
+                if op == "set":
+                    self._restore(CacheEntry.from_dict(record["entry"]))
+                elif op == "del":
+                    if self._cache.pop(record["key"], None) is not None:
+                        self._policy.record_remove(record["key"])
+                elif op == "clear":
+                    self._cache.clear()
+                    self._policy.clear()
+                replayed += 1
+        return replayed
+
+    def _restore(self, entry: CacheEntry) -> int:
+        if entry.is_expired:
+            return 0
+        entry.value = EncodedValue.from_json(entry.value)
+        if entry.key in self._cache:
+            self._policy.record_access(entry.key)
+        else:
+            self._policy.record_insert(entry.key, entry.size_bytes, entry.cost)
+        self._cache[entry.key] = entry
+        return 1
+
+    def _evict_to_capacity(self):
+        while len(self._cache) > self.max_size:
+            victim = self._policy.victim()
+            if victim is None:
+                break
+            self._cache.pop(victim, None)
+            self._evictions += 1
+
+    # -- journal ----------------------------------------------------------
+
+    def _open_journal(self):
+        self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._journal = open(self._journal_path, 'a')
+        self._journal_bytes = self._journal.tell()
+
+    def _append(self, *records: Dict[str, Any]):
+        """Append records to the journal in one write. Caller holds the lock."""
+        if self._journal is None or not records:
+            return
         try:
-            with open(path, 'r') as f:
-                data = json.load(f)
-                for key, entry_data in data.items():
-                    entry = CacheEntry(
-                        key=entry_data["key"],
-                        value=entry_data["value"],
-                        created_at=entry_data["created_at"],
-                        accessed_at=entry_data["accessed_at"],
-                        expires_at=entry_data.get("expires_at"),
-                        hit_count=entry_data.get("hit_count", 0)
-                    )
-                    if not entry.is_expired:
-                        self._cache[key] = entry
-            logger.info(f"Loaded {len(self._cache)} entries from L2 cache")
+            data = "".join(json.dumps(record, default=json_default) + "\n" for record in records)
+            self._journal.write(data)
+            self._journal.flush()
+            self._journal_bytes += len(data)
+            if self.fsync == "always":
+                os.fsync(self._journal.fileno())
+            else:
+                self._journal_dirty = True
         except Exception as e:
-            logger.error(f"Failed to load L2 cache: {e}")
+            logger.error(f"Failed to append to L2 journal: {e}")
+
+    def _sync_journal(self):
+        with self._lock:
+            if self._journal is None or not self._journal_dirty:
+                return
+            try:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._journal_dirty = False
+            except Exception as e:
+                logger.error(f"Failed to fsync L2 journal: {e}")
+
+    def _persist_loop(self):
+        while not self._stop.wait(1.0):
+            if self.fsync == "everysec":
+                self._sync_journal()
+            due = (self.snapshot_interval_seconds > 0 and
+                   time.time() - self._last_snapshot >= self.snapshot_interval_seconds)
+            if self._journal_bytes and (due or self._journal_bytes >= self.snapshot_journal_bytes):
+                self._save_to_disk()
+
+    # -- snapshots --------------------------------------------------------
 
     def _save_to_disk(self):
-        """Save cache to disk."""
+        """
+        Write a compact snapshot and truncate the journal.
+        The lock is held only to swap journals and copy entry records;
+        encoding and writing happen while sets keep appending to the new
+        journal.
+        """
         if not self.persistence_file:
             return
 
+        with self._snapshot_lock:
+            try:
+                with self._lock:
+                    if self._journal is not None:
+                        self._journal.close()
+                        self._journal = None
+                    self._detach_journal()
+                    records = [entry.to_dict() for entry in
+                               sorted(self._cache.values(), key=lambda e: e.accessed_at)
+                               if not entry.is_expired]
+                    if not self._stop.is_set():
+                        self._open_journal()
+                    self._journal_dirty = False
+
+                tmp_path = self._snapshot_path.with_name(self._snapshot_path.name + ".tmp")
+                with open(tmp_path, 'w') as f:
+                    f.write(json.dumps({"format": self.SNAPSHOT_FORMAT, "version": 1,
+                                        "entries": len(records)}) + "\n")
+                    for record in records:
+                        f.write(json.dumps(record, default=json_default) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._snapshot_path)
+                # The snapshot now covers everything the old journal held
+                if self._rewrite_path.exists():
+                    self._rewrite_path.unlink()
+                self._snapshots += 1
+                self._last_snapshot = time.time()
+            except Exception as e:
+                logger.error(f"Failed to save L2 cache: {e}")
+            finally:
+                with self._lock:
+                    if self._journal is None and not self._stop.is_set():
+                        self._open_journal()
+
+    def _detach_journal(self):
+        """Move the live journal aside until the snapshot replacing it lands."""
+        if not self._journal_path.exists():
+            return
+        if self._rewrite_path.exists():
+            # A previous snapshot failed; keep both generations in order
+            with open(self._rewrite_path, 'a') as dst, open(self._journal_path, 'r') as src:
+                for line in src:
+                    dst.write(line)
+            self._journal_path.unlink()
+        else:
+            os.replace(self._journal_path, self._rewrite_path)
+
+    # -- CacheLevel -------------------------------------------------------
+
+    def _pack(self, entry: CacheEntry) -> CacheEntry:
+        """Return the entry to store: a compressed copy, or the entry itself."""
+        if not self._compress:
+            return entry
+        blob = self._codec.encode(json.dumps(entry.value, default=str).encode())
+        if not self._codec.is_encoded(blob):
+            return entry
+        # Never mutate the caller's entry; L1 may hold the same object
+        stored = copy.copy(entry)
+        stored.value = EncodedValue(blob)
+        return stored
+
+    def _unpack(self, entry: CacheEntry) -> CacheEntry:
+        if not isinstance(entry.value, EncodedValue):
+            return entry
+        unpacked = copy.copy(entry)
+        unpacked.value = json.loads(self._codec.decode(entry.value.blob))
+        return unpacked
+
+    def _get_locked(self, key: str) -> Optional[CacheEntry]:
+        if key not in self._cache:
+            self._misses += 1
+            return None
+
+        entry = self._cache[key]
+
+        if entry.is_expired:
+            del self._cache[key]
+            self._policy.record_remove(key)
+            self._expired += 1
+            self._misses += 1
+            return None
+
+        self._policy.record_access(key)
+        entry.touch()
+        self._hits += 1
+        return entry
+
+    def _unpack_or_none(self, entry: CacheEntry) -> Optional[CacheEntry]:
         try:
-            data = {}
-            for key, entry in self._cache.items():
-                if not entry.is_expired:
-                    data[key] = {
-                        "key": entry.key,
-                        "value": entry.value,
-                        "created_at": entry.created_at,
-                        "accessed_at": entry.accessed_at,
-                        "expires_at": entry.expires_at,
-                        "hit_count": entry.hit_count
-                    }
-
-            with open(self.persistence_file, 'w') as f:
-                json.dump(data, f)
+            return self._unpack(entry)
         except Exception as e:
-            logger.error(f"Failed to save L2 cache: {e}")
+            logger.error(f"Failed to decode L2 cache entry: {e}")
+            return None
 
     def get(self, key: str) -> Optional[CacheEntry]:
         with self._lock:
-            if key not in self._cache:
-                self._misses += 1
-                return None
-
-            entry = self._cache[key]
+            entry = self._get_locked(key)
+        # Decompress outside the lock
+        return self._unpack_or_none(entry) if entry is not None else None
 
-            if entry.is_expired:
-                del self._cache[key]
-                self._misses += 1
-                return None
-
-            entry.touch()
-            self._hits += 1
-            return entry
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        with self._lock:
+            stored = [(key, self._get_locked(key)) for key in keys]
+        found = {}
+        for key, entry in stored:
+            if entry is not None:
+                entry = self._unpack_or_none(entry)
+                if entry is not None:
+                    found[key] = entry
+        return found
+
+    def _set_locked(self, key: str, stored: CacheEntry):
+        if key in self._cache:
+            self._policy.record_access(key)
+        else:
+            self._policy.record_insert(key, stored.size_bytes, stored.cost)
+        self._cache[key] = stored
 
     def set(self, key: str, entry: CacheEntry):
+        stored = self._pack(entry)
         with self._lock:
-            # Simple eviction: remove oldest if full
-            if len(self._cache) >= self.max_size and key not in self._cache:
-                # Find least recently accessed
-                oldest_key = min(self._cache.keys(),
-                               key=lambda k: self._cache[k].accessed_at)
-                del self._cache[oldest_key]
+            self._set_locked(key, stored)
+            self._append({"op": "set", "entry": stored.to_dict()})
+
+            # Evictions are not journaled; replay re-applies the same policy
+            self._evict_to_capacity()
 
-            self._cache[key] = entry
+    def set_many(self, entries: Dict[str, CacheEntry]):
+        packed = {key: self._pack(entry) for key, entry in entries.items()}
+        with self._lock:
+            for key, stored in packed.items():
+                self._set_locked(key, stored)
+            self._append(*({"op": "set", "entry": stored.to_dict()} for stored in packed.values()))
+            self._evict_to_capacity()
 
     def delete(self, key: str) -> bool:
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: List[str]) -> int:
         with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+            deleted = []
+            for key in keys:
+                if self._cache.pop(key, None) is not None:
+                    self._policy.record_remove(key)
+                    deleted.append(key)
+            self._append(*({"op": "del", "key": key} for key in deleted))
+            return len(deleted)
+
+    def contains(self, key: str) -> bool:
+        return key in self._cache
+
+    def expire_many(self, keys: List[str], now: float) -> List[str]:
+        # Not journaled: replay and snapshots already skip expired entries
+        removed = []
+        with self._lock:
+            for key in keys:
+                entry = self._cache.get(key)
+                if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+                    del self._cache[key]
+                    self._policy.record_remove(key)
+                    removed.append(key)
+            self._expired += len(removed)
+        return removed
+
+    def iter_expiry(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(k, e.expires_at) for k, e in self._cache.items() if e.expires_at is not None]
+
+    def iter_access(self) -> List[Tuple[str, float, int]]:
+        with self._lock:
+            return [(k, e.accessed_at, e.hit_count) for k, e in self._cache.items()]
 
     def clear(self):
         with self._lock:
             self._cache.clear()
+            self._policy.clear()
+            self._append({"op": "clear"})
 
     def persist(self):
-        """Force persistence to disk."""
+        """Force a snapshot to disk."""
         self._save_to_disk()
 
+    def close(self):
+        self._stop.set()
+        if self._persister is not None:
+            self._persister.join(timeout=5)
+            atexit.unregister(self._sync_journal)
+        with self._lock:
+            if self._journal is not None:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._journal.close()
+                self._journal = None
+
     def stats(self) -> Dict[str, Any]:
         with self._lock:
             total = self._hits + self._misses
@@ -284,10 +1122,17 @@ class L2RedisLikeCache(CacheLevel):
                 "type": "redis-like",
                 "entries": len(self._cache),
                 "max_entries": self.max_size,
+                "eviction": self._policy.stats(),
+                "evictions": self._evictions,
+                "expired": self._expired,
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate": self._hits / total if total > 0 else 0,
-                "persistence": self.persistence_file is not None
+                "persistence": self.persistence_file is not None,
+                "fsync": self.fsync,
+                "journal_bytes": self._journal_bytes,
+                "snapshots": self._snapshots,
+                "codec": self._codec.stats()
             }
 
 
@@ -295,19 +1140,47 @@ class L3DiskCache(CacheLevel):
     """
     L3 Cache - Disk-based cache.
     Slowest, largest capacity, persistent.
+    Writes evict in policy order once ``max_size_mb`` of entry files is
+    exceeded; with watermarks set, a janitor thread evicts ahead of that.
     """
 
-    def __init__(self, cache_dir: str = ".cache/l3", max_size_mb: float = 1000):
+    def __init__(
+        self,
+        cache_dir: str = ".cache/l3",
+        max_size_mb: float = 1000,
+        access_flush_interval_seconds: float = 5.0,
+        codec: Union[None, str, ValueCodec] = None,
+        eviction_policy: Union[str, EvictionPolicy] = "lru",
+        low_watermark: Optional[float] = None,
+        high_watermark: Optional[float] = None,
+        janitor_interval_seconds: float = 30.0
+    ):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._codec = create_codec(codec, dictionary_path=self.cache_dir / "zstd.dict")
         self._lock = threading.RLock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        self._total_bytes = 0
         self._index: Dict[str, Dict[str, Any]] = {}
+        self._access = AccessJournal(
+            self.cache_dir / "access.journal",
+            flush_interval_seconds=access_flush_interval_seconds
+        )
 
         # Load index
         self._load_index()
+        self._policy = create_policy(eviction_policy, max(1000, 2 * len(self._index)))
+        self._restore_policy()
+
+        self._janitor: Optional[CapacityJanitor] = None
+        if high_watermark is not None:
+            self._janitor = CapacityJanitor(self, low=low_watermark or high_watermark * 0.8,
+                                            high=high_watermark,
+                                            interval_seconds=janitor_interval_seconds)
 
     def _key_to_path(self, key: str) -> Path:
         """Convert key to file path."""
@@ -323,6 +1196,22 @@ class L3DiskCache(CacheLevel):
                     self._index = json.load(f)
             except:
                 self._index = {}
+        self._total_bytes = sum(self._entry_bytes(meta) for meta in self._index.values())
+
+    @staticmethod
+    def _entry_bytes(meta: Dict[str, Any]) -> int:
+        # Indexes written before disk_bytes was recorded only have the L1 estimate
+        return meta.get("disk_bytes", meta.get("size_bytes", 0))
+
+    def _restore_policy(self):
+        """Feed existing keys to the policy, least recently used first."""
+        def last_used(item):
+            key, meta = item
+            access = self._access.lookup(key)
+            return max(meta.get("created_at", 0), access[0] if access else 0)
+
+        for key, meta in sorted(self._index.items(), key=last_used):
+            self._policy.record_insert(key, self._entry_bytes(meta))
 
     def _save_index(self):
         """Save cache index to disk."""
@@ -330,119 +1219,240 @@ class L3DiskCache(CacheLevel):
         with open(index_path, 'w') as f:
             json.dump(self._index, f)
 
-    def get(self, key: str) -> Optional[CacheEntry]:
-        with self._lock:
-            if key not in self._index:
-                self._misses += 1
-                return None
+    def _get_locked(self, key: str, expired: List[str]) -> Optional[CacheEntry]:
+        """Read one entry. Expired keys are appended to ``expired`` for the caller to drop."""
+        if key not in self._index:
+            self._misses += 1
+            return None
+
+        path = self._key_to_path(key)
+        if not path.exists():
+            self._drop_locked(key)
+            self._misses += 1
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                data = json.loads(self._codec.decode(f.read()))
 
-            path = self._key_to_path(key)
-            if not path.exists():
-                del self._index[key]
+            entry = CacheEntry.from_dict(data)
+
+            if entry.is_expired:
+                expired.append(key)
+                self._expired += 1
                 self._misses += 1
                 return None
 
-            try:
-                with open(path, 'r') as f:
-                    data = json.load(f)
-
-                entry = CacheEntry(
-                    key=data["key"],
-                    value=data["value"],
-                    created_at=data["created_at"],
-                    accessed_at=data["accessed_at"],
-                    expires_at=data.get("expires_at"),
-                    size_bytes=data.get("size_bytes", 0),
-                    hit_count=data.get("hit_count", 0)
-                )
-
-                if entry.is_expired:
-                    self.delete(key)
-                    self._misses += 1
-                    return None
+            self._access.apply(entry)
+            entry.touch()
+            self._hits += 1
+            self._policy.record_access(key)
 
-                entry.touch()
-                self._hits += 1
+            # Access metadata is written behind, not into the entry file
+            self._access.record(key, entry.accessed_at, entry.hit_count)
 
-                # Update on disk
-                data["accessed_at"] = entry.accessed_at
-                data["hit_count"] = entry.hit_count
-                with open(path, 'w') as f:
-                    json.dump(data, f)
+            return entry
 
-                return entry
+        except Exception as e:
+            logger.error(f"Failed to read L3 cache entry: {e}")
+            self._misses += 1
+            return None
 
-            except Exception as e:
-                logger.error(f"Failed to read L3 cache entry: {e}")
-                self._misses += 1
-                return None
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            expired: List[str] = []
+            entry = self._get_locked(key, expired)
+            if expired:
+                self.delete_many(expired)
+            return entry
 
-    def set(self, key: str, entry: CacheEntry):
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        found = {}
         with self._lock:
-            path = self._key_to_path(key)
-            path.parent.mkdir(parents=True, exist_ok=True)
+            expired: List[str] = []
+            for key in keys:
+                entry = self._get_locked(key, expired)
+                if entry is not None:
+                    found[key] = entry
+            if expired:
+                self.delete_many(expired)
+        return found
+
+    def _write_locked(self, key: str, entry: CacheEntry) -> bool:
+        """Write the entry file and update the in-memory index (not index.json)."""
+        path = self._key_to_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
 
-            data = {
-                "key": entry.key,
-                "value": entry.value,
+        try:
+            data = self._codec.encode(json.dumps(entry.to_dict(), default=str).encode())
+            with open(path, 'wb') as f:
+                f.write(data)
+
+            previous = self._index.get(key)
+            if previous is not None:
+                self._total_bytes -= self._entry_bytes(previous)
+                self._policy.record_access(key)
+            else:
+                self._policy.record_insert(key, len(data), entry.cost)
+            self._index[key] = {
+                "path": str(path),
                 "created_at": entry.created_at,
-                "accessed_at": entry.accessed_at,
                 "expires_at": entry.expires_at,
                 "size_bytes": entry.size_bytes,
-                "hit_count": entry.hit_count
+                "disk_bytes": len(data)
             }
+            self._total_bytes += len(data)
+            return True
 
-            try:
-                with open(path, 'w') as f:
-                    json.dump(data, f)
-
-                self._index[key] = {
-                    "path": str(path),
-                    "created_at": entry.created_at,
-                    "size_bytes": entry.size_bytes
-                }
-                self._save_index()
+        except Exception as e:
+            logger.error(f"Failed to write L3 cache entry: {e}")
+            return False
 
-            except Exception as e:
-                logger.error(f"Failed to write L3 cache entry: {e}")
+    def set(self, key: str, entry: CacheEntry):
+        self.set_many({key: entry})
 
-    def delete(self, key: str) -> bool:
+    def set_many(self, entries: Dict[str, CacheEntry]):
+        """Write all entry files, evict down to the budget, then save the index once."""
         with self._lock:
-            if key not in self._index:
-                return False
+            written = [self._write_locked(key, entry) for key, entry in entries.items()]
+            self._evict_locked(self.max_size_bytes)
+            if any(written):
+                try:
+                    self._save_index()
+                except Exception as e:
+                    logger.error(f"Failed to save L3 cache index: {e}")
+
+    def _remove_locked(self, key: str) -> bool:
+        if key not in self._index:
+            return False
 
-            path = self._key_to_path(key)
-            try:
-                if path.exists():
-                    path.unlink()
-                del self._index[key]
+        path = self._key_to_path(key)
+        try:
+            if path.exists():
+                path.unlink()
+            self._drop_locked(key)
+            self._access.forget(key)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete L3 cache entry: {e}")
+            return False
+
+    def _drop_locked(self, key: str):
+        """Forget an index entry and its size."""
+        meta = self._index.pop(key, None)
+        if meta is not None:
+            self._total_bytes -= self._entry_bytes(meta)
+            self._policy.record_remove(key)
+
+    def _evict_locked(self, target_bytes: float) -> int:
+        evicted = 0
+        while self._total_bytes > target_bytes and self._index:
+            victim = self._policy.victim()
+            if victim is None:
+                break
+            if self._remove_locked(victim):
+                evicted += 1
+        self._evictions += evicted
+        return evicted
+
+    def used_bytes(self) -> int:
+        return self._total_bytes
+
+    def evict_to(self, target_bytes: float) -> int:
+        """Evict in policy order until entry files fit in ``target_bytes``."""
+        with self._lock:
+            evicted = self._evict_locked(target_bytes)
+            if evicted:
+                try:
+                    self._save_index()
+                except Exception as e:
+                    logger.error(f"Failed to save L3 cache index: {e}")
+            return evicted
+
+    def delete(self, key: str) -> bool:
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: List[str]) -> int:
+        """Delete entry files, then save the index once."""
+        with self._lock:
+            deleted = sum(1 for key in keys if self._remove_locked(key))
+            if deleted:
+                try:
+                    self._save_index()
+                except Exception as e:
+                    logger.error(f"Failed to save L3 cache index: {e}")
+            return deleted
+
+    def contains(self, key: str) -> bool:
+        return key in self._index
+
+    def expire_many(self, keys: List[str], now: float) -> List[str]:
+        removed = []
+        with self._lock:
+            for key in keys:
+                meta = self._index.get(key)
+                # Index entries written before expires_at was recorded expire on read
+                expires_at = meta.get("expires_at") if meta else None
+                if expires_at is None or expires_at > now:
+                    continue
+                if self._remove_locked(key):
+                    removed.append(key)
+            if removed:
+                self._expired += len(removed)
                 self._save_index()
-                return True
-            except Exception as e:
-                logger.error(f"Failed to delete L3 cache entry: {e}")
-                return False
+        return removed
+
+    def iter_expiry(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(k, m["expires_at"]) for k, m in self._index.items()
+                    if m.get("expires_at") is not None]
+
+    def iter_access(self) -> List[Tuple[str, float, int]]:
+        with self._lock:
+            return [(k, accessed_at, hit_count)
+                    for k, (accessed_at, hit_count) in self._access.snapshot().items()
+                    if k in self._index]
 
     def clear(self):
         with self._lock:
             import shutil
+            self._access.clear()
             shutil.rmtree(self.cache_dir)
             self.cache_dir.mkdir(parents=True, exist_ok=True)
             self._index.clear()
+            self._policy.clear()
+            self._total_bytes = 0
+
+    def persist(self):
+        """Flush pending access metadata."""
+        self._access.flush()
+
+    def close(self):
+        if self._janitor is not None:
+            self._janitor.close()
+        self._access.close()
 
     def stats(self) -> Dict[str, Any]:
         with self._lock:
             total = self._hits + self._misses
-            total_size = sum(e.get("size_bytes", 0) for e in self._index.values())
-            return {
+            stats = {
                 "level": "L3",
                 "type": "disk",
                 "entries": len(self._index),
-                "size_mb": total_size / (1024 * 1024),
+                "size_mb": self._total_bytes / (1024 * 1024),
                 "max_size_mb": self.max_size_bytes / (1024 * 1024),
+                "eviction": self._policy.stats(),
+                "evictions": self._evictions,
+                "expired": self._expired,
                 "hits": self._hits,
                 "misses": self._misses,
-                "hit_rate": self._hits / total if total > 0 else 0
+                "hit_rate": self._hits / total if total > 0 else 0,
+                "access_journal": self._access.stats(),
+                "codec": self._codec.stats()
             }
+            if self._janitor is not None:
+                stats["janitor"] = self._janitor.stats()
+            return stats
 
 
 class ContextCache:
@@ -459,32 +1469,138 @@ class ContextCache:
         l2_persistence: Optional[str] = None,
         l3_dir: str = ".cache/l3",
         l3_size_mb: float = 1000,
-        default_ttl_seconds: float = 3600
+        default_ttl_seconds: float = 3600,
+        l3_backend: str = "files",
+        l1_policy: Union[str, EvictionPolicy] = "lru",
+        l2_policy: Union[str, EvictionPolicy] = "lru",
+        l1_sizer: Union[str, Sizer] = "fast",
+        compact_entries: bool = False,
+        io_workers: int = 4,
+        refresh_workers: int = 2,
+        refresh_queue_size: int = 64,
+        l2_fsync: str = "everysec",
+        l2_snapshot_interval_seconds: float = 300.0,
+        l1_shards: int = 1,
+        l2_codec: Union[None, str, ValueCodec] = None,
+        l3_codec: Union[None, str, ValueCodec] = None,
+        expiry_tick_seconds: Optional[float] = None,
+        l3_low_watermark: Optional[float] = None,
+        l3_high_watermark: Optional[float] = None,
+        l2_socket: Optional[str] = None,
+        hotset_size: int = 0,
+        hotset_path: Optional[str] = None,
+        metrics: bool = False
     ):
-        self.l1 = L1MemoryCache(max_size=l1_size, max_memory_mb=l1_memory_mb)
-        self.l2 = L2RedisLikeCache(max_size=l2_size, persistence_file=l2_persistence)
-        self.l3 = L3DiskCache(cache_dir=l3_dir, max_size_mb=l3_size_mb)
+        if l1_shards > 1:
+            self.l1 = ShardedL1Cache(max_size=l1_size, max_memory_mb=l1_memory_mb,
+                                     eviction_policy=l1_policy, sizer=l1_sizer,
+                                     shards=l1_shards)
+        else:
+            self.l1 = L1MemoryCache(max_size=l1_size, max_memory_mb=l1_memory_mb,
+                                    eviction_policy=l1_policy, sizer=l1_sizer)
+        self.l2 = L2RedisLikeCache(max_size=l2_size, persistence_file=l2_persistence,
+                                   eviction_policy=l2_policy, fsync=l2_fsync,
+                                   snapshot_interval_seconds=l2_snapshot_interval_seconds,
+                                   codec=l2_codec)
+        # A shared daemon, when configured, serves L2 with the local one as fallback
+        l2_socket = l2_socket or os.environ.get("NEMESIS_CACHE_SOCKET")
+        if l2_socket:
+            from .cache_daemon import RemoteL2Cache
+            self.l2 = RemoteL2Cache(l2_socket, fallback=self.l2)
+        self.l3 = self._create_l3(l3_backend, l3_dir, l3_size_mb, l3_codec,
+                                  l3_low_watermark, l3_high_watermark)
+
+        # Levels are only wrapped when enabled, so disabled metrics cost nothing
+        self._metrics: Optional[CacheMetrics] = None
+        if metrics:
+            self._metrics = CacheMetrics()
+            self.l1 = InstrumentedLevel("l1", self.l1, self._metrics)
+            self.l2 = InstrumentedLevel("l2", self.l2, self._metrics)
+            self.l3 = InstrumentedLevel("l3", self.l3, self._metrics)
         self.default_ttl = default_ttl_seconds
+        self._entry_class = CompactCacheEntry if compact_entries else CacheEntry
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+        self._refresh_lock = threading.Lock()
+        self._refreshing: set = set()
+        self._refresh_tasks: set = set()
+        self._refresh_stats = {"stale_refreshes": 0, "refresh_ahead": 0, "refreshes": 0, "errors": 0,
+                               "dropped": 0}
+        # Bounded pool for L2/L3 work issued from the async API
+        self._io_executor = ThreadPoolExecutor(max_workers=io_workers,
+                                               thread_name_prefix="nemesis-cache-io")
+        # Refreshes get their own pool so slow recomputes cannot starve
+        # L2/L3 reads; past refresh_queue_size pending, stale values are
+        # served without queueing another refresh
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers,
+                                                    thread_name_prefix="nemesis-cache-refresh")
+        self._refresh_queue_size = refresh_queue_size
         self._lock = threading.RLock()
+        self._keys = KeyIndex()
+        self._prune_at = 1024
+
+        # Without a sweeper, expired entries are only dropped when read
+        self._sweeper: Optional[ExpirySweeper] = None
+        if expiry_tick_seconds:
+            self._sweeper = ExpirySweeper({"l1": self.l1, "l2": self.l2, "l3": self.l3},
+                                          tick_seconds=expiry_tick_seconds)
+            self._sweeper.seed()
+            self._sweeper.start()
+
+        # The hottest keys of the last run are loaded back in the background
+        self._hotset: Optional[HotSetManifest] = None
+        self._prewarm_stats = {"manifest_keys": 0, "warmed": 0, "warm_ms": 0.0, "recorded": 0}
+        self._prewarm_future = None
+        if hotset_size > 0:
+            self._hotset = HotSetManifest(hotset_path or Path(l3_dir) / "hotset.json", hotset_size)
+            self._prewarm_future = self._io_executor.submit(self.prewarm)
+
+    @staticmethod
+    def _create_l3(backend: str, cache_dir: str, max_size_mb: float,
+                   codec: Union[None, str, ValueCodec] = None,
+                   low_watermark: Optional[float] = None,
+                   high_watermark: Optional[float] = None) -> CacheLevel:
+        """Create the L3 implementation: one file per key, or log-structured segments."""
+        options = {"cache_dir": cache_dir, "max_size_mb": max_size_mb, "codec": codec,
+                   "low_watermark": low_watermark, "high_watermark": high_watermark}
+        if backend == "files":
+            return L3DiskCache(**options)
+        if backend == "segments":
+            from .segment_store import L3SegmentCache
+            return L3SegmentCache(**options)
+        raise ValueError(f"Unknown L3 backend: {backend}")
 
     def _generate_key(self, *args, **kwargs) -> str:
         """Generate cache key from arguments."""
         content = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str)
         return hashlib.sha256(content.encode()).hexdigest()
 
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache, checking all levels."""
+    def get(self, key: str, default: Any = None) -> Optional[Any]:
+        """
+        Get value from cache, checking all levels. Returns ``default`` on a
+        miss; pass ``MISS`` to tell a miss apart from a cached None.
+        """
         # Try L1
         entry = self.l1.get(key)
         if entry:
             return entry.value
 
+        entry = self._get_lower(key)
+        return entry.value if entry else default
+
+    def _get_entry(self, key: str) -> Optional[CacheEntry]:
+        return self.l1.get(key) or self._get_lower(key)
+
+    def _get_lower(self, key: str) -> Optional[CacheEntry]:
+        """Look up L2 then L3, promoting hits to the faster levels."""
         # Try L2
         entry = self.l2.get(key)
         if entry:
             # Promote to L1
             self.l1.set(key, entry)
-            return entry.value
+            if self._metrics is not None:
+                self._metrics.promoted("l2->l1")
+            return entry
 
         # Try L3
         entry = self.l3.get(key)
@@ -492,45 +1608,279 @@ class ContextCache:
             # Promote to L1 and L2
             self.l1.set(key, entry)
             self.l2.set(key, entry)
-            return entry.value
+            if self._metrics is not None:
+                self._metrics.promoted("l3->l1")
+                self._metrics.promoted("l3->l2")
+            return entry
 
         return None
 
-    def set(
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values; each level is visited once for the whole batch."""
+        found = {key: entry.value for key, entry in self.l1.get_many(keys).items()}
+        missing = [key for key in keys if key not in found]
+        if missing:
+            for key, entry in self._get_lower_many(missing).items():
+                found[key] = entry.value
+        return found
+
+    def _get_lower_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        """Batched ``_get_lower``: one L2 and one L3 batch, promotions batched too."""
+        found = self.l2.get_many(keys)
+        if found:
+            self.l1.set_many(found)
+            if self._metrics is not None:
+                self._metrics.promoted("l2->l1", len(found))
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            from_l3 = self.l3.get_many(missing)
+            if from_l3:
+                self.l1.set_many(from_l3)
+                self.l2.set_many(from_l3)
+                found.update(from_l3)
+                if self._metrics is not None:
+                    self._metrics.promoted("l3->l1", len(from_l3))
+                    self._metrics.promoted("l3->l2", len(from_l3))
+        return found
+
+    def _make_entry(
         self,
         key: str,
         value: Any,
-        ttl_seconds: Optional[float] = None,
-        levels: List[str] = None
-    ):
-        """Set value in cache."""
+        ttl_seconds: Optional[float],
+        cost: float,
+        size_hint: Optional[int],
+        stale_ttl_seconds: Optional[float] = None
+    ) -> CacheEntry:
         ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl
         expires_at = time.time() + ttl if ttl > 0 else None
+        stale_at = None
+        if expires_at is not None and stale_ttl_seconds:
+            # Levels keep the entry through the stale window; stale_at marks freshness
+            stale_at, expires_at = expires_at, expires_at + stale_ttl_seconds
 
-        entry = CacheEntry(
+        return self._entry_class(
             key=key,
             value=value,
-            expires_at=expires_at
+            expires_at=expires_at,
+            size_bytes=size_hint or 0,
+            cost=cost,
+            stale_at=stale_at
         )
 
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+        levels: List[str] = None,
+        cost: float = 1.0,
+        size_hint: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        stale_ttl_seconds: Optional[float] = None
+    ):
+        """
+        Set value in cache. ``cost`` is the recompute cost (e.g. seconds);
+        ``size_hint`` is a known serialized size that saves L1 from sizing it.
+        ``tags`` make the key removable with ``invalidate_tag``. With
+        ``stale_ttl_seconds`` the value stays readable that long after
+        ``ttl_seconds``, marked stale.
+        """
+        entry = self._make_entry(key, value, ttl_seconds, cost, size_hint, stale_ttl_seconds)
         levels = levels or ["l1", "l2", "l3"]
+        if self._sweeper is not None:
+            self._sweeper.schedule(key, entry.expires_at)
+        self._index_keys([key], tags)
 
         if "l1" in levels:
             self.l1.set(key, entry)
+        self._set_lower(key, entry, levels)
+
+    def _set_lower(self, key: str, entry: CacheEntry, levels: List[str]):
         if "l2" in levels:
             self.l2.set(key, entry)
         if "l3" in levels:
             self.l3.set(key, entry)
 
+    def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl_seconds: Optional[float] = None,
+        levels: List[str] = None,
+        cost: float = 1.0,
+        tags: Optional[List[str]] = None
+    ):
+        """Set several values with one batch per level (and one L3 index write)."""
+        entries = {key: self._make_entry(key, value, ttl_seconds, cost, None)
+                   for key, value in items.items()}
+        levels = levels or ["l1", "l2", "l3"]
+        if self._sweeper is not None:
+            for key, entry in entries.items():
+                self._sweeper.schedule(key, entry.expires_at)
+        self._index_keys(list(entries), tags)
+
+        if "l1" in levels:
+            self.l1.set_many(entries)
+        self._set_lower_many(entries, levels)
+
+    def _set_lower_many(self, entries: Dict[str, CacheEntry], levels: List[str]):
+        if "l2" in levels:
+            self.l2.set_many(entries)
+        if "l3" in levels:
+            self.l3.set_many(entries)
+
     def delete(self, key: str):
         """Delete from all cache levels."""
+        self._keys.remove(key)
         self.l1.delete(key)
+        self._delete_lower(key)
+
+    def _delete_lower(self, key: str):
         self.l2.delete(key)
         self.l3.delete(key)
 
+    def delete_many(self, keys: List[str], levels: Optional[List[str]] = None):
+        """Delete several keys from all cache levels, or only from ``levels``."""
+        levels = levels or ["l1", "l2", "l3"]
+        self._keys.remove_many(keys)
+        if "l1" in levels:
+            self.l1.delete_many(keys)
+        self._delete_lower_many(keys, levels)
+
+    def _index_keys(self, keys: List[str], tags: Optional[List[str]]):
+        for key in keys:
+            self._keys.add(key, tags)
+        # Evicted keys leave stale index entries; prune them as the index doubles
+        if len(self._keys) > self._prune_at:
+            self.prune_index()
+            self._prune_at = max(1024, 2 * len(self._keys))
+
+    def prune_index(self) -> int:
+        """Drop index entries for keys no level holds any more."""
+        stale = self._keys.keys_with_prefix("")
+        # One batched check per level, each only for keys the levels above lack
+        for level in (self.l1, self.l2, self.l3):
+            if not stale:
+                break
+            held = level.contains_many(stale)
+            stale = [key for key in stale if key not in held]
+        self._keys.remove_many(stale)
+        return len(stale)
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Delete every key set with ``tag``; returns how many keys were indexed."""
+        keys = self._keys.keys_with_tag(tag)
+        if keys:
+            self.delete_many(keys)
+            if self._metrics is not None:
+                self._metrics.invalidated(len(keys))
+        return len(keys)
+
+    def invalidate_prefix(self, prefix: str, levels: Optional[List[str]] = None) -> int:
+        """
+        Delete every key starting with ``prefix``; returns how many keys were
+        indexed. ``levels`` limits the deletes to the levels those keys were
+        written to, sparing the others (e.g. a remote L2) a round trip.
+        """
+        keys = self._keys.keys_with_prefix(prefix)
+        if keys:
+            self.delete_many(keys, levels)
+            if self._metrics is not None:
+                self._metrics.invalidated(len(keys))
+        return len(keys)
+
+    def _delete_lower_many(self, keys: List[str], levels: List[str]):
+        if "l2" in levels:
+            self.l2.delete_many(keys)
+        if "l3" in levels:
+            self.l3.delete_many(keys)
+
+    # ------------------------------------------------------------------
+    # asyncio API: L1 runs inline, L2/L3 run on the bounded I/O executor
+    # ------------------------------------------------------------------
+
+    async def _run_io(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, functools.partial(fn, *args))
+
+    async def aget(self, key: str, default: Any = None) -> Optional[Any]:
+        """Async get; only L2/L3 lookups leave the event loop."""
+        entry = self.l1.get(key)
+        if entry:
+            return entry.value
+
+        entry = await self._run_io(self._get_lower, key)
+        return entry.value if entry else default
+
+    async def _aget_entry(self, key: str) -> Optional[CacheEntry]:
+        return self.l1.get(key) or await self._run_io(self._get_lower, key)
+
+    async def aget_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Async multi-get; all L1 misses are resolved in one executor job."""
+        found = {key: entry.value for key, entry in self.l1.get_many(keys).items()}
+        missing = [key for key in keys if key not in found]
+        if missing:
+            for key, entry in (await self._run_io(self._get_lower_many, missing)).items():
+                found[key] = entry.value
+        return found
+
+    async def aset(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+        levels: List[str] = None,
+        cost: float = 1.0,
+        size_hint: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        stale_ttl_seconds: Optional[float] = None
+    ):
+        """Async set; L1 is written inline, L2/L3 off the event loop."""
+        entry = self._make_entry(key, value, ttl_seconds, cost, size_hint, stale_ttl_seconds)
+        levels = levels or ["l1", "l2", "l3"]
+        if self._sweeper is not None:
+            self._sweeper.schedule(key, entry.expires_at)
+        self._index_keys([key], tags)
+
+        if "l1" in levels:
+            self.l1.set(key, entry)
+        if "l2" in levels or "l3" in levels:
+            await self._run_io(self._set_lower, key, entry, levels)
+
+    async def aset_many(
+        self,
+        items: Dict[str, Any],
+        ttl_seconds: Optional[float] = None,
+        levels: List[str] = None,
+        cost: float = 1.0,
+        tags: Optional[List[str]] = None
+    ):
+        """Async set_many; L1 is written inline, L2/L3 in one executor job."""
+        entries = {key: self._make_entry(key, value, ttl_seconds, cost, None)
+                   for key, value in items.items()}
+        levels = levels or ["l1", "l2", "l3"]
+        if self._sweeper is not None:
+            for key, entry in entries.items():
+                self._sweeper.schedule(key, entry.expires_at)
+        self._index_keys(list(entries), tags)
+
+        if "l1" in levels:
+            self.l1.set_many(entries)
+        if "l2" in levels or "l3" in levels:
+            await self._run_io(self._set_lower_many, entries, levels)
+
+    async def adelete(self, key: str):
+        """Async delete from all cache levels."""
+        self._keys.remove(key)
+        self.l1.delete(key)
+        await self._run_io(self._delete_lower, key)
+
     def clear(self, levels: Optional[List[str]] = None):
         """Clear cache levels."""
         levels = levels or ["l1", "l2", "l3"]
+        if {"l1", "l2", "l3"} <= set(levels):
+            self._keys.clear()
         if "l1" in levels:
             self.l1.clear()
         if "l2" in levels:
@@ -539,58 +1889,283 @@ class ContextCache:
             self.l3.clear()
 
     def stats(self) -> Dict[str, Any]:
-        """Get stats for all cache levels."""
-        return {
+        """Get stats for all cache levels, plus the expiry sweeper when enabled."""
+        stats = {
             "l1": self.l1.stats(),
             "l2": self.l2.stats(),
             "l3": self.l3.stats()
         }
+        with self._refresh_lock:
+            stats["refresh"] = dict(self._refresh_stats, in_flight=len(self._refreshing))
+        if self._sweeper is not None:
+            stats["expiry"] = self._sweeper.stats()
+        if self._hotset is not None:
+            stats["hotset"] = dict(self._prewarm_stats)
+        if self._metrics is not None:
+            metrics = self._metrics.stats()
+            metrics["evictions"] = {
+                level: {"capacity": stats[level].get("evictions", 0),
+                        "expired": stats[level].get("expired", 0)}
+                for level in ("l1", "l2", "l3")
+            }
+            stats["metrics"] = metrics
+        return stats
+
+    def cached(
+        self,
+        ttl_seconds: Optional[float] = None,
+        key_prefix: str = "",
+        single_flight: bool = True,
+        wait_timeout: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        negative_ttl_seconds: Optional[float] = None,
+        stale_ttl_seconds: Optional[float] = None,
+        refresh_ahead_seconds: Optional[float] = None
+    ):
+        """
+        Decorator for caching function results. Works on plain and async
+        functions. With ``single_flight``, concurrent misses on one key wait
+        for a single computation (up to ``wait_timeout`` seconds, then
+        TimeoutError) and share its result or exception. Results are
+        indexed under ``tags`` for ``invalidate_tag``.
+
+        None and empty results are cached like any other. With
+        ``negative_ttl_seconds`` they get that TTL instead and stay out of
+        L3; 0 stops them being cached at all.
+
+        ``stale_ttl_seconds`` serves a value for that long past its TTL
+        while one background refresh per key recomputes it.
+        ``refresh_ahead_seconds`` starts that refresh on a hit within that
+        many seconds of the value going stale, so hot keys never do.
+        """
+        def store_args(result: Any):
+            if negative_ttl_seconds is not None and is_negative(result):
+                if negative_ttl_seconds <= 0:
+                    return None
+                return negative_ttl_seconds, ["l1", "l2"], None
+            return ttl_seconds, None, stale_ttl_seconds
+
+        def refresh_reason(entry: CacheEntry) -> Optional[str]:
+            """The refresh counter a hit on ``entry`` should start a refresh under, if any."""
+            if entry.is_stale:
+                return "stale_refreshes"
+            deadline = entry.stale_at or entry.expires_at
+            if refresh_ahead_seconds and deadline is not None \
+                    and deadline - time.time() < refresh_ahead_seconds:
+                return "refresh_ahead"
+            return None
 
-    def cached(self, ttl_seconds: Optional[float] = None, key_prefix: str = ""):
-        """Decorator for caching function results."""
         def decorator(func: Callable):
+            def run(key: str, args, kwargs):
+                # Execute function, timing it as the recompute cost
+                started = time.perf_counter()
+                result = func(*args, **kwargs)
+                cost = time.perf_counter() - started
+
+                # Cache result
+                store = store_args(result)
+                if store is not None:
+                    self.set(key, result, store[0], store[1], cost=cost, tags=tags,
+                             stale_ttl_seconds=store[2])
+                return result
+
+            def compute(key: str, args, kwargs):
+                # Another flight may have filled the key since our miss
+                result = self.get(key, MISS)
+                if result is not MISS:
+                    return result
+                return run(key, args, kwargs)
+
+            async def arun(key: str, args, kwargs):
+                started = time.perf_counter()
+                result = await func(*args, **kwargs)
+                cost = time.perf_counter() - started
+
+                store = store_args(result)
+                if store is not None:
+                    await self.aset(key, result, store[0], store[1], cost=cost, tags=tags,
+                                    stale_ttl_seconds=store[2])
+                return result
+
+            async def acompute(key: str, args, kwargs):
+                result = await self.aget(key, MISS)
+                if result is not MISS:
+                    return result
+                return await arun(key, args, kwargs)
+
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    key = key_prefix + self._generate_key(func.__name__, args, kwargs)
+
+                    entry = await self._aget_entry(key)
+                    if entry is not None:
+                        reason = refresh_reason(entry)
+                        if reason:
+                            self._schedule_arefresh(key, lambda: arun(key, args, kwargs), reason)
+                        return entry.value
+
+                    if not single_flight:
+                        return await acompute(key, args, kwargs)
+                    return await self._async_flight.do(
+                        key, lambda: acompute(key, args, kwargs), wait_timeout)
+                return async_wrapper
+
+            @functools.wraps(func)
             def wrapper(*args, **kwargs):
                 # Generate cache key
                 key = key_prefix + self._generate_key(func.__name__, args, kwargs)
 
                 # Try cache
-                result = self.get(key)
-                if result is not None:
-                    return result
+                entry = self._get_entry(key)
+                if entry is not None:
+                    reason = refresh_reason(entry)
+                    if reason:
+                        self._schedule_refresh(key, lambda: run(key, args, kwargs), reason)
+                    return entry.value
+
+                if not single_flight:
+                    return compute(key, args, kwargs)
+                return self._flight.do(key, lambda: compute(key, args, kwargs), wait_timeout)
+            return wrapper
+        return decorator
 
-                # Execute function
-                result = func(*args, **kwargs)
+    def _claim_refresh(self, key: str, reason: Optional[str] = None) -> bool:
+        """
+        Reserve ``key`` for one background refresh; False if one is running
+        or the queue is full. Only a claimed refresh is counted, under
+        ``reason`` as well as ``refreshes``.
+        """
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            if len(self._refreshing) >= self._refresh_queue_size:
+                self._refresh_stats["dropped"] += 1
+                return False
+            self._refreshing.add(key)
+            self._refresh_stats["refreshes"] += 1
+            if reason:
+                self._refresh_stats[reason] += 1
+            return True
+
+    def _finish_refresh(self, key: str, error: Optional[BaseException]):
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+            if error is not None:
+                self._refresh_stats["errors"] += 1
+        if error is not None:
+            logger.warning(f"Background refresh of {key} failed: {error}")
+
+    def _schedule_refresh(self, key: str, fn: Callable[[], Any], reason: Optional[str] = None):
+        if not self._claim_refresh(key, reason):
+            return
 
-                # Cache result
-                self.set(key, result, ttl_seconds)
+        def refresh():
+            error = None
+            try:
+                fn()
+            except Exception as e:
+                error = e
+            self._finish_refresh(key, error)
 
-                return result
-            return wrapper
-        return decorator
+        try:
+            self._refresh_executor.submit(refresh)
+        except RuntimeError:
+            # Executor already shut down
+            self._finish_refresh(key, None)
+
+    def _schedule_arefresh(self, key: str, fn: Callable[[], Awaitable[Any]],
+                           reason: Optional[str] = None):
+        if not self._claim_refresh(key, reason):
+            return
+
+        async def refresh():
+            error = None
+            try:
+                await fn()
+            except Exception as e:
+                error = e
+            self._finish_refresh(key, error)
+
+        # Hold a reference so the task is not collected mid-refresh
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
 
     @contextmanager
     def request_cache(self, request_id: str):
         """Context manager for request-scoped caching."""
         prefix = f"req:{request_id}:"
+        levels = ["l1"]
         try:
-            yield lambda key, value, ttl=60: self.set(prefix + key, value, ttl, ["l1"])
+            yield lambda key, value, ttl=60: self.set(prefix + key, value, ttl, levels)
         finally:
-            # Clean up request-specific cache entries from L1
-            # (In production, would track keys and delete them)
-            pass
-
-    def warm_up(self, keys: List[str]):
-        """Pre-warm cache by promoting entries from lower levels."""
-        for key in keys:
-            entry = self.l3.get(key)
-            if entry:
-                self.l2.set(key, entry)
-                self.l1.set(key, entry)
-            else:
-                entry = self.l2.get(key)
-                if entry:
-                    self.l1.set(key, entry)
+            # Drop every request-scoped entry so it cannot crowd out long-lived ones
+            self.invalidate_prefix(prefix, levels)
+
+    def warm_up(self, keys: List[str], batch_size: int = 32) -> int:
+        """
+        Pre-warm cache by promoting entries from lower levels.
+        Keys are fetched in batches on the I/O pool; returns how many were found.
+        """
+        batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+        futures = [self._io_executor.submit(self._get_lower_many, batch) for batch in batches]
+        return sum(len(future.result()) for future in futures)
+
+    def _prewarm_headroom(self) -> bool:
+        for level in (self.l1, self.l2):
+            stats = level.stats()
+            if stats.get("max_entries") and stats["entries"] >= stats["max_entries"] * PREWARM_FILL:
+                return False
+            if stats.get("max_memory_mb") and \
+                    stats["memory_used_mb"] >= stats["max_memory_mb"] * PREWARM_FILL:
+                return False
+        return True
+
+    def prewarm(self, batch_size: int = 32) -> int:
+        """
+        Promote the hot-set manifest's keys, hottest first, until L1 or L2
+        reaches its prewarm fill. Returns how many keys were found.
+        """
+        if self._hotset is None:
+            return 0
+        started = time.perf_counter()
+        keys = [key for key in self._hotset.load() if not self.l1.contains(key)]
+        warmed = 0
+        for i in range(0, len(keys), batch_size):
+            if not self._prewarm_headroom():
+                break
+            warmed += len(self._get_lower_many(keys[i:i + batch_size]))
+        self._prewarm_stats.update({
+            "manifest_keys": len(keys),
+            "warmed": warmed,
+            "warm_ms": (time.perf_counter() - started) * 1000
+        })
+        logger.info(f"Prewarmed {warmed}/{len(keys)} hot keys in {self._prewarm_stats['warm_ms']:.0f}ms")
+        return warmed
+
+    def record_hotset(self) -> int:
+        """Write the current hot set to the manifest; called on close."""
+        if self._hotset is None:
+            return 0
+        access = self.l1.iter_access() + self.l2.iter_access() + self.l3.iter_access()
+        recorded = self._hotset.write(access)
+        self._prewarm_stats["recorded"] = recorded
+        return recorded
 
     def persist(self):
-        """Force persistence of L2 cache."""
+        """Force persistence of L2 cache and pending L3 access metadata."""
         self.l2.persist()
+        self.l3.persist()
+
+    def close(self):
+        """Flush and stop background work on all levels."""
+        if self._sweeper is not None:
+            self._sweeper.close()
+        # Queued refreshes are dropped; their entries are still served stale or recomputed
+        self._refresh_executor.shutdown(wait=True, cancel_futures=True)
+        self._io_executor.shutdown(wait=True)
+        self.record_hotset()
+        self.l1.close()
+        self.l2.close()
+        self.l3.close()
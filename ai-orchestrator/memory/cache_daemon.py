@@ -0,0 +1,535 @@
+"""
+NEMESIS Cache Daemon - A shared L2 cache served over a local Unix socket.
+One daemon per host holds the L2 entries; every process that points
+``ContextCache(l2_socket=...)`` at it sees the same cache, so results
+survive across the short-lived ``nemesis.py`` jobs.
+
+Usage:
+    python -m memory.cache_daemon --socket ~/.local/share/nemesis/cache.sock
+"""
+import os
+import json
+import time
+import queue
+import socket
+import struct
+import argparse
+import threading
+import logging
+import socketserver
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set, Tuple
+
+from .cache import CacheEntry, CacheLevel, L2RedisLikeCache
+from .codecs import json_default
+from .expiry import ExpirySweeper
+from .metrics import CacheMetrics, InstrumentedLevel
+
+logger = logging.getLogger(__name__)
+
+UNIX_SOCKETS_AVAILABLE = hasattr(socket, "AF_UNIX")
+
+# Requests and responses are framed as (op or status, payload length)
+FRAME_HEADER = struct.Struct(">BI")
+KEY_LEN = struct.Struct(">H")
+COUNT = struct.Struct(">I")
+
+OP_PING = 1
+OP_MGET = 2
+OP_MSET = 3
+OP_MDELETE = 4
+OP_CONTAINS = 5
+OP_CLEAR = 6
+OP_STATS = 7
+OP_PERSIST = 8
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+MAX_KEY_BYTES = 2 ** (8 * KEY_LEN.size) - 1
+
+
+class CacheProtocolError(Exception):
+    """The daemon answered with an error or a reply that could not be decoded."""
+
+
+def _encode_key(key: str) -> bytes:
+    raw = key.encode()
+    if len(raw) > MAX_KEY_BYTES:
+        raise ValueError(f"Cache key of {len(raw)} bytes exceeds the {MAX_KEY_BYTES}-byte limit "
+                         f"of the cache daemon protocol")
+    return raw
+
+
+def encode_keys(keys: List[str]) -> bytes:
+    parts = [COUNT.pack(len(keys))]
+    for key in keys:
+        raw = _encode_key(key)
+        parts.append(KEY_LEN.pack(len(raw)))
+        parts.append(raw)
+    return b"".join(parts)
+
+
+def decode_keys(payload: bytes) -> List[str]:
+    (count,), pos = COUNT.unpack_from(payload), COUNT.size
+    keys = []
+    for _ in range(count):
+        (length,) = KEY_LEN.unpack_from(payload, pos)
+        pos += KEY_LEN.size
+        keys.append(payload[pos:pos + length].decode())
+        pos += length
+    return keys
+
+
+def encode_entries(entries: Dict[str, CacheEntry]) -> bytes:
+    """Count, then per entry: key, body length and the entry as JSON."""
+    parts = [COUNT.pack(len(entries))]
+    for key, entry in entries.items():
+        raw = _encode_key(key)
+        body = json.dumps(entry.to_dict(), default=json_default).encode()
+        parts.append(KEY_LEN.pack(len(raw)))
+        parts.append(raw)
+        parts.append(COUNT.pack(len(body)))
+        parts.append(body)
+    return b"".join(parts)
+
+
+def decode_entries(payload: bytes) -> Dict[str, CacheEntry]:
+    (count,), pos = COUNT.unpack_from(payload), COUNT.size
+    entries = {}
+    for _ in range(count):
+        (length,) = KEY_LEN.unpack_from(payload, pos)
+        pos += KEY_LEN.size
+        key = payload[pos:pos + length].decode()
+        pos += length
+        (length,) = COUNT.unpack_from(payload, pos)
+        pos += COUNT.size
+        entries[key] = CacheEntry.from_dict(json.loads(payload[pos:pos + length]))
+        pos += length
+    return entries
+
+
+def _read_exact(stream, size: int) -> Optional[bytes]:
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return data
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves frames from one client connection until it closes."""
+
+    def setup(self):
+        super().setup()
+        self.server.cache_daemon._track(self.connection, True)
+
+    def finish(self):
+        self.server.cache_daemon._track(self.connection, False)
+        super().finish()
+
+    def handle(self):
+        daemon: "CacheDaemon" = self.server.cache_daemon
+        while True:
+            header = _read_exact(self.rfile, FRAME_HEADER.size)
+            if header is None:
+                return
+            op, length = FRAME_HEADER.unpack(header)
+            payload = _read_exact(self.rfile, length) if length else b""
+            if payload is None:
+                return
+            try:
+                status, body = STATUS_OK, daemon.dispatch(op, payload)
+            except Exception as e:
+                logger.error(f"Cache daemon request failed: {e}")
+                status, body = STATUS_ERROR, str(e).encode()
+            self.wfile.write(FRAME_HEADER.pack(status, len(body)) + body)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class CacheDaemon:
+    """
+    Serves a cache level to local processes over a Unix domain socket.
+    Each connection gets a thread; requests on a connection are answered
+    in order, so clients can pipeline several before reading replies.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        level: Optional[CacheLevel] = None,
+        max_size: int = 10000,
+        persistence_file: Optional[str] = None,
+        expiry_tick_seconds: Optional[float] = 1.0,
+        metrics: bool = True
+    ):
+        if not UNIX_SOCKETS_AVAILABLE:
+            raise RuntimeError("Unix domain sockets are not available on this platform")
+        self.socket_path = str(socket_path)
+        self.level = level or L2RedisLikeCache(max_size=max_size, persistence_file=persistence_file)
+        # The daemon outlives its clients, so its latencies are what `nemesis.py cache stats` shows
+        self._metrics: Optional[CacheMetrics] = None
+        if metrics:
+            self._metrics = CacheMetrics()
+            self.level = InstrumentedLevel("l2", self.level, self._metrics)
+        self._requests = 0
+        self._lock = threading.Lock()
+        self._connections: set = set()
+        self._thread: Optional[threading.Thread] = None
+
+        self._sweeper: Optional[ExpirySweeper] = None
+        if expiry_tick_seconds:
+            self._sweeper = ExpirySweeper({"l2": self.level}, tick_seconds=expiry_tick_seconds)
+            self._sweeper.seed()
+            self._sweeper.start()
+
+        self._remove_stale_socket()
+        Path(self.socket_path).parent.mkdir(parents=True, exist_ok=True)
+        self._server = _Server(self.socket_path, _Handler)
+        self._server.cache_daemon = self
+        os.chmod(self.socket_path, 0o600)
+
+    def _remove_stale_socket(self):
+        """Unlink a socket file left by a daemon that is no longer running."""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise RuntimeError(f"A cache daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def _track(self, connection: socket.socket, active: bool):
+        with self._lock:
+            if active:
+                self._connections.add(connection)
+            else:
+                self._connections.discard(connection)
+
+    def dispatch(self, op: int, payload: bytes) -> bytes:
+        with self._lock:
+            self._requests += 1
+        if op == OP_MGET:
+            return encode_entries(self.level.get_many(decode_keys(payload)))
+        if op == OP_MSET:
+            entries = decode_entries(payload)
+            self.level.set_many(entries)
+            if self._sweeper is not None:
+                for key, entry in entries.items():
+                    self._sweeper.schedule(key, entry.expires_at)
+            return b""
+        if op == OP_MDELETE:
+            return COUNT.pack(self.level.delete_many(decode_keys(payload)))
+        if op == OP_CONTAINS:
+            return bytes(self.level.contains(key) for key in decode_keys(payload))
+        if op == OP_CLEAR:
+            self.level.clear()
+            return b""
+        if op == OP_STATS:
+            return json.dumps(self.stats(), default=str).encode()
+        if op == OP_PERSIST:
+            self.level.persist()
+            return b""
+        if op == OP_PING:
+            return b""
+        raise ValueError(f"Unknown op: {op}")
+
+    def serve_forever(self):
+        logger.info(f"Cache daemon listening on {self.socket_path}")
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve from a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.serve_forever, name="nemesis-cache-daemon",
+                                            daemon=True)
+            self._thread.start()
+
+    def close(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._server.server_close()
+        # Connection threads outlive shutdown(); cut them off so clients fail over
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._sweeper is not None:
+            self._sweeper.close()
+        self.level.close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.level.stats()
+        with self._lock:
+            stats["requests"] = self._requests
+        if self._sweeper is not None:
+            stats["expiry"] = self._sweeper.stats()
+        if self._metrics is not None:
+            stats["metrics"] = self._metrics.stats()
+        return stats
+
+
+class _Connection:
+    __slots__ = ("sock", "rfile")
+
+    def __init__(self, socket_path: str, timeout: float):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.rfile = self.sock.makefile("rb")
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+class RemoteL2Cache(CacheLevel):
+    """
+    L2 level backed by a CacheDaemon. Connections are pooled; batch calls
+    are split into ``batch_size`` chunks that are pipelined in one round
+    trip. While the daemon is unreachable, or after it answers with an
+    error, every call goes to ``fallback`` (an in-process L2) and
+    reconnection is retried every ``retry_interval_seconds``. Keys longer
+    than MAX_KEY_BYTES raise ValueError. Entries written to the fallback are not
+    copied to the daemon when it comes back.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        fallback: Optional[CacheLevel] = None,
+        pool_size: int = 4,
+        timeout_seconds: float = 2.0,
+        retry_interval_seconds: float = 5.0,
+        batch_size: int = 256
+    ):
+        self.socket_path = str(socket_path)
+        self.fallback = fallback or L2RedisLikeCache()
+        self.pool_size = pool_size
+        self.timeout_seconds = timeout_seconds
+        self.retry_interval_seconds = retry_interval_seconds
+        self.batch_size = batch_size
+        self._idle: "queue.LifoQueue[_Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._fallbacks = 0
+        self._round_trips = 0
+        self._connects = 0
+
+    def _acquire(self) -> _Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        connection = _Connection(self.socket_path, self.timeout_seconds)
+        with self._lock:
+            self._connects += 1
+        return connection
+
+    def _release(self, connection: _Connection):
+        if self._idle.qsize() < self.pool_size:
+            self._idle.put(connection)
+        else:
+            connection.close()
+
+    def _pipeline(self, requests: List[Tuple[int, bytes]]) -> Optional[List[bytes]]:
+        """
+        Send every request, then read the replies in order. Returns None,
+        after marking the daemon down, if it cannot be reached or answers
+        with an error.
+        """
+        if not UNIX_SOCKETS_AVAILABLE or time.time() < self._down_until:
+            return None
+        try:
+            connection = self._acquire()
+        except OSError as e:
+            self._mark_down(e)
+            return None
+
+        try:
+            connection.sock.sendall(b"".join(FRAME_HEADER.pack(op, len(payload)) + payload
+                                             for op, payload in requests))
+            replies = []
+            for _ in requests:
+                header = _read_exact(connection.rfile, FRAME_HEADER.size)
+                if header is None:
+                    raise ConnectionError("Cache daemon closed the connection")
+                status, length = FRAME_HEADER.unpack(header)
+                body = _read_exact(connection.rfile, length) if length else b""
+                if body is None:
+                    raise ConnectionError("Cache daemon closed the connection")
+                if status != STATUS_OK:
+                    raise CacheProtocolError(f"Cache daemon error: {body.decode(errors='replace')}")
+                replies.append(body)
+        except (OSError, CacheProtocolError) as e:
+            # Replies may be partially read, so the connection is out of sync
+            connection.close()
+            self._mark_down(e)
+            return None
+
+        self._release(connection)
+        with self._lock:
+            self._round_trips += 1
+        return replies
+
+    def _mark_down(self, error: Exception):
+        with self._lock:
+            if time.time() >= self._down_until:
+                logger.warning(f"Cache daemon unavailable at {self.socket_path}, using local L2: {error}")
+            self._down_until = time.time() + self.retry_interval_seconds
+            self._fallbacks += 1
+        # Pooled connections to a dead daemon are useless too
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _chunks(self, items: List[Any]) -> List[List[Any]]:
+        return [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+
+    @property
+    def connected(self) -> bool:
+        return time.time() >= self._down_until
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        if not keys:
+            return {}
+        replies = self._pipeline([(OP_MGET, encode_keys(chunk)) for chunk in self._chunks(keys)])
+        if replies is None:
+            return self.fallback.get_many(keys)
+        found = {}
+        try:
+            for reply in replies:
+                found.update(decode_entries(reply))
+        except (struct.error, ValueError, KeyError, TypeError) as e:
+            self._mark_down(CacheProtocolError(f"Undecodable reply: {e}"))
+            return self.fallback.get_many(keys)
+        with self._lock:
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, entry: CacheEntry):
+        self.set_many({key: entry})
+
+    def set_many(self, entries: Dict[str, CacheEntry]):
+        if not entries:
+            return
+        chunks = self._chunks(list(entries.items()))
+        if self._pipeline([(OP_MSET, encode_entries(dict(chunk))) for chunk in chunks]) is None:
+            self.fallback.set_many(entries)
+
+    def delete(self, key: str) -> bool:
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: List[str]) -> int:
+        if not keys:
+            return 0
+        replies = self._pipeline([(OP_MDELETE, encode_keys(chunk)) for chunk in self._chunks(keys)])
+        if replies is None:
+            return self.fallback.delete_many(keys)
+        return sum(COUNT.unpack(reply)[0] for reply in replies)
+
+    def contains(self, key: str) -> bool:
+        replies = self._pipeline([(OP_CONTAINS, encode_keys([key]))])
+        if replies is None:
+            return self.fallback.contains(key)
+        return replies[0] == b"\x01"
+
+    def contains_many(self, keys: List[str]) -> Set[str]:
+        if not keys:
+            return set()
+        chunks = self._chunks(keys)
+        replies = self._pipeline([(OP_CONTAINS, encode_keys(chunk)) for chunk in chunks])
+        if replies is None:
+            return self.fallback.contains_many(keys)
+        return {key for chunk, reply in zip(chunks, replies)
+                for key, held in zip(chunk, reply) if held}
+
+    def expire_many(self, keys: List[str], now: float) -> List[str]:
+        # The daemon sweeps its own entries; only the fallback needs help
+        return self.fallback.expire_many(keys, now)
+
+    def clear(self):
+        if self._pipeline([(OP_CLEAR, b"")]) is None:
+            self.fallback.clear()
+
+    def persist(self):
+        if self._pipeline([(OP_PERSIST, b"")]) is None:
+            self.fallback.persist()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self.fallback.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            client = {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total > 0 else 0,
+                "round_trips": self._round_trips,
+                "connects": self._connects,
+                "idle_connections": self._idle.qsize(),
+                "fallbacks": self._fallbacks
+            }
+        replies = self._pipeline([(OP_STATS, b"")])
+        stats = json.loads(replies[0]) if replies is not None else self.fallback.stats()
+        stats.update({
+            "type": "remote" if replies is not None else "remote (local fallback)",
+            "socket": self.socket_path,
+            "client": client
+        })
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a shared NEMESIS L2 cache over a Unix socket")
+    parser.add_argument("--socket", default=str(Path.home() / ".local" / "share" / "nemesis" / "cache.sock"),
+                        help="Socket path")
+    parser.add_argument("--max-size", type=int, default=10000, help="Maximum entries")
+    parser.add_argument("--persistence", help="L2 snapshot file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    daemon = CacheDaemon(args.socket, max_size=args.max_size, persistence_file=args.persistence)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+NEMESIS Cache Codecs - Transparent value compression for lower cache tiers.
+Encoded payloads carry a one-byte codec id; anything without one (such as
+the plain JSON written by older versions) is returned as-is on decode.
+"""
+import base64
+import logging
+import lzma
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class Codec:
+    """A compression algorithm. ``codec_id`` is the frame tag byte."""
+
+    name = "identity"
+    codec_id = 0
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(Codec):
+    name = "zlib"
+    codec_id = 1
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class LzmaCodec(Codec):
+    name = "lzma"
+    codec_id = 2
+
+    def __init__(self, preset: int = 6):
+        self.preset = preset
+
+    def compress(self, data: bytes) -> bytes:
+        return lzma.compress(data, preset=self.preset)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lzma.decompress(data)
+
+
+class ZstdCodec(Codec):
+    """zstd, optionally primed with a trained dictionary."""
+
+    name = "zstd"
+    codec_id = 3
+
+    def __init__(self, level: int = 3, dictionary: Optional[bytes] = None):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is not installed")
+        self.level = level
+        self._dict_data = None
+        if dictionary is not None:
+            self.name = "zstd-dict"
+            self.codec_id = 4
+            self._dict_data = zstandard.ZstdCompressionDict(dictionary)
+        self._local = threading.local()
+
+    def _contexts(self):
+        # zstandard contexts are not thread-safe; keep one pair per thread
+        contexts = getattr(self._local, "contexts", None)
+        if contexts is None:
+            kwargs = {"dict_data": self._dict_data} if self._dict_data is not None else {}
+            contexts = (zstandard.ZstdCompressor(level=self.level, **kwargs),
+                        zstandard.ZstdDecompressor(**kwargs))
+            self._local.contexts = contexts
+        return contexts
+
+    def compress(self, data: bytes) -> bytes:
+        return self._contexts()[0].compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._contexts()[1].decompress(data)
+
+
+class EncodedValue:
+    """A cache value held in encoded form by an in-memory tier."""
+
+    __slots__ = ("blob",)
+
+    MARKER = "$encoded"
+
+    def __init__(self, blob: bytes):
+        self.blob = blob
+
+    def to_json(self) -> Dict[str, str]:
+        return {self.MARKER: base64.b64encode(self.blob).decode("ascii")}
+
+    @classmethod
+    def from_json(cls, value: Any) -> Any:
+        """Rebuild an EncodedValue from ``to_json`` output; other values pass through."""
+        if isinstance(value, dict) and len(value) == 1 and cls.MARKER in value:
+            return cls(base64.b64decode(value[cls.MARKER]))
+        return value
+
+
+def json_default(value: Any) -> Any:
+    """``json.dumps`` fallback that keeps encoded values decodable."""
+    if isinstance(value, EncodedValue):
+        return value.to_json()
+    return str(value)
+
+
+class ValueCodec:
+    """
+    Picks a codec per payload by size and records what it saved.
+    ``rules`` maps minimum payload sizes to codec names; the largest
+    threshold not above the payload size wins. A payload that does not
+    shrink is stored unencoded.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[List[Tuple[int, str]]] = None,
+        dictionary_path: Optional[Union[str, Path]] = None,
+        train_samples: int = 0,
+        dictionary_bytes: int = 16 * 1024
+    ):
+        fast = "zstd" if ZSTD_AVAILABLE else "zlib"
+        self.rules = sorted(rules if rules is not None
+                            else [(0, "identity"), (512, fast), (256 * 1024, "lzma")])
+        self.dictionary_path = Path(dictionary_path) if dictionary_path else None
+        self.train_samples = train_samples
+        self.dictionary_bytes = dictionary_bytes
+        self._lock = threading.Lock()
+        self._samples: List[bytes] = []
+        self._codecs: Dict[str, Codec] = {"identity": Codec(), "zlib": ZlibCodec(), "lzma": LzmaCodec()}
+        if ZSTD_AVAILABLE:
+            self._codecs["zstd"] = ZstdCodec()
+            self._load_dictionary()
+        self._by_id: Dict[int, Codec] = {c.codec_id: c for c in self._codecs.values()}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+        for _, name in self.rules:
+            if name == "zstd" and not ZSTD_AVAILABLE:
+                logger.warning("zstandard not available. Falling back to zlib.")
+            elif name not in self._codecs:
+                raise ValueError(f"Unknown codec: {name}")
+
+    def _load_dictionary(self):
+        if self.dictionary_path and self.dictionary_path.exists():
+            try:
+                codec = ZstdCodec(dictionary=self.dictionary_path.read_bytes())
+                self._codecs[codec.name] = codec
+            except Exception as e:
+                logger.error(f"Failed to load zstd dictionary: {e}")
+
+    def train_dictionary(self, samples: List[bytes]) -> bool:
+        """Train and install a zstd dictionary. It is never replaced once set."""
+        if not ZSTD_AVAILABLE or "zstd-dict" in self._codecs:
+            return False
+        try:
+            trained = zstandard.train_dictionary(self.dictionary_bytes, samples)
+        except Exception as e:
+            logger.warning(f"zstd dictionary training failed: {e}")
+            return False
+        data = trained.as_bytes()
+        if self.dictionary_path:
+            self.dictionary_path.parent.mkdir(parents=True, exist_ok=True)
+            self.dictionary_path.write_bytes(data)
+        codec = ZstdCodec(dictionary=data)
+        with self._lock:
+            self._codecs[codec.name] = codec
+            self._by_id[codec.codec_id] = codec
+        return True
+
+    def _select(self, size: int) -> Codec:
+        name = "identity"
+        for threshold, rule in self.rules:
+            if size >= threshold:
+                name = rule
+        if name == "zstd" and "zstd-dict" in self._codecs:
+            name = "zstd-dict"
+        return self._codecs.get(name) or self._codecs["zlib"]
+
+    def _record(self, name: str, field: str, amount: float, count_field: Optional[str] = None):
+        stats = self._stats.setdefault(name, {
+            "entries": 0, "raw_bytes": 0, "encoded_bytes": 0,
+            "encode_ms": 0.0, "decodes": 0, "decode_ms": 0.0
+        })
+        stats[field] += amount
+        if count_field:
+            stats[count_field] += 1
+
+    def encode(self, data: bytes) -> bytes:
+        """Compress ``data`` and prepend the codec id, or return it unchanged."""
+        codec = self._select(len(data))
+        started = time.perf_counter()
+        payload = codec.compress(data) if codec.codec_id else data
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if codec.codec_id and len(payload) + 1 >= len(data):
+            codec, payload = self._codecs["identity"], data
+        framed = bytes((codec.codec_id,)) + payload if codec.codec_id else data
+
+        with self._lock:
+            self._record(codec.name, "encode_ms", elapsed_ms, "entries")
+            self._record(codec.name, "raw_bytes", len(data))
+            self._record(codec.name, "encoded_bytes", len(framed))
+            samples = None
+            if self.train_samples and ZSTD_AVAILABLE:
+                self._samples.append(data[:self.dictionary_bytes])
+                if len(self._samples) >= self.train_samples:
+                    # Train exactly once; a replaced dictionary would orphan old entries
+                    samples, self._samples, self.train_samples = self._samples, [], 0
+        if samples:
+            self.train_dictionary(samples)
+        return framed
+
+    def is_encoded(self, data: bytes) -> bool:
+        return bool(data) and data[0] in self._by_id and data[0] != 0
+
+    def decode(self, data: bytes) -> bytes:
+        """Reverse ``encode``; unframed data is returned as-is."""
+        if not self.is_encoded(data):
+            return data
+        codec = self._by_id[data[0]]
+        started = time.perf_counter()
+        raw = codec.decompress(data[1:])
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._record(codec.name, "decode_ms", elapsed_ms, "decodes")
+        return raw
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            codecs = {name: dict(s) for name, s in self._stats.items()}
+        raw = sum(s["raw_bytes"] for s in codecs.values())
+        encoded = sum(s["encoded_bytes"] for s in codecs.values())
+        for s in codecs.values():
+            s["ratio"] = s["raw_bytes"] / s["encoded_bytes"] if s["encoded_bytes"] else 1.0
+        return {
+            "rules": [f"{threshold}+:{name}" for threshold, name in self.rules],
+            "ratio": raw / encoded if encoded else 1.0,
+            "raw_bytes": raw,
+            "encoded_bytes": encoded,
+            "encode_ms": sum(s["encode_ms"] for s in codecs.values()),
+            "decode_ms": sum(s["decode_ms"] for s in codecs.values()),
+            "codecs": codecs
+        }
+
+
+def create_codec(spec: Union[None, str, ValueCodec],
+                 dictionary_path: Optional[Union[str, Path]] = None) -> ValueCodec:
+    """
+    Build a ValueCodec from a config value: ``None``/"none" (store raw,
+    decode anything), "auto" (size-tiered defaults), a codec name used for
+    every payload of 512 bytes or more, or a ready ValueCodec.
+    """
+    if isinstance(spec, ValueCodec):
+        return spec
+    if spec is None or spec == "none":
+        return ValueCodec(rules=[(0, "identity")])
+    if spec == "auto":
+        return ValueCodec(dictionary_path=dictionary_path,
+                          train_samples=1000 if dictionary_path else 0)
+    return ValueCodec(rules=[(0, "identity"), (512, spec)], dictionary_path=dictionary_path,
+                      train_samples=1000 if spec == "zstd" and dictionary_path else 0)
@@ -0,0 +1,401 @@
+"""
+NEMESIS Eviction Policies - Pluggable replacement policies for cache levels.
+Implements LRU, W-TinyLFU, ARC and cost-aware GreedyDual-Size.
+
+A level owns the stored entries; the policy only tracks keys. The level
+reports inserts, hits and removals, and asks for a victim whenever it is
+over budget. ``victim()`` both chooses a key and forgets it.
+"""
+import heapq
+import itertools
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Union, Type
+
+
+class EvictionPolicy:
+    """Base class for eviction policies."""
+
+    name = "base"
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = max(1, capacity)
+
+    def resize(self, capacity: int):
+        self.capacity = max(1, capacity)
+
+    def record_insert(self, key: str, size_bytes: int = 0, cost: float = 1.0):
+        raise NotImplementedError
+
+    def record_access(self, key: str):
+        raise NotImplementedError
+
+    def record_remove(self, key: str):
+        raise NotImplementedError
+
+    def victim(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"policy": self.name, "tracked": len(self)}
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least recently used."""
+
+    name = "lru"
+
+    def __init__(self, capacity: int = 1000):
+        super().__init__(capacity)
+        self._order: OrderedDict[str, None] = OrderedDict()
+
+    def record_insert(self, key: str, size_bytes: int = 0, cost: float = 1.0):
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def record_access(self, key: str):
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def record_remove(self, key: str):
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        if not self._order:
+            return None
+        key, _ = self._order.popitem(last=False)
+        return key
+
+    def clear(self):
+        self._order.clear()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counter with periodic aging.
+    Counters saturate at 15 and are halved every ``sample_size`` increments,
+    so old popularity fades.
+    """
+
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    _HALVE = bytes(i >> 1 for i in range(256))
+
+    def __init__(self, capacity: int, depth: int = 4):
+        width = 1
+        while width < max(64, 4 * capacity):
+            width <<= 1
+        self.width = width
+        self.depth = min(depth, len(self._SEEDS))
+        self._seeds = self._SEEDS[:self.depth]
+        self._mask = width - 1
+        self._table = [bytearray(width) for _ in range(self.depth)]
+        self.sample_size = 10 * max(1, capacity)
+        self._additions = 0
+
+    def _indexes(self, key: str) -> List[int]:
+        h = hash(key)
+        mask = self._mask
+        return [((h ^ seed) * 0xFF51AFD7ED558CCD >> 29) & mask for seed in self._seeds]
+
+    def increment(self, key: str):
+        for row, index in zip(self._table, self._indexes(key)):
+            if row[index] < 15:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self._table, self._indexes(key)))
+
+    def _age(self):
+        for row in self._table:
+            row[:] = row.translate(self._HALVE)
+        self._additions //= 2
+
+    def clear(self):
+        for row in self._table:
+            row[:] = bytes(self.width)
+        self._additions = 0
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """
+    W-TinyLFU: a small LRU admission window in front of a segmented LRU
+    main area. An entry leaving the window only displaces the main area's
+    victim if the count-min sketch has seen it more often, so one-off scans
+    cannot flush frequently used entries.
+    """
+
+    name = "tinylfu"
+
+    def __init__(self, capacity: int = 1000, window_ratio: float = 0.01,
+                 protected_ratio: float = 0.8):
+        self.window_ratio = window_ratio
+        self.protected_ratio = protected_ratio
+        self._window: OrderedDict[str, None] = OrderedDict()
+        self._probation: OrderedDict[str, None] = OrderedDict()
+        self._protected: OrderedDict[str, None] = OrderedDict()
+        super().__init__(capacity)
+        self.resize(capacity)
+        self._admitted = 0
+        self._rejected = 0
+
+    def resize(self, capacity: int):
+        super().resize(capacity)
+        self._window_cap = max(1, int(self.capacity * self.window_ratio))
+        self._main_cap = max(1, self.capacity - self._window_cap)
+        self._protected_cap = max(1, int(self._main_cap * self.protected_ratio))
+        self._sketch = CountMinSketch(self.capacity)
+
+    def record_insert(self, key: str, size_bytes: int = 0, cost: float = 1.0):
+        if key in self._window or key in self._probation or key in self._protected:
+            self.record_access(key)
+            return
+        self._sketch.increment(key)
+        self._window[key] = None
+
+    def record_access(self, key: str):
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self._protected_cap:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+
+    def record_remove(self, key: str):
+        self._window.pop(key, None)
+        self._probation.pop(key, None)
+        self._protected.pop(key, None)
+
+    def _main_victim(self) -> Optional[str]:
+        if self._probation:
+            return next(iter(self._probation))
+        if self._protected:
+            return next(iter(self._protected))
+        return None
+
+    def victim(self) -> Optional[str]:
+        while len(self._window) > self._window_cap:
+            candidate, _ = self._window.popitem(last=False)
+            if len(self._probation) + len(self._protected) < self._main_cap:
+                self._probation[candidate] = None
+                continue
+
+            main_victim = self._main_victim()
+            if main_victim is None:
+                return candidate
+            if self._sketch.estimate(candidate) > self._sketch.estimate(main_victim):
+                self.record_remove(main_victim)
+                self._probation[candidate] = None
+                self._admitted += 1
+                return main_victim
+            self._rejected += 1
+            return candidate
+
+        for segment in (self._probation, self._protected, self._window):
+            if segment:
+                key, _ = segment.popitem(last=False)
+                return key
+        return None
+
+    def clear(self):
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+        self._sketch.clear()
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "window": len(self._window),
+            "probation": len(self._probation),
+            "protected": len(self._protected),
+            "admitted": self._admitted,
+            "rejected": self._rejected
+        })
+        return stats
+
+
+class ARCPolicy(EvictionPolicy):
+    """
+    Adaptive Replacement Cache. Balances a recency list (T1) against a
+    frequency list (T2), using ghost lists of recently evicted keys (B1, B2)
+    to learn how much space each deserves.
+    """
+
+    name = "arc"
+
+    def __init__(self, capacity: int = 1000):
+        super().__init__(capacity)
+        self._t1: OrderedDict[str, None] = OrderedDict()
+        self._t2: OrderedDict[str, None] = OrderedDict()
+        self._b1: OrderedDict[str, None] = OrderedDict()
+        self._b2: OrderedDict[str, None] = OrderedDict()
+        self._p = 0.0
+        self._last_from_b2 = False
+
+    def record_insert(self, key: str, size_bytes: int = 0, cost: float = 1.0):
+        if key in self._t1 or key in self._t2:
+            self.record_access(key)
+            return
+
+        self._last_from_b2 = False
+        if key in self._b1:
+            self._p = min(float(self.capacity), self._p + max(len(self._b2) / len(self._b1), 1.0))
+            del self._b1[key]
+            self._t2[key] = None
+        elif key in self._b2:
+            self._p = max(0.0, self._p - max(len(self._b1) / len(self._b2), 1.0))
+            del self._b2[key]
+            self._t2[key] = None
+            self._last_from_b2 = True
+        else:
+            self._t1[key] = None
+
+        # Bound the ghost lists
+        while len(self._t1) + len(self._b1) > self.capacity and self._b1:
+            self._b1.popitem(last=False)
+        while len(self._t1) + len(self._t2) + len(self._b1) + len(self._b2) > 2 * self.capacity and self._b2:
+            self._b2.popitem(last=False)
+
+    def record_access(self, key: str):
+        if key in self._t1:
+            del self._t1[key]
+            self._t2[key] = None
+        elif key in self._t2:
+            self._t2.move_to_end(key)
+
+    def record_remove(self, key: str):
+        self._t1.pop(key, None)
+        self._t2.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        prefer_t1 = self._t1 and (
+            len(self._t1) > self._p or (self._last_from_b2 and len(self._t1) == int(self._p))
+        )
+        if prefer_t1 or not self._t2:
+            if not self._t1:
+                return None
+            key, _ = self._t1.popitem(last=False)
+            self._b1[key] = None
+            return key
+        key, _ = self._t2.popitem(last=False)
+        self._b2[key] = None
+        return key
+
+    def clear(self):
+        self._t1.clear()
+        self._t2.clear()
+        self._b1.clear()
+        self._b2.clear()
+        self._p = 0.0
+
+    def __len__(self) -> int:
+        return len(self._t1) + len(self._t2)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "t1": len(self._t1),
+            "t2": len(self._t2),
+            "target_t1": self._p
+        })
+        return stats
+
+
+class GreedyDualSizePolicy(EvictionPolicy):
+    """
+    Cost-aware GreedyDual-Size. Each key's priority is the inflation value
+    L plus cost / size, so expensive-to-recompute entries (slow LLM calls)
+    outlive cheap ones of the same size. Evicting a key raises L to its
+    priority, which ages everything that has not been touched since.
+    Uses a heap with lazy invalidation, so operations are O(log n).
+    """
+
+    name = "gds"
+
+    def __init__(self, capacity: int = 1000):
+        super().__init__(capacity)
+        self._heap: list = []
+        self._entries: Dict[str, tuple] = {}  # key -> (priority, seq, cost, size)
+        self._inflation = 0.0
+        self._seq = itertools.count()
+
+    def _push(self, key: str, cost: float, size_bytes: int):
+        priority = self._inflation + cost / max(size_bytes, 1)
+        seq = next(self._seq)
+        self._entries[key] = (priority, seq, cost, size_bytes)
+        heapq.heappush(self._heap, (priority, seq, key))
+        # Drop stale heap nodes once they dominate
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(p, s, k) for k, (p, s, _, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def record_insert(self, key: str, size_bytes: int = 0, cost: float = 1.0):
+        self._push(key, cost, size_bytes)
+
+    def record_access(self, key: str):
+        current = self._entries.get(key)
+        if current is not None:
+            self._push(key, current[2], current[3])
+
+    def record_remove(self, key: str):
+        self._entries.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        while self._heap:
+            priority, seq, key = heapq.heappop(self._heap)
+            current = self._entries.get(key)
+            if current is not None and current[1] == seq:
+                del self._entries[key]
+                self._inflation = priority
+                return key
+        return None
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+        self._inflation = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["inflation"] = self._inflation
+        return stats
+
+
+EVICTION_POLICIES: Dict[str, Type[EvictionPolicy]] = {
+    LRUPolicy.name: LRUPolicy,
+    TinyLFUPolicy.name: TinyLFUPolicy,
+    ARCPolicy.name: ARCPolicy,
+    GreedyDualSizePolicy.name: GreedyDualSizePolicy,
+}
+
+
+def create_policy(policy: Union[str, EvictionPolicy], capacity: int) -> EvictionPolicy:
+    """Build a policy by name, or size an existing instance to the level."""
+    if isinstance(policy, EvictionPolicy):
+        policy.resize(capacity)
+        return policy
+    if policy not in EVICTION_POLICIES:
+        raise ValueError(f"Unknown eviction policy: {policy}")
+    return EVICTION_POLICIES[policy](capacity)
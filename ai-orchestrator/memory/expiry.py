@@ -0,0 +1,184 @@
+"""
+NEMESIS Expiry - Background TTL sweeping for cache levels.
+A hierarchical timing wheel tracks when keys expire, and a sweeper
+thread hands each due bucket to the levels so expired entries are
+dropped without waiting for a read.
+"""
+import math
+import time
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel. Level 0 has one slot per tick; each higher
+    level's slot spans a full rotation of the level below. Scheduling is
+    O(1), and an item is moved down at most once per level before it is
+    due, so expiry is O(1) amortized per item. Items beyond the top
+    level's horizon wait in its last slot and are re-placed when reached.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slot_bits: int = 6, levels: int = 4,
+                 now: Optional[float] = None):
+        if tick_seconds <= 0:
+            raise ValueError(f"tick_seconds must be positive, got {tick_seconds}")
+        self.tick_seconds = tick_seconds
+        self.slot_bits = slot_bits
+        self.slots = 1 << slot_bits
+        self._mask = self.slots - 1
+        self._horizon = 1 << (slot_bits * levels)
+        self._wheels: List[List[List[Tuple[str, float]]]] = [
+            [[] for _ in range(self.slots)] for _ in range(levels)
+        ]
+        self._tick = int((time.time() if now is None else now) / tick_seconds)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _place(self, key: str, expires_at: float, due_tick: int):
+        delta = due_tick - self._tick
+        if delta >= self._horizon:
+            due_tick = self._tick + self._horizon - 1
+            delta = self._horizon - 1
+        level = 0
+        while delta >= 1 << (self.slot_bits * (level + 1)):
+            level += 1
+        slot = (due_tick >> (self.slot_bits * level)) & self._mask
+        self._wheels[level][slot].append((key, expires_at))
+
+    def schedule(self, key: str, expires_at: float):
+        """Track ``key`` until ``expires_at``."""
+        due_tick = math.ceil(expires_at / self.tick_seconds)
+        with self._lock:
+            # The current tick's slot has already been collected
+            self._place(key, expires_at, max(due_tick, self._tick + 1))
+            self._pending += 1
+
+    def advance(self, now: float) -> List[List[Tuple[str, float]]]:
+        """Move the wheel up to ``now`` and return the buckets that fell due."""
+        target = int(now / self.tick_seconds)
+        due = []
+        with self._lock:
+            while self._tick < target:
+                self._tick += 1
+                # Cascade higher levels whose slot boundary was just crossed
+                for level in range(len(self._wheels) - 1, 0, -1):
+                    if self._tick & ((1 << (self.slot_bits * level)) - 1):
+                        continue
+                    slot = (self._tick >> (self.slot_bits * level)) & self._mask
+                    bucket = self._wheels[level][slot]
+                    if bucket:
+                        self._wheels[level][slot] = []
+                        for key, expires_at in bucket:
+                            self._place(key, expires_at,
+                                        max(math.ceil(expires_at / self.tick_seconds), self._tick))
+                slot = self._tick & self._mask
+                bucket = self._wheels[0][slot]
+                if bucket:
+                    self._wheels[0][slot] = []
+                    self._pending -= len(bucket)
+                    due.append(bucket)
+        return due
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._pending
+
+
+class ExpirySweeper:
+    """
+    Drops expired entries from cache levels in the background.
+    Each due bucket is passed to ``level.expire_many``, so a level's lock is
+    held for at most one bucket. Levels re-check expiry themselves, so keys
+    re-set with a later TTL after being scheduled are left alone.
+    """
+
+    def __init__(self, levels: Dict[str, Any], tick_seconds: float = 1.0,
+                 slot_bits: int = 6, wheel_levels: int = 4):
+        self.levels = levels
+        self.tick_seconds = tick_seconds
+        self.wheel = TimingWheel(tick_seconds, slot_bits, wheel_levels)
+        self._lock = threading.Lock()
+        self._expired = {name: 0 for name in levels}
+        self._ticks = 0
+        self._lag_total = 0.0
+        self._lag_count = 0
+        self._lag_max = 0.0
+        self._lag_last = 0.0
+        self._sweep_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def seed(self):
+        """Schedule entries already present in the levels, e.g. loaded from disk."""
+        for level in self.levels.values():
+            for key, expires_at in level.iter_expiry():
+                self.wheel.schedule(key, expires_at)
+
+    def schedule(self, key: str, expires_at: Optional[float]):
+        if expires_at is not None:
+            self.wheel.schedule(key, expires_at)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nemesis-expiry-sweeper",
+                                            daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.tick_seconds):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Expiry sweep failed: {e}")
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Expire everything due by ``now``. Returns the number of keys dropped."""
+        now = time.time() if now is None else now
+        started = time.perf_counter()
+        dropped = 0
+        for bucket in self.wheel.advance(now):
+            scheduled = dict(bucket)
+            keys = list(scheduled)
+            removed = set()
+            for name, level in self.levels.items():
+                expired = level.expire_many(keys, now)
+                removed.update(expired)
+                with self._lock:
+                    self._expired[name] += len(expired)
+            if removed:
+                lags = [now - scheduled[key] for key in removed]
+                with self._lock:
+                    self._lag_total += sum(lags)
+                    self._lag_count += len(lags)
+                    self._lag_max = max(self._lag_max, max(lags))
+                    self._lag_last = lags[-1]
+            dropped += len(removed)
+        with self._lock:
+            self._ticks += 1
+            self._sweep_seconds += time.perf_counter() - started
+        return dropped
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tick_seconds": self.tick_seconds,
+                "pending": len(self.wheel),
+                "sweeps": self._ticks,
+                "expired": dict(self._expired),
+                "lag_ms": {
+                    "last": self._lag_last * 1000,
+                    "avg": self._lag_total / self._lag_count * 1000 if self._lag_count else 0.0,
+                    "max": self._lag_max * 1000
+                },
+                "sweep_ms": self._sweep_seconds * 1000
+            }
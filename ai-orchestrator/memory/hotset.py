@@ -0,0 +1,82 @@
+"""
+NEMESIS Hot Set - Access-ranked key manifest for cache prewarming.
+On shutdown the most frequently and recently used keys are written to a
+small manifest; the next process loads them back into L1/L2 before its
+callers ask for them.
+"""
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+class HotSetManifest:
+    """
+    Ranks keys by hit count decayed by time since last access, so a key
+    hit often an hour ago and a key hit once just now both have a chance.
+    Scores from the previous manifest decay too and are merged in, so a
+    key stays hot across a short process that never touched it.
+    """
+
+    def __init__(self, path: Union[str, Path], size: int = 500,
+                 half_life_seconds: float = 6 * 3600):
+        self.path = Path(path)
+        self.size = size
+        self.half_life_seconds = half_life_seconds
+
+    def _decay(self, age_seconds: float) -> float:
+        return 0.5 ** (max(age_seconds, 0.0) / self.half_life_seconds)
+
+    def _read(self) -> Tuple[float, List[Tuple[str, float]]]:
+        if not self.path.exists():
+            return 0.0, []
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                return 0.0, []
+            return data["written_at"], [(key, score) for key, score in data["keys"]]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable hot-set manifest {self.path}: {e}")
+            return 0.0, []
+
+    def load(self) -> List[str]:
+        """Keys from the manifest, hottest first."""
+        return [key for key, _ in self._read()[1]]
+
+    def write(self, access: Iterable[Tuple[str, float, int]], now: Optional[float] = None) -> int:
+        """
+        Rank ``(key, accessed_at, hit_count)`` records, merged with the
+        previous manifest, and keep the top ``size``. Returns how many keys
+        were written.
+        """
+        now = time.time() if now is None else now
+        scores: Dict[str, float] = {}
+        written_at, previous = self._read()
+        carried = self._decay(now - written_at)
+        for key, score in previous:
+            scores[key] = score * carried
+        for key, accessed_at, hit_count in access:
+            scores[key] = max(scores.get(key, 0.0), (hit_count + 1) * self._decay(now - accessed_at))
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:self.size]
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "version": MANIFEST_VERSION,
+                    "written_at": now,
+                    "keys": [[key, round(score, 6)] for key, score in ranked]
+                }, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to write hot-set manifest: {e}")
+            return 0
+        return len(ranked)
@@ -0,0 +1,119 @@
+"""
+NEMESIS Key Index - Tag and prefix lookups for cache invalidation.
+Keys are indexed by tag and in a trie over their ':'-separated segments,
+so invalidating a tag or a prefix visits only the matching keys.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+SEPARATOR = ":"
+
+
+class _Node:
+    __slots__ = ("children", "keys")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.keys: Set[str] = set()
+
+
+class KeyIndex:
+    """
+    Secondary index from tags and key prefixes to keys.
+    ``keys_with_prefix`` walks the trie to the prefix's last full segment,
+    then collects only the matching subtrees, so the cost is proportional
+    to the number of matching keys rather than to the index size.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._root = _Node()
+        self._tags: Dict[str, Set[str]] = {}
+        self._key_tags: Dict[str, Set[str]] = {}
+        self._size = 0
+
+    def add(self, key: str, tags: Optional[Iterable[str]] = None):
+        with self._lock:
+            node = self._root
+            for segment in key.split(SEPARATOR):
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _Node()
+                node = child
+            if key not in node.keys:
+                node.keys.add(key)
+                self._size += 1
+            for tag in tags or ():
+                self._tags.setdefault(tag, set()).add(key)
+                self._key_tags.setdefault(key, set()).add(tag)
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove_locked(key)
+
+    def remove_many(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                self._remove_locked(key)
+
+    def _remove_locked(self, key: str):
+        path = [self._root]
+        for segment in key.split(SEPARATOR):
+            child = path[-1].children.get(segment)
+            if child is None:
+                break
+            path.append(child)
+        else:
+            node = path[-1]
+            if key in node.keys:
+                node.keys.discard(key)
+                self._size -= 1
+                # Prune now-empty branches so the trie does not keep dead paths
+                segments = key.split(SEPARATOR)
+                for depth in range(len(segments), 0, -1):
+                    node = path[depth]
+                    if node.keys or node.children:
+                        break
+                    del path[depth - 1].children[segments[depth - 1]]
+
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def keys_with_tag(self, tag: str) -> List[str]:
+        with self._lock:
+            return list(self._tags.get(tag, ()))
+
+    def keys_with_prefix(self, prefix: str) -> List[str]:
+        with self._lock:
+            *segments, partial = prefix.split(SEPARATOR)
+            node = self._root
+            for segment in segments:
+                node = node.children.get(segment)
+                if node is None:
+                    return []
+
+            found: List[str] = []
+            stack = [child for name, child in node.children.items() if name.startswith(partial)]
+            while stack:
+                current = stack.pop()
+                found.extend(current.keys)
+                stack.extend(current.children.values())
+            return found
+
+    def clear(self):
+        with self._lock:
+            self._root = _Node()
+            self._tags.clear()
+            self._key_tags.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"keys": self._size, "tags": len(self._tags)}
@@ -3,18 +3,21 @@ NEMESIS Long-Term Memory - Secure, persistent memory with TTL and encryption.
 Implements hierarchical memory storage with automatic cleanup and access control.
 """
 import os
+import re
 import json
 import time
+import uuid
 import sqlite3
 import hashlib
 import threading
 import logging
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 # Optional encryption support
 try:
@@ -26,8 +29,45 @@ try:
 except ImportError:
     ENCRYPTION_AVAILABLE = False
 
+from .maintenance import MaintenanceScheduler
+from .vector_index import (
+    NUMPY_AVAILABLE, HashingEmbedder, VectorIndex, blob_to_vector, vector_to_blob
+)
+
 logger = logging.getLogger(__name__)
 
+# BM25 relevance is scaled by (1 + importance) and decays with this age
+RECENCY_SCALE_SECONDS = 30 * 86400
+
+
+def search_text(content: Any) -> str:
+    """Plain text for the full-text index: the string leaves of the content."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, dict):
+        return " ".join(search_text(value) for value in content.values())
+    if isinstance(content, (list, tuple)):
+        return " ".join(search_text(value) for value in content)
+    if content is None:
+        return ""
+    return str(content)
+
+
+def fts_query(query: str) -> str:
+    """
+    Translate a user query into FTS5 syntax: every term must match,
+    "quoted phrases" match in order and a trailing * matches a prefix.
+    Terms are quoted, so punctuation in them is never FTS5 syntax.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        text = phrase if phrase else word
+        prefix = not phrase and text.endswith("*")
+        text = text.rstrip("*") if prefix else text
+        if text.strip():
+            terms.append('"' + text.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " AND ".join(terms)
+
 
 class MemoryType(Enum):
     """Types of memory entries."""
@@ -146,10 +186,93 @@ class MemoryEncryption:
         return self._cipher.decrypt(data.encode()).decode()
 
 
+class ConnectionManager:
+    """
+    One persistent SQLite connection per thread, configured once when it
+    is opened, so calls keep their page cache and prepared statements.
+    ":memory:" maps to a named shared-cache database so every thread sees
+    the same data; the first connection keeps it alive until close().
+    """
+
+    def __init__(self, db_path: str, mmap_size_mb: int = 64, cache_size_mb: int = 16,
+                 cached_statements: int = 256, timeout_seconds: float = 30.0):
+        self.db_path = db_path
+        self.mmap_size_mb = mmap_size_mb
+        self.cache_size_mb = cache_size_mb
+        self.cached_statements = cached_statements
+        self.timeout_seconds = timeout_seconds
+        self.in_memory = db_path == ":memory:"
+        self._uri = f"file:nemesis_ltm_{uuid.uuid4().hex}?mode=memory&cache=shared" \
+            if self.in_memory else None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._opened = 0
+
+    def _open(self) -> sqlite3.Connection:
+        # Each connection is used only by its own thread; check_same_thread is
+        # off so close() can close them all from the shutting-down thread
+        conn = sqlite3.connect(
+            self._uri or self.db_path,
+            timeout=self.timeout_seconds,
+            uri=self.in_memory,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        # Only takes effect on a new database, and must precede the WAL switch,
+        # which writes the header; older files need enable_incremental_vacuum()
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        if not self.in_memory:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size = {self.mmap_size_mb * 1024 * 1024}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Negative cache_size is in KiB
+        conn.execute(f"PRAGMA cache_size = {-self.cache_size_mb * 1024}")
+        return conn
+
+    def get(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._prune_locked()
+                self._connections[threading.get_ident()] = conn
+                self._opened += 1
+        return conn
+
+    def _prune_locked(self):
+        """Close connections whose threads have exited."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).close()
+
+    def close(self):
+        """Close every thread's connection. Threads reopen on their next call."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            # A fresh thread-local makes every thread open a new connection
+            self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing memory database connection: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"open": len(self._connections), "opened": self._opened}
+
+
 class LongTermMemory:
     """
     Secure long-term memory storage for NEMESIS.
-    Features: TTL, encryption, access control, automatic cleanup.
+    Features: TTL, encryption, access control, automatic cleanup,
+    full-text search ranked by BM25, importance and recency, and local
+    semantic recall over hashed embeddings (with NumPy).
     """
 
     def __init__(
@@ -157,94 +280,416 @@ class LongTermMemory:
         db_path: str = "nemesis_memory.db",
         encryption_password: Optional[str] = None,
         default_ttl_hours: float = 24 * 30,  # 30 days default
-        cleanup_interval_hours: float = 1.0
+        cleanup_interval_hours: float = 1.0,
+        full_text: bool = True,
+        index_encrypted: bool = False,
+        mmap_size_mb: int = 64,
+        cache_size_mb: int = 16,
+        access_flush_interval_seconds: float = 30.0,
+        semantic: bool = True,
+        embedding_dim: int = 256,
+        vector_index_path: Optional[str] = None,
+        vector_train_interval_seconds: float = 60.0,
+        maintenance: bool = True,
+        expire_batch_size: int = 1000,
+        consolidate_interval_hours: float = 24.0,
+        optimize_interval_hours: float = 6.0,
+        checkpoint_interval_seconds: float = 300.0,
+        vacuum_interval_hours: float = 24.0,
+        vacuum_pages: int = 1000
     ):
         self.db_path = db_path
         self.default_ttl_hours = default_ttl_hours
         self.cleanup_interval = cleanup_interval_hours * 3600
+        self.expire_batch_size = expire_batch_size
+        self.vacuum_pages = vacuum_pages
+        # Indexing encrypted rows stores their plaintext terms unencrypted
+        self.index_encrypted = index_encrypted
 
         self._encryption = MemoryEncryption(encryption_password)
         self._lock = threading.RLock()
-        self._last_cleanup = 0.0
+        self._fts = False
+        self._connections = ConnectionManager(db_path, mmap_size_mb=mmap_size_mb,
+                                              cache_size_mb=cache_size_mb)
+
+        # Access counts from retrieve(), written in batches by the maintenance thread
+        self._access_lock = threading.Lock()
+        self._pending_access: Dict[str, int] = {}
+        # Counts swapped out by a flush and not yet committed; still added to reads
+        self._flushing_access: Dict[str, int] = {}
+        self._flush_lock = threading.Lock()
 
         # Initialize database
         self._init_db()
+        self._fts = full_text and self._ensure_fts()
+
+        # Semantic recall: embeddings live in the embedding column, the ANN
+        # index in memory, saved next to the database on close(). The index
+        # is loaded on the first semantic search; until then writes only
+        # reach the column, and the load picks them up
+        self._embedder: Optional[HashingEmbedder] = None
+        self._vectors: Optional[VectorIndex] = None
+        self._vectors_loaded = False
+        self._vector_path = vector_index_path or (
+            None if db_path == ":memory:" else f"{db_path}.vectors.npz"
+        )
+        if semantic and NUMPY_AVAILABLE:
+            self._embedder = HashingEmbedder(embedding_dim)
+            self._vectors = VectorIndex(embedding_dim)
+        elif semantic:
+            logger.info("NumPy not available. Semantic search falls back to full-text search.")
+
+        # Housekeeping runs here rather than on request paths; an interval
+        # of 0 leaves a job to run_maintenance()
+        self._maintenance = MaintenanceScheduler("nemesis-ltm-maintenance")
+        on_disk = not self._connections.in_memory
+        for name, fn, interval in (
+            ("flush_access", self.flush_access_counts, access_flush_interval_seconds),
+            ("expire", self._cleanup_expired, self.cleanup_interval),
+            ("consolidate", self.consolidate, consolidate_interval_hours * 3600),
+            ("optimize", self._optimize, optimize_interval_hours * 3600),
+            ("checkpoint", self._checkpoint, checkpoint_interval_seconds if on_disk else 0),
+            ("vacuum", self._incremental_vacuum, vacuum_interval_hours * 3600),
+            ("train_vectors", self._train_vector_index, vector_train_interval_seconds),
+        ):
+            self._maintenance.add(name, fn, interval)
+        if maintenance:
+            self._maintenance.start()
+
+    # Schema migrations, applied in order; PRAGMA user_version records the last one run
+    MIGRATIONS = ("_migrate_base_schema", "_migrate_fts_index", "_migrate_tag_table",
+                  "_migrate_embedding_column")
+    # Migrations the store works without; a failure is logged and skipped
+    OPTIONAL_MIGRATIONS = ("_migrate_fts_index",)
 
     def _init_db(self):
-        """Initialize SQLite database with WAL mode."""
+        """Initialize SQLite database with WAL mode and bring the schema up to date."""
         with self._get_connection() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS memories (
-                    id TEXT PRIMARY KEY,
-                    content TEXT NOT NULL,
-                    memory_type TEXT NOT NULL,
-                    access_level TEXT NOT NULL,
-                    created_at REAL NOT NULL,
-                    updated_at REAL NOT NULL,
-                    expires_at REAL,
-                    owner_agent TEXT NOT NULL,
-                    tags TEXT,
-                    metadata TEXT,
-                    access_count INTEGER DEFAULT 0,
-                    importance REAL DEFAULT 0.5,
-                    content_hash TEXT
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_memory_type ON memories(memory_type)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_owner ON memories(owner_agent)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_expires ON memories(expires_at)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_importance ON memories(importance)
-            """)
-            # Enable WAL mode for better concurrency
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.commit()
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, name in enumerate(self.MIGRATIONS[version:], start=version + 1):
+                try:
+                    getattr(self, name)(conn)
+                except sqlite3.OperationalError as e:
+                    conn.rollback()
+                    if name not in self.OPTIONAL_MIGRATIONS:
+                        logger.warning(f"Memory schema migration {number} ({name}) failed: {e}")
+                        break
+                    logger.warning(f"Memory schema migration {number} ({name}) failed, "
+                                   f"continuing without it: {e}")
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+
+    def _has_fts_table(self) -> bool:
+        with self._get_connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories_fts'"
+            ).fetchone() is not None
+
+    def _ensure_fts(self) -> bool:
+        """
+        True if the full-text index exists. Builds it if an earlier start
+        could not (e.g. SQLite without FTS5); search() falls back to LIKE
+        while it is missing.
+        """
+        if self._has_fts_table():
+            return True
+        with self._get_connection() as conn:
+            try:
+                self._migrate_fts_index(conn)
+                conn.commit()
+            except sqlite3.OperationalError as e:
+                conn.rollback()
+                logger.info(f"Full-text search unavailable, using substring search: {e}")
+                return False
+        return True
+
+    def _migrate_base_schema(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS memories (
+                id TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                memory_type TEXT NOT NULL,
+                access_level TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                expires_at REAL,
+                owner_agent TEXT NOT NULL,
+                tags TEXT,
+                metadata TEXT,
+                access_count INTEGER DEFAULT 0,
+                importance REAL DEFAULT 0.5,
+                content_hash TEXT
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_memory_type ON memories(memory_type)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_owner ON memories(owner_agent)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_expires ON memories(expires_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_importance ON memories(importance)
+        """)
+
+    def _migrate_fts_index(self, conn: sqlite3.Connection):
+        """Full-text index over content and tags, keyed by memories.rowid."""
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(text, tag_text)
+        """)
+        # Covers delete(), expiry cleanup and expired-on-read; store() and
+        # update() maintain their rows explicitly
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories
+            BEGIN
+                DELETE FROM memories_fts WHERE rowid = old.rowid;
+            END
+        """)
+        rows = conn.execute(
+            "SELECT rowid, content, access_level, tags FROM memories"
+        ).fetchall()
+        conn.executemany(
+            "INSERT INTO memories_fts (rowid, text, tag_text) VALUES (?, ?, ?)",
+            [
+                (row["rowid"], *self._index_text(row["content"], row["access_level"], row["tags"]))
+                for row in rows
+                if self._indexable(row["access_level"])
+            ]
+        )
+
+    def _migrate_tag_table(self, conn: sqlite3.Connection):
+        """One row per (tag, memory) so tag filters run in SQL, before LIMIT."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS memory_tags (
+                tag TEXT NOT NULL,
+                memory_id TEXT NOT NULL,
+                PRIMARY KEY (tag, memory_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_memory_tags_memory ON memory_tags(memory_id)
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS memory_tags_delete AFTER DELETE ON memories
+            BEGIN
+                DELETE FROM memory_tags WHERE memory_id = old.id;
+            END
+        """)
+        for row in conn.execute("SELECT id, tags FROM memories WHERE tags IS NOT NULL").fetchall():
+            self._write_tags(conn, row["id"], json.loads(row["tags"]))
+
+    def _write_tags(self, conn: sqlite3.Connection, memory_id: str, tags: List[str]):
+        conn.execute("DELETE FROM memory_tags WHERE memory_id = ?", (memory_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO memory_tags (tag, memory_id) VALUES (?, ?)",
+            [(tag, memory_id) for tag in tags]
+        )
+
+    def _migrate_embedding_column(self, conn: sqlite3.Connection):
+        """float32 embedding per memory; filled in when NumPy is available."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(memories)")}
+        if "embedding" not in columns:
+            conn.execute("ALTER TABLE memories ADD COLUMN embedding BLOB")
+
+    def _embed(self, text: str, tag_text: str):
+        return self._embedder.embed(f"{text} {tag_text}")
+
+    def _load_vector_index(self):
+        if not self._vectors_loaded:
+            with self._lock:
+                if not self._vectors_loaded:
+                    self._sync_vector_index()
+
+    def _sync_vector_index(self):
+        """
+        Load the saved index, embed rows stored without an embedding, then
+        reconcile the index with the table so writes made without it (or by
+        another process) are picked up.
+        """
+        width = self._embedder.dim * 4
+        encrypted_filter = "" if self.index_encrypted else \
+            f" AND access_level != '{AccessLevel.ENCRYPTED.value}'"
+
+        # Writers update the index only once it is loaded, after committing
+        # under this lock, so none is missed between reconcile and the flag
+        with self._lock:
+            if self._vector_path:
+                self._vectors.load(self._vector_path)
+            with self._get_connection() as conn:
+                while True:
+                    rows = conn.execute(
+                        "SELECT rowid, content, access_level, tags FROM memories "
+                        f"WHERE (embedding IS NULL OR length(embedding) != ?){encrypted_filter} "
+                        "LIMIT 5000",
+                        (width,)
+                    ).fetchall()
+                    if not rows:
+                        break
+                    conn.executemany(
+                        "UPDATE memories SET embedding = ? WHERE rowid = ?",
+                        [
+                            (vector_to_blob(self._embed(*self._index_text(
+                                row["content"], row["access_level"], row["tags"]
+                            ))), row["rowid"])
+                            for row in rows
+                        ]
+                    )
+                    conn.commit()
+
+                stored = {row[0] for row in conn.execute(
+                    f"SELECT id FROM memories WHERE length(embedding) = ?{encrypted_filter}",
+                    (width,)
+                )}
+                indexed = self._vectors.ids()
+                self._vectors.remove_many(list(indexed - stored))
+                missing = list(stored - indexed)
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT id, embedding FROM memories WHERE id IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    self._vectors.add_many(
+                        [row["id"] for row in rows],
+                        [blob_to_vector(row["embedding"]) for row in rows]
+                    )
+            self._vectors_loaded = True
+        logger.info(f"Loaded vector index: {len(self._vectors)} vectors")
+
+    def _indexable(self, access_level: str) -> bool:
+        return access_level != AccessLevel.ENCRYPTED.value or self.index_encrypted
+
+    def _index_text(self, content_str: str, access_level: str, tags_json: Optional[str]):
+        """(text, tag_text) for a stored row."""
+        if access_level == AccessLevel.ENCRYPTED.value:
+            content_str = self._encryption.decrypt(content_str)
+        try:
+            text = search_text(json.loads(content_str))
+        except ValueError:
+            text = content_str
+        tags = json.loads(tags_json) if tags_json else []
+        return text, " ".join(tags)
 
     @contextmanager
     def _get_connection(self):
-        """Get a database connection."""
-        conn = sqlite3.connect(self.db_path, timeout=30.0)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection."""
+        conn = self._connections.get()
         try:
             yield conn
         finally:
-            conn.close()
+            # Uncommitted work is discarded, as closing a connection used to do
+            if conn.in_transaction:
+                conn.rollback()
+
+    def close(self):
+        """
+        Stop maintenance, flush access counts, save the vector index and
+        close the database connections.
+        """
+        self._maintenance.close()
+        self.flush_access_counts()
+        if self._vectors_loaded and self._vector_path:
+            self._vectors.save(self._vector_path)
+        self._connections.close()
+
+    def run_maintenance(self, jobs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Run maintenance jobs now, in this thread: flush_access, expire,
+        consolidate, optimize, checkpoint, vacuum, train_vectors (all by
+        default).
+        """
+        return self._maintenance.run_now(jobs)
 
-    def _maybe_cleanup(self):
-        """Run cleanup if enough time has passed."""
+    def _cleanup_expired(self) -> int:
+        """
+        Remove expired memories ``expire_batch_size`` at a time, releasing
+        the lock between batches so writers are never held up for a full sweep.
+        """
         now = time.time()
-        if now - self._last_cleanup > self.cleanup_interval:
-            self._cleanup_expired()
-            self._last_cleanup = now
+        deleted = 0
+        while True:
+            with self._lock:
+                with self._get_connection() as conn:
+                    expired_ids = [row[0] for row in conn.execute(
+                        "SELECT id FROM memories WHERE expires_at IS NOT NULL AND expires_at < ? "
+                        "LIMIT ?",
+                        (now, self.expire_batch_size)
+                    )]
+                    if expired_ids:
+                        conn.executemany("DELETE FROM memories WHERE id = ?",
+                                         [(memory_id,) for memory_id in expired_ids])
+                        conn.commit()
+            if self._vectors_loaded:
+                self._vectors.remove_many(expired_ids)
+            deleted += len(expired_ids)
+            if len(expired_ids) < self.expire_batch_size:
+                break
+        if deleted > 0:
+            logger.info(f"Cleaned up {deleted} expired memories")
+        return deleted
+
+    def _optimize(self):
+        with self._get_connection() as conn:
+            conn.execute("PRAGMA optimize")
 
-    def _cleanup_expired(self):
-        """Remove expired memories."""
+    def _checkpoint(self) -> Dict[str, int]:
+        """Passive WAL checkpoint: copies what it can without waiting on readers."""
+        with self._get_connection() as conn:
+            busy, wal_pages, checkpointed = conn.execute(
+                "PRAGMA wal_checkpoint(PASSIVE)"
+            ).fetchone()
+        return {"busy": busy, "wal_pages": wal_pages, "checkpointed": checkpointed}
+
+    def _incremental_vacuum(self) -> int:
+        """
+        Return up to ``vacuum_pages`` free pages to the filesystem. Returns
+        pages freed; 0 for a database created without incremental
+        auto-vacuum until enable_incremental_vacuum() converts it.
+        """
         with self._lock:
             with self._get_connection() as conn:
-                cursor = conn.execute(
-                    "DELETE FROM memories WHERE expires_at IS NOT NULL AND expires_at < ?",
-                    (time.time(),)
-                )
-                deleted = cursor.rowcount
-                conn.commit()
-                if deleted > 0:
-                    logger.info(f"Cleaned up {deleted} expired memories")
-
-    def _generate_id(self, content: Any) -> str:
-        """Generate unique ID for memory."""
-        import uuid
-        content_hash = hashlib.sha256(json.dumps(content, default=str).encode()).hexdigest()[:8]
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                    logger.info("Memory database lacks incremental auto-vacuum; skipping vacuum "
+                                "(run `nemesis.py memory enable-vacuum` to convert it)")
+                    return 0
+                before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                # execute() steps the pragma once, freeing a single page; run it to completion
+                conn.executescript(f"PRAGMA incremental_vacuum({self.vacuum_pages})")
+                return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        Convert a database created without incremental auto-vacuum, so the
+        vacuum job can reclaim its free pages. The mode only changes through
+        a full VACUUM, which rewrites the whole file: run it as an explicit,
+        one-off step. Other connections keep reading from the WAL meanwhile
+        and writers wait on SQLite's busy timeout; the request lock is not
+        held. Returns False if the database was already converted.
+        """
+        with self._get_connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            logger.info("Converting memory database to incremental auto-vacuum")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return True
+
+    def _train_vector_index(self) -> int:
+        """Retrain the vector index lists once it has grown enough. Returns the list count, 0 if skipped."""
+        if not self._vectors_loaded or not self._vectors.needs_training:
+            return 0
+        return self._vectors.train()
+
+    def _generate_id(self, content_json: str) -> str:
+        """Generate unique ID for memory from its serialized content."""
+        content_hash = hashlib.sha256(content_json.encode()).hexdigest()[:8]
         return f"mem_{content_hash}_{uuid.uuid4().hex[:8]}"
 
-    def store(
+    def _prepare(
         self,
+        now: float,
         content: Any,
         memory_type: MemoryType,
         owner_agent: str = "system",
@@ -253,12 +698,16 @@ class LongTermMemory:
         tags: Optional[List[str]] = None,
         metadata: Optional[Dict[str, Any]] = None,
         importance: float = 0.5
-    ) -> MemoryEntry:
-        """Store a memory entry."""
-        self._maybe_cleanup()
-
-        memory_id = self._generate_id(content)
-        now = time.time()
+    ) -> Tuple[MemoryEntry, tuple, Optional[Tuple[str, str, str]], Any]:
+        """
+        Build an entry, its memories row, its full-text row and its embedding
+        (None where the memory is not indexed).
+        """
+        # Serialize and optionally encrypt
+        content_str = json.dumps(content, default=str)
+        memory_id = self._generate_id(content_str)
+        if access_level == AccessLevel.ENCRYPTED:
+            content_str = self._encryption.encrypt(content_str)
 
         # Calculate expiration
         ttl = ttl_hours if ttl_hours is not None else self.default_ttl_hours
@@ -277,111 +726,328 @@ class LongTermMemory:
             metadata=metadata or {},
             importance=importance
         )
+        text, tag_text = search_text(content), " ".join(entry.tags)
+        indexable = self._indexable(access_level.value)
+        vector = self._embed(text, tag_text) if self._embedder and indexable else None
+        row = (
+            entry.id,
+            content_str,
+            entry.memory_type.value,
+            entry.access_level.value,
+            entry.created_at,
+            entry.updated_at,
+            entry.expires_at,
+            entry.owner_agent,
+            json.dumps(entry.tags),
+            json.dumps(entry.metadata),
+            entry.access_count,
+            entry.importance,
+            hashlib.sha256(content_str.encode()).hexdigest(),
+            vector_to_blob(vector) if vector is not None else None
+        )
+        index = (text, tag_text, entry.id) if self._fts and indexable else None
+        return entry, row, index, vector
 
-        # Serialize and optionally encrypt
-        content_str = json.dumps(content, default=str)
-        if access_level == AccessLevel.ENCRYPTED:
-            content_str = self._encryption.encrypt(content_str)
-
-        content_hash = hashlib.sha256(content_str.encode()).hexdigest()
+    def _prepare_chunk(self, now: float, items: List[Dict[str, Any]]) -> list:
+        return [self._prepare(now, **item) for item in items]
 
+    def _write_prepared(self, prepared: list):
+        """Insert prepared memories in one transaction."""
+        ids = [(entry.id,) for entry, _, _, _ in prepared]
         with self._lock:
             with self._get_connection() as conn:
-                conn.execute("""
+                if self._fts:
+                    # REPLACE does not fire the delete trigger
+                    conn.executemany(
+                        "DELETE FROM memories_fts WHERE rowid = "
+                        "(SELECT rowid FROM memories WHERE id = ?)",
+                        ids
+                    )
+                conn.executemany("""
                     INSERT OR REPLACE INTO memories
                     (id, content, memory_type, access_level, created_at, updated_at,
-                     expires_at, owner_agent, tags, metadata, access_count, importance, content_hash)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    entry.id,
-                    content_str,
-                    entry.memory_type.value,
-                    entry.access_level.value,
-                    entry.created_at,
-                    entry.updated_at,
-                    entry.expires_at,
-                    entry.owner_agent,
-                    json.dumps(entry.tags),
-                    json.dumps(entry.metadata),
-                    entry.access_count,
-                    entry.importance,
-                    content_hash
-                ))
+                     expires_at, owner_agent, tags, metadata, access_count, importance, content_hash,
+                     embedding)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [row for _, row, _, _ in prepared])
+                if self._fts:
+                    conn.executemany(
+                        "INSERT INTO memories_fts (rowid, text, tag_text) "
+                        "SELECT rowid, ?, ? FROM memories WHERE id = ?",
+                        [index for _, _, index, _ in prepared if index is not None]
+                    )
+                # REPLACE skips the delete trigger, so stale tags are cleared here
+                conn.executemany("DELETE FROM memory_tags WHERE memory_id = ?", ids)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO memory_tags (tag, memory_id) VALUES (?, ?)",
+                    [(tag, entry.id) for entry, _, _, _ in prepared for tag in entry.tags]
+                )
                 conn.commit()
 
+        if self._vectors_loaded:
+            embedded = [(entry.id, vector) for entry, _, _, vector in prepared if vector is not None]
+            if embedded:
+                self._vectors.add_many([memory_id for memory_id, _ in embedded],
+                                       [vector for _, vector in embedded])
+
+    def store(
+        self,
+        content: Any,
+        memory_type: MemoryType,
+        owner_agent: str = "system",
+        access_level: AccessLevel = AccessLevel.INTERNAL,
+        ttl_hours: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        importance: float = 0.5
+    ) -> MemoryEntry:
+        """Store a memory entry."""
+        prepared = self._prepare(
+            time.time(), content, memory_type, owner_agent=owner_agent,
+            access_level=access_level, ttl_hours=ttl_hours, tags=tags,
+            metadata=metadata, importance=importance
+        )
+        self._write_prepared([prepared])
+
+        entry = prepared[0]
         logger.debug(f"Stored memory: {entry.id} (type: {memory_type.value})")
         return entry
 
+    def store_many(
+        self,
+        entries: Iterable[Dict[str, Any]],
+        workers: int = 0,
+        chunk_size: int = 1000
+    ) -> List[MemoryEntry]:
+        """
+        Store many memories in a single transaction. Each item holds the
+        keyword arguments of store(). With ``workers`` > 1, serialization and
+        encryption of large batches run on a thread pool in ``chunk_size`` chunks.
+        """
+        items = list(entries)
+        if not items:
+            return []
+
+        now = time.time()
+        if workers > 1 and len(items) > chunk_size:
+            chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+            with ThreadPoolExecutor(max_workers=workers,
+                                    thread_name_prefix="nemesis-ltm-ingest") as pool:
+                prepared = [p for chunk in pool.map(lambda c: self._prepare_chunk(now, c), chunks)
+                            for p in chunk]
+        else:
+            prepared = self._prepare_chunk(now, items)
+        self._write_prepared(prepared)
+
+        logger.debug(f"Stored {len(prepared)} memories")
+        return [entry for entry, _, _, _ in prepared]
+
     def retrieve(
         self,
         memory_id: str,
         requester_agent: str = "system"
     ) -> Optional[MemoryEntry]:
-        """Retrieve a memory by ID."""
-        self._maybe_cleanup()
+        """
+        Retrieve a memory by ID. Reads only: the access count is buffered
+        and written by flush_access_counts(), and expired rows are left to
+        the expire job.
+        """
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM memories WHERE id = ?",
+                (memory_id,)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        # Check expiration
+        if row["expires_at"] and row["expires_at"] < time.time():
+            return None
+
+        # Access control
+        access_level = AccessLevel(row["access_level"])
+        if access_level == AccessLevel.PRIVATE and row["owner_agent"] != requester_agent:
+            logger.warning(f"Access denied to memory {memory_id} for {requester_agent}")
+            return None
+
+        # Decrypt if needed
+        content_str = row["content"]
+        if access_level == AccessLevel.ENCRYPTED:
+            content_str = self._encryption.decrypt(content_str)
 
-        with self._lock:
-            with self._get_connection() as conn:
-                row = conn.execute(
-                    "SELECT * FROM memories WHERE id = ?",
-                    (memory_id,)
-                ).fetchone()
+        with self._access_lock:
+            self._pending_access[memory_id] = self._pending_access.get(memory_id, 0) + 1
+            pending = self._pending_access_count(memory_id)
 
-                if not row:
-                    return None
+        return MemoryEntry(
+            id=row["id"],
+            content=json.loads(content_str),
+            memory_type=MemoryType(row["memory_type"]),
+            access_level=access_level,
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            expires_at=row["expires_at"],
+            owner_agent=row["owner_agent"],
+            tags=json.loads(row["tags"]) if row["tags"] else [],
+            metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+            access_count=row["access_count"] + pending,
+            importance=row["importance"]
+        )
 
-                # Check expiration
-                if row["expires_at"] and row["expires_at"] < time.time():
-                    conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
-                    conn.commit()
-                    return None
+    def _pending_access_count(self, memory_id: str) -> int:
+        """Buffered reads of ``memory_id`` not yet in the table. Call with _access_lock held."""
+        return self._pending_access.get(memory_id, 0) + self._flushing_access.get(memory_id, 0)
+
+    def flush_access_counts(self) -> int:
+        """Write buffered access counts in one transaction. Returns memories updated."""
+        with self._flush_lock:
+            with self._access_lock:
+                pending, self._pending_access = self._pending_access, {}
+                self._flushing_access = pending
+            if not pending:
+                return 0
+            try:
+                with self._lock:
+                    with self._get_connection() as conn:
+                        conn.executemany(
+                            "UPDATE memories SET access_count = access_count + ? WHERE id = ?",
+                            [(count, memory_id) for memory_id, count in pending.items()]
+                        )
+                        conn.commit()
+            except sqlite3.Error as e:
+                # Keep the counts for the next flush
+                with self._access_lock:
+                    for memory_id, count in pending.items():
+                        self._pending_access[memory_id] = self._pending_access.get(memory_id, 0) + count
+                    self._flushing_access = {}
+                logger.error(f"Failed to flush memory access counts: {e}")
+                return 0
+            with self._access_lock:
+                self._flushing_access = {}
+            return len(pending)
 
-                # Access control
-                access_level = AccessLevel(row["access_level"])
-                if access_level == AccessLevel.PRIVATE and row["owner_agent"] != requester_agent:
-                    logger.warning(f"Access denied to memory {memory_id} for {requester_agent}")
-                    return None
+    def search(
+        self,
+        query: Optional[str] = None,
+        memory_type: Optional[MemoryType] = None,
+        owner_agent: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        min_importance: float = 0.0,
+        limit: int = 100,
+        requester_agent: str = "system",
+        match_all_tags: bool = False
+    ) -> List[MemoryEntry]:
+        """
+        Search memories with filters. ``tags`` matches memories carrying any
+        of the tags, or all of them with ``match_all_tags``.
+        """
+        conditions, params = self._filter_conditions(
+            memory_type, owner_agent, tags, min_importance, match_all_tags
+        )
 
-                # Decrypt if needed
-                content_str = row["content"]
-                if access_level == AccessLevel.ENCRYPTED:
-                    content_str = self._encryption.decrypt(content_str)
+        match = fts_query(query) if query and self._fts else ""
+        if query and not match:
+            conditions.append("content LIKE ?")
+            params.append(f"%{query}%")
 
-                # Update access count
-                conn.execute(
-                    "UPDATE memories SET access_count = access_count + 1 WHERE id = ?",
-                    (memory_id,)
-                )
-                conn.commit()
+        # Exclude private memories from other agents
+        conditions.append(
+            "(access_level != 'private' OR owner_agent = ?)"
+        )
+        params.append(requester_agent)
 
-                return MemoryEntry(
-                    id=row["id"],
-                    content=json.loads(content_str),
-                    memory_type=MemoryType(row["memory_type"]),
-                    access_level=access_level,
-                    created_at=row["created_at"],
-                    updated_at=row["updated_at"],
-                    expires_at=row["expires_at"],
-                    owner_agent=row["owner_agent"],
-                    tags=json.loads(row["tags"]) if row["tags"] else [],
-                    metadata=json.loads(row["metadata"]) if row["metadata"] else {},
-                    access_count=row["access_count"] + 1,
-                    importance=row["importance"]
-                )
+        if match:
+            # bm25() is negative, more negative is more relevant; scale it by
+            # importance and decay it with age so the ascending order ranks
+            # relevant, important, recent memories first
+            sql = f"""
+                SELECT memories.* FROM memories_fts
+                JOIN memories ON memories.rowid = memories_fts.rowid
+                WHERE memories_fts MATCH ? AND {' AND '.join(conditions)}
+                ORDER BY bm25(memories_fts) * (1.0 + importance)
+                         / (1.0 + MAX(? - updated_at, 0) / {RECENCY_SCALE_SECONDS}.0),
+                         updated_at DESC
+                LIMIT ?
+            """
+            params = [match] + params + [time.time()]
+        else:
+            sql = f"""
+                SELECT * FROM memories
+                WHERE {' AND '.join(conditions)}
+                ORDER BY importance DESC, updated_at DESC
+                LIMIT ?
+            """
+        params.append(limit)
 
-    def search(
+        with self._lock:
+            with self._get_connection() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        return self._rows_to_entries(rows)
+
+    def search_semantic(
         self,
-        query: Optional[str] = None,
+        query: str,
+        k: int = 10,
         memory_type: Optional[MemoryType] = None,
         owner_agent: Optional[str] = None,
         tags: Optional[List[str]] = None,
         min_importance: float = 0.0,
-        limit: int = 100,
-        requester_agent: str = "system"
+        requester_agent: str = "system",
+        match_all_tags: bool = False,
+        min_score: float = 0.0
     ) -> List[MemoryEntry]:
-        """Search memories with filters."""
-        self._maybe_cleanup()
+        """
+        The ``k`` memories most similar to ``query`` by embedding, after the
+        same filters as search(). Candidates from the vector index are
+        filtered in SQL; if too few pass, more are fetched. Without NumPy
+        this falls back to search().
+        """
+        if self._vectors is None:
+            return self.search(query, memory_type=memory_type, owner_agent=owner_agent,
+                               tags=tags, min_importance=min_importance, limit=k,
+                               requester_agent=requester_agent, match_all_tags=match_all_tags)
+
+        self._load_vector_index()
+        conditions, params = self._filter_conditions(
+            memory_type, owner_agent, tags, min_importance, match_all_tags
+        )
+        conditions.append("(access_level != 'private' OR owner_agent = ?)")
+        params.append(requester_agent)
 
+        vector = self._embedder.embed(query)
+        fetch = k * 4
+        while True:
+            hits = [(memory_id, score) for memory_id, score in self._vectors.search(vector, fetch)
+                    if score > min_score]
+            scores = dict(hits)
+            rows = []
+            with self._lock:
+                with self._get_connection() as conn:
+                    for start in range(0, len(hits), 500):
+                        chunk = [memory_id for memory_id, _ in hits[start:start + 500]]
+                        rows.extend(conn.execute(
+                            f"SELECT * FROM memories WHERE id IN ({', '.join('?' * len(chunk))}) "
+                            f"AND {' AND '.join(conditions)}",
+                            chunk + params
+                        ).fetchall())
+            # Stop once enough pass the filters, or the index has nothing closer left
+            if len(rows) >= k or fetch >= len(self._vectors) or len(hits) < fetch:
+                break
+            fetch *= 4
+
+        rows.sort(key=lambda row: scores[row["id"]], reverse=True)
+        return self._rows_to_entries(rows[:k])
+
+    def _filter_conditions(
+        self,
+        memory_type: Optional[MemoryType],
+        owner_agent: Optional[str],
+        tags: Optional[List[str]],
+        min_importance: float,
+        match_all_tags: bool
+    ) -> Tuple[List[str], List[Any]]:
+        """SQL conditions shared by search() and search_semantic()."""
         conditions = ["(expires_at IS NULL OR expires_at > ?)"]
         params: List[Any] = [time.time()]
 
@@ -397,60 +1063,51 @@ class LongTermMemory:
             conditions.append("importance >= ?")
             params.append(min_importance)
 
-        if query:
-            conditions.append("content LIKE ?")
-            params.append(f"%{query}%")
-
-        # Exclude private memories from other agents
-        conditions.append(
-            "(access_level != 'private' OR owner_agent = ?)"
-        )
-        params.append(requester_agent)
+        if tags:
+            wanted = list(dict.fromkeys(tags))
+            placeholders = ", ".join("?" * len(wanted))
+            if match_all_tags:
+                conditions.append(
+                    f"id IN (SELECT memory_id FROM memory_tags WHERE tag IN ({placeholders}) "
+                    f"GROUP BY memory_id HAVING COUNT(*) = ?)"
+                )
+                params.extend(wanted + [len(wanted)])
+            else:
+                conditions.append(
+                    f"id IN (SELECT memory_id FROM memory_tags WHERE tag IN ({placeholders}))"
+                )
+                params.extend(wanted)
 
-        sql = f"""
-            SELECT * FROM memories
-            WHERE {' AND '.join(conditions)}
-            ORDER BY importance DESC, updated_at DESC
-            LIMIT ?
-        """
-        params.append(limit)
+        return conditions, params
 
+    def _rows_to_entries(self, rows) -> List[MemoryEntry]:
+        with self._access_lock:
+            pending = {row["id"]: self._pending_access_count(row["id"]) for row in rows}
         results = []
-        with self._lock:
-            with self._get_connection() as conn:
-                rows = conn.execute(sql, params).fetchall()
-
-                for row in rows:
-                    try:
-                        content_str = row["content"]
-                        access_level = AccessLevel(row["access_level"])
-
-                        if access_level == AccessLevel.ENCRYPTED:
-                            content_str = self._encryption.decrypt(content_str)
-
-                        entry = MemoryEntry(
-                            id=row["id"],
-                            content=json.loads(content_str),
-                            memory_type=MemoryType(row["memory_type"]),
-                            access_level=access_level,
-                            created_at=row["created_at"],
-                            updated_at=row["updated_at"],
-                            expires_at=row["expires_at"],
-                            owner_agent=row["owner_agent"],
-                            tags=json.loads(row["tags"]) if row["tags"] else [],
-                            metadata=json.loads(row["metadata"]) if row["metadata"] else {},
-                            access_count=row["access_count"],
-                            importance=row["importance"]
-                        )
-
-                        # Filter by tags if specified
-                        if tags and not any(t in entry.tags for t in tags):
-                            continue
+        for row in rows:
+            try:
+                content_str = row["content"]
+                access_level = AccessLevel(row["access_level"])
 
-                        results.append(entry)
-                    except Exception as e:
-                        logger.error(f"Error loading memory {row['id']}: {e}")
+                if access_level == AccessLevel.ENCRYPTED:
+                    content_str = self._encryption.decrypt(content_str)
 
+                results.append(MemoryEntry(
+                    id=row["id"],
+                    content=json.loads(content_str),
+                    memory_type=MemoryType(row["memory_type"]),
+                    access_level=access_level,
+                    created_at=row["created_at"],
+                    updated_at=row["updated_at"],
+                    expires_at=row["expires_at"],
+                    owner_agent=row["owner_agent"],
+                    tags=json.loads(row["tags"]) if row["tags"] else [],
+                    metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+                    access_count=row["access_count"] + pending[row["id"]],
+                    importance=row["importance"]
+                ))
+            except Exception as e:
+                logger.error(f"Error loading memory {row['id']}: {e}")
         return results
 
     def update(
@@ -462,46 +1119,106 @@ class LongTermMemory:
         extend_ttl_hours: Optional[float] = None
     ) -> bool:
         """Update an existing memory."""
+        return self.update_many([{
+            "memory_id": memory_id,
+            "content": content,
+            "importance": importance,
+            "tags": tags,
+            "extend_ttl_hours": extend_ttl_hours
+        }]) == 1
+
+    def update_many(self, updates: Iterable[Dict[str, Any]]) -> int:
+        """
+        Apply many updates in a single transaction. Each item holds the
+        keyword arguments of update(); later items for the same memory see
+        earlier ones. Returns how many updates matched a memory.
+        """
+        items = list(updates)
+        if not items:
+            return 0
+
         with self._lock:
             with self._get_connection() as conn:
-                row = conn.execute(
-                    "SELECT * FROM memories WHERE id = ?",
-                    (memory_id,)
-                ).fetchone()
-
-                if not row:
-                    return False
-
-                updates = ["updated_at = ?"]
-                params = [time.time()]
-
-                if content is not None:
-                    content_str = json.dumps(content, default=str)
-                    if AccessLevel(row["access_level"]) == AccessLevel.ENCRYPTED:
-                        content_str = self._encryption.encrypt(content_str)
-                    updates.append("content = ?")
-                    params.append(content_str)
-
-                if importance is not None:
-                    updates.append("importance = ?")
-                    params.append(importance)
-
-                if tags is not None:
-                    updates.append("tags = ?")
-                    params.append(json.dumps(tags))
-
-                if extend_ttl_hours is not None and row["expires_at"]:
-                    new_expires = row["expires_at"] + (extend_ttl_hours * 3600)
-                    updates.append("expires_at = ?")
-                    params.append(new_expires)
-
-                params.append(memory_id)
-                conn.execute(
-                    f"UPDATE memories SET {', '.join(updates)} WHERE id = ?",
-                    params
+                rows: Dict[str, Dict[str, Any]] = {}
+                wanted = list(dict.fromkeys(item["memory_id"] for item in items))
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(wanted), 500):
+                    chunk = wanted[start:start + 500]
+                    for row in conn.execute(
+                        f"SELECT rowid, * FROM memories WHERE id IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    ):
+                        rows[row["id"]] = dict(row)
+
+                now = time.time()
+                changed: Dict[str, Dict[str, Any]] = {}
+                retagged: Dict[str, List[str]] = {}
+                reindexed: Dict[str, Dict[str, Any]] = {}
+                updated = 0
+                for item in items:
+                    row = rows.get(item["memory_id"])
+                    if row is None:
+                        continue
+                    updated += 1
+                    content = item.get("content")
+                    tags = item.get("tags")
+                    row["updated_at"] = now
+
+                    if content is not None:
+                        content_str = json.dumps(content, default=str)
+                        if AccessLevel(row["access_level"]) == AccessLevel.ENCRYPTED:
+                            content_str = self._encryption.encrypt(content_str)
+                        row["content"] = content_str
+                        row["content_hash"] = hashlib.sha256(content_str.encode()).hexdigest()
+
+                    if item.get("importance") is not None:
+                        row["importance"] = item["importance"]
+
+                    if tags is not None:
+                        row["tags"] = json.dumps(tags)
+                        retagged[row["id"]] = tags
+
+                    if item.get("extend_ttl_hours") is not None and row["expires_at"]:
+                        row["expires_at"] += item["extend_ttl_hours"] * 3600
+
+                    if (content is not None or tags is not None) \
+                            and self._indexable(row["access_level"]):
+                        reindexed[row["id"]] = row
+                    changed[row["id"]] = row
+
+                index_rows = []
+                vectors = []
+                for memory_id, row in reindexed.items():
+                    text, tag_text = self._index_text(row["content"], row["access_level"], row["tags"])
+                    index_rows.append((row["rowid"], text, tag_text))
+                    if self._embedder is not None:
+                        vector = self._embed(text, tag_text)
+                        row["embedding"] = vector_to_blob(vector)
+                        vectors.append((memory_id, vector))
+
+                conn.executemany(
+                    "UPDATE memories SET content = ?, content_hash = ?, importance = ?, "
+                    "tags = ?, expires_at = ?, updated_at = ?, embedding = ? WHERE id = ?",
+                    [
+                        (row["content"], row["content_hash"], row["importance"], row["tags"],
+                         row["expires_at"], row["updated_at"], row["embedding"], memory_id)
+                        for memory_id, row in changed.items()
+                    ]
                 )
+                if self._fts and index_rows:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO memories_fts (rowid, text, tag_text) "
+                        "VALUES (?, ?, ?)",
+                        index_rows
+                    )
+                for memory_id, tags in retagged.items():
+                    self._write_tags(conn, memory_id, tags)
                 conn.commit()
-                return True
+
+        if vectors and self._vectors_loaded:
+            self._vectors.add_many([memory_id for memory_id, _ in vectors],
+                                   [vector for _, vector in vectors])
+        return updated
 
     def delete(self, memory_id: str) -> bool:
         """Delete a memory."""
@@ -512,10 +1229,14 @@ class LongTermMemory:
                     (memory_id,)
                 )
                 conn.commit()
-                return cursor.rowcount > 0
+        if self._vectors_loaded:
+            self._vectors.remove_many([memory_id])
+        return cursor.rowcount > 0
 
     def get_stats(self) -> Dict[str, Any]:
         """Get memory statistics."""
+        with self._access_lock:
+            pending_access = len(self._pending_access.keys() | self._flushing_access.keys())
         with self._get_connection() as conn:
             total = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
 
@@ -545,12 +1266,20 @@ class LongTermMemory:
             "by_type": by_type,
             "by_access_level": by_access,
             "average_importance": avg_importance,
-            "expiring_24h": expiring_soon
+            "expiring_24h": expiring_soon,
+            "full_text": self._fts,
+            "pending_access": pending_access,
+            "maintenance": self._maintenance.stats(),
+            "vector_index": dict(self._vectors.stats(), loaded=self._vectors_loaded)
+            if self._vectors is not None else None,
+            "connections": self._connections.stats()
         }
 
-    def consolidate(self, min_age_hours: float = 24, min_access_count: int = 3):
+    def consolidate(self, min_age_hours: float = 24, min_access_count: int = 3) -> int:
         """Consolidate frequently accessed memories (increase importance, extend TTL)."""
         threshold_time = time.time() - (min_age_hours * 3600)
+        # Consolidation ranks by access_count, so it must see every read
+        self.flush_access_counts()
 
         with self._lock:
             with self._get_connection() as conn:
@@ -570,3 +1299,4 @@ class LongTermMemory:
 
                 conn.commit()
                 logger.info(f"Consolidated {cursor.rowcount} memories")
+                return cursor.rowcount
@@ -0,0 +1,133 @@
+"""
+NEMESIS Maintenance - Background job scheduling for the memory store.
+Cleanup, consolidation and SQLite housekeeping run on their own intervals
+from one thread, so request paths never pay for them.
+"""
+import time
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MaintenanceJob:
+    """A scheduled job and its timing history."""
+    name: str
+    fn: Callable[[], Any]
+    interval_seconds: float
+    next_run: float
+    runs: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+    last_run_at: Optional[float] = None
+    last_result: Any = None
+    last_error: Optional[str] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_ms": self.last_seconds * 1000,
+            "avg_ms": self.total_seconds / self.runs * 1000 if self.runs else 0.0,
+            "max_ms": self.max_seconds * 1000,
+            "last_run_at": self.last_run_at,
+            "last_result": self.last_result,
+            "last_error": self.last_error
+        }
+
+
+class MaintenanceScheduler:
+    """
+    Runs named jobs on their own intervals from one daemon thread.
+    Jobs never overlap, including with run_now(), and the next run of a
+    job is scheduled from when it finished, so a slow job cannot pile up.
+    A job with interval 0 only runs through run_now().
+    """
+
+    def __init__(self, thread_name: str = "nemesis-maintenance"):
+        self.thread_name = thread_name
+        self._lock = threading.Lock()
+        # Serializes job execution between the thread and run_now()
+        self._run_lock = threading.Lock()
+        self._jobs: Dict[str, MaintenanceJob] = {}
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, fn: Callable[[], Any], interval_seconds: float):
+        with self._lock:
+            self._jobs[name] = MaintenanceJob(
+                name=name, fn=fn, interval_seconds=interval_seconds,
+                next_run=time.time() + interval_seconds
+            )
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                now = time.time()
+                scheduled = [job for job in self._jobs.values() if job.interval_seconds > 0]
+                due = [job for job in scheduled if job.next_run <= now]
+                next_run = min((job.next_run for job in scheduled), default=None)
+            for job in due:
+                self._execute(job)
+                if self._stopped:
+                    return
+            if not due:
+                self._wake.wait(None if next_run is None else max(next_run - now, 0.0))
+                self._wake.clear()
+
+    def _execute(self, job: MaintenanceJob) -> Any:
+        with self._run_lock:
+            started = time.perf_counter()
+            result = None
+            try:
+                result = job.fn()
+                error = None
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Maintenance job {job.name} failed: {e}")
+            elapsed = time.perf_counter() - started
+        with self._lock:
+            job.runs += 1
+            job.total_seconds += elapsed
+            job.last_seconds = elapsed
+            job.max_seconds = max(job.max_seconds, elapsed)
+            job.last_run_at = time.time()
+            job.last_result = result
+            job.last_error = error
+            if error is not None:
+                job.errors += 1
+            job.next_run = time.time() + job.interval_seconds
+        return result
+
+    def run_now(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run jobs (all by default) in the calling thread. Returns their results."""
+        with self._lock:
+            jobs = [self._jobs[name] for name in names] if names else list(self._jobs.values())
+        return {job.name: self._execute(job) for job in jobs}
+
+    def close(self):
+        with self._lock:
+            self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: job.snapshot() for name, job in self._jobs.items()}
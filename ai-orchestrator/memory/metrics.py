@@ -0,0 +1,159 @@
+"""
+NEMESIS Cache Metrics - Latency histograms and traffic counters for ContextCache.
+Instrumentation wraps the cache levels only when enabled, so a cache
+built without metrics runs exactly the uninstrumented code.
+"""
+import math
+import time
+import threading
+from typing import Any, Dict, List, Tuple
+
+from .sizing import fast_size
+
+# Buckets per power of two; 4 bounds the relative error of a percentile to ~19%
+SUB_BUCKETS = 4
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram over nanoseconds. Not thread-safe."""
+
+    __slots__ = ("_buckets", "count", "total", "max")
+
+    def __init__(self):
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        index = int(math.log2(max(seconds * 1e9, 1.0)) * SUB_BUCKETS)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the ``p``th percentile."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(2 ** ((index + 1) / SUB_BUCKETS) / 1e9, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        snapshot = {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000
+        }
+        for p in PERCENTILES:
+            snapshot[f"p{p}_ms"] = self.percentile(p) * 1000
+        return snapshot
+
+
+class CacheMetrics:
+    """Per-level, per-operation latency plus byte and promotion counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._bytes: Dict[str, Dict[str, int]] = {}
+        self._promotions: Dict[str, int] = {}
+        self._invalidated = 0
+
+    def observe(self, level: str, op: str, seconds: float, read_bytes: int = 0,
+                written_bytes: int = 0):
+        with self._lock:
+            histogram = self._latency.get((level, op))
+            if histogram is None:
+                histogram = self._latency[(level, op)] = LatencyHistogram()
+            histogram.record(seconds)
+            if read_bytes or written_bytes:
+                counters = self._bytes.setdefault(level, {"read": 0, "written": 0})
+                counters["read"] += read_bytes
+                counters["written"] += written_bytes
+
+    def promoted(self, path: str, count: int = 1):
+        """Count entries copied up a level, e.g. path "l3->l1"."""
+        with self._lock:
+            self._promotions[path] = self._promotions.get(path, 0) + count
+
+    def invalidated(self, count: int):
+        with self._lock:
+            self._invalidated += count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latency: Dict[str, Dict[str, Any]] = {}
+            for (level, op), histogram in sorted(self._latency.items()):
+                latency.setdefault(level, {})[op] = histogram.snapshot()
+            return {
+                "latency": latency,
+                "bytes": {level: dict(counters) for level, counters in self._bytes.items()},
+                "promotions": dict(self._promotions),
+                "invalidated": self._invalidated
+            }
+
+
+def _entry_bytes(entries) -> int:
+    # Entries that never passed through L1 have not been sized yet
+    return sum(entry.size_bytes or fast_size(entry.value) for entry in entries)
+
+
+class InstrumentedLevel:
+    """
+    Times a cache level's reads and writes and counts their bytes (the
+    L1 size estimate). Every other attribute is passed through to the level.
+    """
+
+    def __init__(self, name: str, level: Any, metrics: CacheMetrics):
+        self.name = name
+        self.level = level
+        self._metrics = metrics
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.level, attr)
+
+    def get(self, key: str):
+        started = time.perf_counter()
+        entry = self.level.get(key)
+        self._metrics.observe(self.name, "get", time.perf_counter() - started,
+                              read_bytes=_entry_bytes([entry]) if entry is not None else 0)
+        return entry
+
+    def get_many(self, keys: List[str]):
+        started = time.perf_counter()
+        found = self.level.get_many(keys)
+        self._metrics.observe(self.name, "get_many", time.perf_counter() - started,
+                              read_bytes=_entry_bytes(found.values()))
+        return found
+
+    def set(self, key: str, entry):
+        started = time.perf_counter()
+        self.level.set(key, entry)
+        self._metrics.observe(self.name, "set", time.perf_counter() - started,
+                              written_bytes=_entry_bytes([entry]))
+
+    def set_many(self, entries):
+        started = time.perf_counter()
+        self.level.set_many(entries)
+        self._metrics.observe(self.name, "set_many", time.perf_counter() - started,
+                              written_bytes=_entry_bytes(entries.values()))
+
+    def delete(self, key: str) -> bool:
+        started = time.perf_counter()
+        deleted = self.level.delete(key)
+        self._metrics.observe(self.name, "delete", time.perf_counter() - started)
+        return deleted
+
+    def delete_many(self, keys: List[str]) -> int:
+        started = time.perf_counter()
+        deleted = self.level.delete_many(keys)
+        self._metrics.observe(self.name, "delete_many", time.perf_counter() - started)
+        return deleted
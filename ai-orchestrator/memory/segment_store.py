@@ -0,0 +1,709 @@
+"""
+NEMESIS Segment Store - Log-structured storage backend for the L3 cache.
+Entries are appended to segment files as length-prefixed records; an
+in-memory offset index maps keys to their latest record.
+"""
+import os
+import mmap
+import json
+import zlib
+import struct
+import threading
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Set, Tuple, Iterator, Union
+from pathlib import Path
+
+from .cache import AccessJournal, CacheEntry, CacheLevel, CapacityJanitor
+from .eviction import EvictionPolicy, create_policy
+from .codecs import ValueCodec, create_codec
+
+logger = logging.getLogger(__name__)
+
+OP_PUT = 1
+OP_DEL = 2
+
+# op, key_len, value_len, expires_at (-1 = never), crc32(key + value)
+RECORD_HEADER = struct.Struct("<BIIdI")
+# op, key_len, value_offset, value_len, expires_at
+FOOTER_ENTRY = struct.Struct("<BIQId")
+# footer_offset, entry_count, magic
+FOOTER_TRAILER = struct.Struct("<QI8s")
+FOOTER_MAGIC = b"NMSEGFT1"
+
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".log"
+
+
+@dataclass
+class RecordLocation:
+    """Where the live record for a key lives."""
+    segment_id: int
+    value_offset: int
+    value_len: int
+    expires_at: Optional[float]
+    record_size: int
+
+
+@dataclass
+class _Segment:
+    """A single segment file."""
+    segment_id: int
+    path: Path
+    size: int = 0
+    live_bytes: int = 0
+    sealed: bool = False
+    # (op, key, value_offset, value_len, expires_at) for the footer
+    records: List[Tuple[int, str, int, int, Optional[float]]] = field(default_factory=list)
+    # Keys with a put record here, live or dead: what later tombstones shadow
+    put_keys: Set[str] = field(default_factory=set)
+    _reader: Any = None
+    _mm: Optional[mmap.mmap] = None
+
+    @property
+    def dead_ratio(self) -> float:
+        if self.size == 0:
+            return 0.0
+        return 1.0 - (self.live_bytes / self.size)
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Read bytes through a read-only memory map, remapping on growth."""
+        if self._mm is None or offset + length > len(self._mm):
+            self._remap()
+        return self._mm[offset:offset + length]
+
+    def _remap(self):
+        if self._mm is not None:
+            self._mm.close()
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        self._mm = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+def _encode_expiry(expires_at: Optional[float]) -> float:
+    return -1.0 if expires_at is None else float(expires_at)
+
+
+def _decode_expiry(value: float) -> Optional[float]:
+    return None if value < 0 else value
+
+
+class SegmentStore:
+    """
+    Append-only key/value store made of size-bounded segment files.
+
+    Writes go to the active segment. When it reaches ``max_segment_bytes`` a
+    footer listing every record is appended and the segment is sealed, so on
+    startup the index is rebuilt from footers and only the unsealed tail has
+    to be scanned. Overwritten and deleted records are reclaimed by
+    compaction, which copies the live records of mostly-dead segments forward.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        compaction_threshold: float = 0.5,
+        compaction_interval_seconds: float = 60.0
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.compaction_threshold = compaction_threshold
+        self._lock = threading.RLock()
+        self._index: Dict[str, RecordLocation] = {}
+        self._segments: Dict[int, _Segment] = {}
+        self._active: Optional[_Segment] = None
+        self._writer = None
+        self._compactions = 0
+
+        self._load()
+
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+        if compaction_interval_seconds > 0:
+            self._compactor = threading.Thread(
+                target=self._compaction_loop,
+                args=(compaction_interval_seconds,),
+                name="nemesis-l3-compactor",
+                daemon=True
+            )
+            self._compactor.start()
+
+    # ------------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{segment_id:08d}{SEGMENT_SUFFIX}"
+
+    def _load(self):
+        """Rebuild the offset index from segment footers and the unsealed tail."""
+        segment_ids = sorted(
+            int(p.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for p in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")
+        )
+
+        for position, segment_id in enumerate(segment_ids):
+            segment = _Segment(segment_id=segment_id, path=self._segment_path(segment_id))
+            self._segments[segment_id] = segment
+
+            records = self._read_footer(segment)
+            if records is not None:
+                segment.sealed = True
+            else:
+                records = self._scan_segment(segment)
+
+            for op, key, value_offset, value_len, expires_at in records:
+                self._apply(segment, op, key, value_offset, value_len, expires_at)
+
+            is_last = position == len(segment_ids) - 1
+            if not segment.sealed:
+                segment.records = records
+                if is_last:
+                    self._open_active(segment)
+                else:
+                    self._seal(segment)
+
+        if self._active is None:
+            self._roll_segment()
+
+        if self._index:
+            logger.info(f"Loaded {len(self._index)} entries from {len(self._segments)} L3 segments")
+
+    def _read_footer(self, segment: _Segment) -> Optional[List[Tuple]]:
+        """Parse the footer of a sealed segment, or None if it has none."""
+        size = segment.path.stat().st_size
+        segment.size = size
+        if size < FOOTER_TRAILER.size:
+            return None
+
+        with open(segment.path, "rb") as f:
+            f.seek(size - FOOTER_TRAILER.size)
+            footer_offset, count, magic = FOOTER_TRAILER.unpack(f.read(FOOTER_TRAILER.size))
+            if magic != FOOTER_MAGIC or footer_offset > size:
+                return None
+
+            f.seek(footer_offset)
+            raw = f.read(size - FOOTER_TRAILER.size - footer_offset)
+
+        records = []
+        pos = 0
+        for _ in range(count):
+            op, key_len, value_offset, value_len, expires_at = FOOTER_ENTRY.unpack_from(raw, pos)
+            pos += FOOTER_ENTRY.size
+            key = raw[pos:pos + key_len].decode()
+            pos += key_len
+            records.append((op, key, value_offset, value_len, _decode_expiry(expires_at)))
+
+        # Footer bytes are never live data
+        segment.size = footer_offset
+        return records
+
+    def _scan_segment(self, segment: _Segment) -> List[Tuple]:
+        """Scan records sequentially, truncating a torn tail."""
+        records = []
+        pos = 0
+        with open(segment.path, "r+b") as f:
+            data = f.read()
+            while pos + RECORD_HEADER.size <= len(data):
+                op, key_len, value_len, expires_at, crc = RECORD_HEADER.unpack_from(data, pos)
+                body_start = pos + RECORD_HEADER.size
+                body_end = body_start + key_len + value_len
+                if op not in (OP_PUT, OP_DEL) or body_end > len(data):
+                    break
+                body = data[body_start:body_end]
+                if zlib.crc32(body) != crc:
+                    break
+                key = body[:key_len].decode()
+                records.append((op, key, body_start + key_len, value_len, _decode_expiry(expires_at)))
+                pos = body_end
+
+            if pos < len(data):
+                logger.warning(f"Truncating {len(data) - pos} torn bytes from {segment.path.name}")
+                f.truncate(pos)
+
+        segment.size = pos
+        return records
+
+    def _apply(self, segment: _Segment, op: int, key: str, value_offset: int,
+               value_len: int, expires_at: Optional[float]):
+        """Apply one record to the index during replay."""
+        record_size = RECORD_HEADER.size + len(key.encode()) + value_len
+        self._drop_location(key)
+        if op == OP_PUT:
+            self._index[key] = RecordLocation(segment.segment_id, value_offset, value_len,
+                                              expires_at, record_size)
+            segment.live_bytes += record_size
+            segment.put_keys.add(key)
+
+    # ------------------------------------------------------------------
+    # Segment management
+    # ------------------------------------------------------------------
+
+    def _open_active(self, segment: _Segment):
+        self._active = segment
+        self._writer = open(segment.path, "ab")
+
+    def _roll_segment(self):
+        """Seal the active segment (if any) and start a new one."""
+        if self._active is not None:
+            self._seal(self._active)
+            self._writer.close()
+            self._writer = None
+
+        next_id = max(self._segments, default=0) + 1
+        segment = _Segment(segment_id=next_id, path=self._segment_path(next_id))
+        segment.path.touch()
+        self._segments[next_id] = segment
+        self._open_active(segment)
+
+    def _seal(self, segment: _Segment):
+        """Append the footer so the segment can be indexed without a scan."""
+        parts = []
+        for op, key, value_offset, value_len, expires_at in segment.records:
+            key_bytes = key.encode()
+            parts.append(FOOTER_ENTRY.pack(op, len(key_bytes), value_offset, value_len,
+                                           _encode_expiry(expires_at)))
+            parts.append(key_bytes)
+        footer = b"".join(parts)
+
+        if segment is self._active and self._writer is not None:
+            self._writer.flush()
+        with open(segment.path, "ab") as f:
+            f.write(footer)
+            f.write(FOOTER_TRAILER.pack(segment.size, len(segment.records), FOOTER_MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+
+        segment.records = []
+        segment.sealed = True
+
+    def _drop_location(self, key: str):
+        """Forget the current record for key, accounting it as dead."""
+        location = self._index.pop(key, None)
+        if location is not None:
+            segment = self._segments.get(location.segment_id)
+            if segment is not None:
+                segment.live_bytes -= location.record_size
+
+    def _append(self, op: int, key: str, value: bytes, expires_at: Optional[float]) -> RecordLocation:
+        """Append a record to the active segment."""
+        if self._active.size >= self.max_segment_bytes:
+            self._roll_segment()
+
+        segment = self._active
+        key_bytes = key.encode()
+        body = key_bytes + value
+        header = RECORD_HEADER.pack(op, len(key_bytes), len(value), _encode_expiry(expires_at),
+                                    zlib.crc32(body))
+        self._writer.write(header)
+        self._writer.write(body)
+        self._writer.flush()
+
+        value_offset = segment.size + RECORD_HEADER.size + len(key_bytes)
+        segment.size += len(header) + len(body)
+        segment.records.append((op, key, value_offset, len(value), expires_at))
+        if op == OP_PUT:
+            segment.put_keys.add(key)
+        return RecordLocation(segment.segment_id, value_offset, len(value), expires_at,
+                              len(header) + len(body))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            location = self._index.get(key)
+            if location is None:
+                return None
+            segment = self._segments[location.segment_id]
+            return segment.read(location.value_offset, location.value_len)
+
+    def location(self, key: str) -> Optional[RecordLocation]:
+        with self._lock:
+            return self._index.get(key)
+
+    def put(self, key: str, value: bytes, expires_at: Optional[float] = None):
+        with self._lock:
+            self._drop_location(key)
+            location = self._append(OP_PUT, key, value, expires_at)
+            self._index[key] = location
+            self._segments[location.segment_id].live_bytes += location.record_size
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._index:
+                return False
+            self._drop_location(key)
+            self._append(OP_DEL, key, b"", None)
+            return True
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._index.keys())
+
+    def items(self) -> Iterator[Tuple[str, RecordLocation]]:
+        with self._lock:
+            return iter(list(self._index.items()))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def live_bytes(self) -> int:
+        with self._lock:
+            return sum(s.live_bytes for s in self._segments.values())
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(s.size for s in self._segments.values())
+
+    def flush(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush()
+                os.fsync(self._writer.fileno())
+
+    def clear(self):
+        with self._lock:
+            self._close_files()
+            for segment in self._segments.values():
+                segment.path.unlink(missing_ok=True)
+            self._segments.clear()
+            self._index.clear()
+            self._active = None
+            self._roll_segment()
+
+    def close(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join(timeout=5)
+        with self._lock:
+            self.flush()
+            self._close_files()
+
+    def _close_files(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for segment in self._segments.values():
+            segment.close()
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _compaction_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"L3 segment compaction failed: {e}")
+
+    def compact(self) -> int:
+        """Rewrite sealed segments whose dead ratio exceeds the threshold."""
+        with self._lock:
+            candidates = [
+                s.segment_id for s in self._segments.values()
+                if s.sealed and s.dead_ratio >= self.compaction_threshold
+            ]
+        compacted = 0
+        for segment_id in candidates:
+            # One segment per lock acquisition keeps reads and writes flowing
+            with self._lock:
+                if segment_id in self._segments:
+                    self._compact_segment(self._segments[segment_id])
+                    compacted += 1
+        return compacted
+
+    def _compact_segment(self, segment: _Segment):
+        records = self._read_footer(segment)
+        if records is None:
+            return
+
+        moved = 0
+        for op, key, value_offset, value_len, expires_at in records:
+            location = self._index.get(key)
+            if op == OP_PUT:
+                if (location is None or location.segment_id != segment.segment_id
+                        or location.value_offset != value_offset):
+                    continue
+                value = segment.read(value_offset, value_len)
+                del self._index[key]
+                new_location = self._append(OP_PUT, key, value, expires_at)
+                self._index[key] = new_location
+                self._segments[new_location.segment_id].live_bytes += new_location.record_size
+                moved += 1
+            elif location is None and self._older_put_exists(key, segment.segment_id):
+                # Carry the tombstone forward only while it still shadows a put
+                self._append(OP_DEL, key, b"", None)
+
+        # The moved records must be durable before their only other copy goes
+        self.flush()
+        segment.close()
+        del self._segments[segment.segment_id]
+        segment.path.unlink(missing_ok=True)
+        self._compactions += 1
+        logger.debug(f"Compacted L3 segment {segment.segment_id} ({moved} live records moved)")
+
+    def _older_put_exists(self, key: str, segment_id: int) -> bool:
+        """Whether a segment older than ``segment_id`` still holds a put for key."""
+        return any(other.segment_id < segment_id and key in other.put_keys
+                   for other in self._segments.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(s.size for s in self._segments.values())
+            live = sum(s.live_bytes for s in self._segments.values())
+            return {
+                "segments": len(self._segments),
+                "live_bytes": live,
+                "dead_bytes": total - live,
+                "compactions": self._compactions
+            }
+
+
+class L3SegmentCache(CacheLevel):
+    """
+    L3 Cache - Log-structured disk cache.
+    Same role as L3DiskCache, but sets are O(1) sequential appends
+    instead of one file per key plus a full index rewrite. The byte budget
+    applies to live records; dead ones are reclaimed by compaction.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = ".cache/l3",
+        max_size_mb: float = 1000,
+        max_segment_mb: float = 64,
+        compaction_threshold: float = 0.5,
+        compaction_interval_seconds: float = 60.0,
+        access_flush_interval_seconds: float = 5.0,
+        codec: Union[None, str, ValueCodec] = None,
+        eviction_policy: Union[str, EvictionPolicy] = "lru",
+        low_watermark: Optional[float] = None,
+        high_watermark: Optional[float] = None,
+        janitor_interval_seconds: float = 30.0
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._codec = create_codec(codec, dictionary_path=self.cache_dir / "zstd.dict")
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        self._store = SegmentStore(
+            str(self.cache_dir / "segments"),
+            max_segment_bytes=int(max_segment_mb * 1024 * 1024),
+            compaction_threshold=compaction_threshold,
+            compaction_interval_seconds=compaction_interval_seconds
+        )
+        self._access = AccessJournal(
+            self.cache_dir / "access.journal",
+            flush_interval_seconds=access_flush_interval_seconds
+        )
+        self._policy = create_policy(eviction_policy, max(1000, 2 * len(self._store)))
+        self._restore_policy()
+
+        self._janitor: Optional[CapacityJanitor] = None
+        if high_watermark is not None:
+            self._janitor = CapacityJanitor(self, low=low_watermark or high_watermark * 0.8,
+                                            high=high_watermark,
+                                            interval_seconds=janitor_interval_seconds)
+
+    def _restore_policy(self):
+        """Feed existing keys to the policy, least recently used first."""
+        def last_used(item):
+            access = self._access.lookup(item[0])
+            return access[0] if access else 0
+
+        for key, location in sorted(self._store.items(), key=last_used):
+            self._policy.record_insert(key, location.record_size)
+
+    def _get_locked(self, key: str) -> Optional[CacheEntry]:
+        try:
+            raw = self._store.get(key)
+        except Exception as e:
+            logger.error(f"Failed to read L3 cache entry: {e}")
+            raw = None
+
+        if raw is None:
+            self._misses += 1
+            return None
+
+        try:
+            entry = CacheEntry.from_dict(json.loads(self._codec.decode(raw)))
+        except Exception as e:
+            logger.error(f"Failed to decode L3 cache entry: {e}")
+            self._misses += 1
+            return None
+
+        if entry.is_expired:
+            self._store.delete(key)
+            self._access.forget(key)
+            self._policy.record_remove(key)
+            self._expired += 1
+            self._misses += 1
+            return None
+
+        self._access.apply(entry)
+        entry.touch()
+        self._hits += 1
+        self._policy.record_access(key)
+        self._access.record(key, entry.accessed_at, entry.hit_count)
+        return entry
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._get_locked(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._get_locked(key)
+                if entry is not None:
+                    found[key] = entry
+        return found
+
+    def set(self, key: str, entry: CacheEntry):
+        self.set_many({key: entry})
+
+    def set_many(self, entries: Dict[str, CacheEntry]):
+        # Encode before taking the lock; appends are then sequential writes
+        encoded = []
+        for key, entry in entries.items():
+            try:
+                data = json.dumps(entry.to_dict(), default=str).encode()
+                encoded.append((key, self._codec.encode(data), entry.expires_at))
+            except Exception as e:
+                logger.error(f"Failed to encode L3 cache entry: {e}")
+        with self._lock:
+            for key, data, expires_at in encoded:
+                try:
+                    existed = self._store.location(key) is not None
+                    self._store.put(key, data, expires_at)
+                except Exception as e:
+                    logger.error(f"Failed to write L3 cache entry: {e}")
+                    continue
+                if existed:
+                    self._policy.record_access(key)
+                else:
+                    self._policy.record_insert(key, len(data), entries[key].cost)
+            self._evict_locked(self.max_size_bytes)
+
+    def _evict_locked(self, target_bytes: float) -> int:
+        evicted = 0
+        while self._store.live_bytes() > target_bytes and len(self._store):
+            victim = self._policy.victim()
+            if victim is None:
+                break
+            self._access.forget(victim)
+            if self._store.delete(victim):
+                evicted += 1
+        self._evictions += evicted
+        return evicted
+
+    def used_bytes(self) -> int:
+        return self._store.live_bytes()
+
+    def evict_to(self, target_bytes: float) -> int:
+        """Evict in policy order until live records fit in ``target_bytes``."""
+        with self._lock:
+            return self._evict_locked(target_bytes)
+
+    def delete(self, key: str) -> bool:
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: List[str]) -> int:
+        with self._lock:
+            deleted = 0
+            for key in keys:
+                self._access.forget(key)
+                self._policy.record_remove(key)
+                deleted += self._store.delete(key)
+            return deleted
+
+    def contains(self, key: str) -> bool:
+        return self._store.location(key) is not None
+
+    def expire_many(self, keys: List[str], now: float) -> List[str]:
+        removed = []
+        with self._lock:
+            for key in keys:
+                location = self._store.location(key)
+                if location is None or location.expires_at is None or location.expires_at > now:
+                    continue
+                self._store.delete(key)
+                self._access.forget(key)
+                self._policy.record_remove(key)
+                removed.append(key)
+            self._expired += len(removed)
+        return removed
+
+    def iter_expiry(self) -> List[Tuple[str, float]]:
+        return [(key, location.expires_at) for key, location in self._store.items()
+                if location.expires_at is not None]
+
+    def iter_access(self) -> List[Tuple[str, float, int]]:
+        with self._lock:
+            return [(key, accessed_at, hit_count)
+                    for key, (accessed_at, hit_count) in self._access.snapshot().items()
+                    if self._store.location(key) is not None]
+
+    def clear(self):
+        with self._lock:
+            self._access.clear()
+            self._store.clear()
+            self._policy.clear()
+
+    def compact(self) -> int:
+        """Reclaim space held by overwritten and deleted records."""
+        return self._store.compact()
+
+    def persist(self):
+        """Flush pending access metadata and the active segment."""
+        self._access.flush()
+        self._store.flush()
+
+    def close(self):
+        if self._janitor is not None:
+            self._janitor.close()
+        self._access.close()
+        self._store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            store_stats = self._store.stats()
+            stats = {
+                "level": "L3",
+                "type": "segments",
+                "entries": len(self._store),
+                "size_mb": store_stats["live_bytes"] / (1024 * 1024),
+                "max_size_mb": self.max_size_bytes / (1024 * 1024),
+                "segments": store_stats["segments"],
+                "dead_mb": store_stats["dead_bytes"] / (1024 * 1024),
+                "compactions": store_stats["compactions"],
+                "eviction": self._policy.stats(),
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total > 0 else 0,
+                "access_journal": self._access.stats(),
+                "codec": self._codec.stats()
+            }
+            if self._janitor is not None:
+                stats["janitor"] = self._janitor.stats()
+            return stats
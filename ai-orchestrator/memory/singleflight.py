@@ -0,0 +1,113 @@
+"""
+NEMESIS Single-Flight - Request coalescing for concurrent cache misses.
+Concurrent callers asking for the same key share one in-flight
+computation instead of each running it.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    """An in-flight computation shared by a leader and its waiters."""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Thread-based single-flight group.
+    The first caller for a key runs ``fn``; callers arriving while it runs
+    block until it finishes and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run ``fn`` once per key at a time; waiters give up after ``timeout`` seconds."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.waiters += 1
+                self._coalesced += 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight call: {key}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "coalesced": self._coalesced}
+
+
+class AsyncSingleFlight:
+    """
+    asyncio single-flight group.
+    Same contract as SingleFlight for coroutines; calls are grouped per
+    event loop, and a waiter timing out does not cancel the leader.
+    """
+
+    def __init__(self):
+        self._futures: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 timeout: Optional[float] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        future = self._futures.get(flight_key)
+        if future is not None:
+            self._coalesced += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight call: {key}")
+
+        future = loop.create_future()
+        self._futures[flight_key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a leader without waiters does not log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._futures.pop(flight_key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._futures), "coalesced": self._coalesced}
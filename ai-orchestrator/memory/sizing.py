@@ -0,0 +1,81 @@
+"""
+NEMESIS Cache Sizing - Cheap size estimates for L1 memory accounting.
+A sizer maps a cached value to an approximate size in bytes.
+"""
+import json
+from itertools import islice
+from sys import getsizeof
+from typing import Any, Callable, Union
+
+Sizer = Callable[[Any], int]
+
+_CONTAINERS = frozenset((dict, list, tuple, set, frozenset))
+
+
+def json_size(value: Any) -> int:
+    """Exact serialized size. Costs as much as serializing the value."""
+    return len(json.dumps(value, default=str).encode())
+
+
+class DeepSizer:
+    """
+    Bounded recursive ``sys.getsizeof`` walk.
+    Stops descending at ``max_depth`` and extrapolates large containers
+    from their first ``max_items`` elements, so the cost is capped
+    regardless of value size.
+    """
+
+    def __init__(self, max_depth: int = 4, max_items: int = 64):
+        self.max_depth = max_depth
+        self.max_items = max_items
+
+    def __call__(self, value: Any) -> int:
+        return self._size(value, 0)
+
+    def _size(self, value: Any, depth: int) -> int:
+        size = getsizeof(value)
+        kind = type(value)
+        if depth >= self.max_depth or kind not in _CONTAINERS:
+            return size
+
+        count = len(value)
+        items = value.items() if kind is dict else value
+        children = 0
+        sampled = 0
+        for item in islice(items, self.max_items):
+            if kind is dict:
+                children += self._size(item[0], depth + 1) + self._size(item[1], depth + 1)
+            else:
+                children += self._size(item, depth + 1)
+            sampled += 1
+
+        if sampled and sampled < count:
+            children = children * count // sampled
+        return size + children
+
+
+_default_deep_sizer = DeepSizer()
+
+
+def fast_size(value: Any) -> int:
+    """O(1) for str and bytes, bounded deep walk for everything else."""
+    kind = type(value)
+    if kind is str or kind is bytes or kind is bytearray:
+        return len(value)
+    return _default_deep_sizer(value)
+
+
+SIZERS = {
+    "json": json_size,
+    "deep": _default_deep_sizer,
+    "fast": fast_size,
+}
+
+
+def create_sizer(sizer: Union[str, Sizer]) -> Sizer:
+    """Resolve a sizer by name, or accept any callable."""
+    if callable(sizer):
+        return sizer
+    if sizer not in SIZERS:
+        raise ValueError(f"Unknown sizer: {sizer}")
+    return SIZERS[sizer]
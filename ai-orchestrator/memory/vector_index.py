@@ -0,0 +1,331 @@
+"""
+NEMESIS Vector Index - Local embeddings and approximate nearest-neighbour
+recall for long-term memory. Text is embedded by signed feature hashing,
+so no model or network service is needed, and vectors are searched with
+an inverted-file (IVF) index. Requires NumPy.
+"""
+import os
+import re
+import math
+import zlib
+import threading
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+# Optional NumPy support
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+_WORD = re.compile(r"\w+")
+# Rows scored per matrix product, to bound temporary memory
+_CHUNK = 65536
+
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise ImportError("NumPy is required for the vector index: pip install numpy")
+
+
+def vector_to_blob(vector: Any) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def blob_to_vector(blob: bytes) -> "np.ndarray":
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class HashingEmbedder:
+    """
+    Embeds text by hashing words and their character n-grams into ``dim``
+    signed buckets, with sublinear term weights and L2 normalization.
+    N-grams let "deploy" and "deployment" share features. CRC32 keeps the
+    hashing stable across processes, so stored vectors stay comparable.
+    """
+
+    def __init__(self, dim: int = 256, ngram: int = 4, ngram_weight: float = 0.5):
+        _require_numpy()
+        self.dim = dim
+        self.ngram = ngram
+        self.ngram_weight = ngram_weight
+
+    def _features(self, text: str) -> Dict[str, float]:
+        counts: Dict[str, float] = {}
+        for word in _WORD.findall(text.lower()):
+            counts[word] = counts.get(word, 0.0) + 1.0
+            if len(word) > self.ngram:
+                padded = f"<{word}>"
+                for i in range(len(padded) - self.ngram + 1):
+                    gram = "#" + padded[i:i + self.ngram]
+                    counts[gram] = counts.get(gram, 0.0) + self.ngram_weight
+        return counts
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Unit-length float32 vector; all zeros for text without words."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            hashed = zlib.crc32(feature.encode())
+            weight = 1.0 + math.log(count) if count > 1.0 else count
+            vector[hashed % self.dim] += weight if hashed & 0x80000000 else -weight
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class VectorIndex:
+    """
+    Inverted-file index over unit vectors, keyed by memory id.
+    Until train() has run, searches are exact. Training splits the vectors
+    into ~sqrt(n) lists by spherical k-means, after which a search scores
+    only the vectors in the ``nprobe`` lists nearest the query. Adds and
+    removes are incremental. needs_training turns true at
+    ``train_threshold`` vectors and again once the index has grown 4x since
+    the last training; the owner decides when to call train(), so no add
+    pays for it.
+    """
+
+    def __init__(self, dim: int, nprobe: int = 8, train_threshold: int = 1024,
+                 kmeans_iterations: int = 10, seed: int = 0):
+        _require_numpy()
+        self.dim = dim
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.kmeans_iterations = kmeans_iterations
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.RLock()
+        self._train_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        # List per slot; -1 marks a free slot
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._ids: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._centroids: Optional["np.ndarray"] = None
+        self._trained_size = 0
+        # Slots written while train() runs outside the lock; None when not training
+        self._changed: Optional[Set[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def ids(self) -> Set[str]:
+        with self._lock:
+            return set(self._slots)
+
+    def _grow(self, needed: int):
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:len(self._vectors)] = self._vectors
+        assign = np.full(capacity, -1, dtype=np.int32)
+        assign[:len(self._assign)] = self._assign
+        self._vectors, self._assign = vectors, assign
+
+    def _nearest_list(self, vectors: "np.ndarray",
+                      centroids: Optional["np.ndarray"] = None) -> "np.ndarray":
+        centroids = self._centroids if centroids is None else centroids
+        if centroids is None:
+            return np.zeros(len(vectors), dtype=np.int32)
+        lists = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _CHUNK):
+            block = vectors[start:start + _CHUNK]
+            lists[start:start + _CHUNK] = np.argmax(block @ centroids.T, axis=1)
+        return lists
+
+    def add_many(self, ids: Sequence[str], vectors: Any):
+        """Add or replace vectors for ``ids``."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        with self._lock:
+            slots = []
+            for memory_id in ids:
+                slot = self._slots.get(memory_id)
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                        self._ids[slot] = memory_id
+                    else:
+                        slot = len(self._ids)
+                        self._ids.append(memory_id)
+                    self._slots[memory_id] = slot
+                slots.append(slot)
+            self._grow(len(self._ids))
+            if self._changed is not None:
+                self._changed.update(slots)
+            slots = np.asarray(slots, dtype=np.int64)
+            self._vectors[slots] = vectors
+            self._assign[slots] = self._nearest_list(vectors)
+
+    def remove_many(self, ids: Sequence[str]) -> int:
+        removed = 0
+        with self._lock:
+            for memory_id in ids:
+                slot = self._slots.pop(memory_id, None)
+                if slot is not None:
+                    self._ids[slot] = None
+                    self._assign[slot] = -1
+                    self._free.append(slot)
+                    if self._changed is not None:
+                        self._changed.add(slot)
+                    removed += 1
+        return removed
+
+    @property
+    def needs_training(self) -> bool:
+        return len(self._slots) >= max(self.train_threshold, 4 * self._trained_size)
+
+    def train(self) -> int:
+        """
+        Spherical k-means on a sample, then reassign every vector. Runs
+        outside the index lock, so adds and searches continue against the
+        current lists meanwhile; slots written during training are
+        reassigned when the new lists are swapped in. Returns the number of
+        lists, or 0 if another train() is running.
+        """
+        if not self._train_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                live = np.flatnonzero(self._assign[:len(self._ids)] >= 0)
+                if not len(live):
+                    return 0
+                nlist = max(1, int(math.sqrt(len(live))))
+                sample = live
+                if len(live) > nlist * 64:
+                    sample = self._rng.choice(live, nlist * 64, replace=False)
+                data = self._vectors[sample]
+                # Rows are only overwritten in place while unlocked; a
+                # reallocation by _grow() leaves this array as it was
+                vectors = self._vectors
+                self._changed = set()
+
+            centroids = data[self._rng.choice(len(data), nlist, replace=False)].copy()
+            for _ in range(self.kmeans_iterations):
+                labels = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, data)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # An empty list keeps its previous centroid
+                filled = norms[:, 0] > 0
+                centroids[filled] = sums[filled] / norms[filled]
+            assign = np.empty(len(live), dtype=np.int32)
+            for start in range(0, len(live), _CHUNK):
+                block = live[start:start + _CHUNK]
+                assign[start:start + _CHUNK] = self._nearest_list(vectors[block], centroids)
+
+            with self._lock:
+                if self._changed is None:
+                    # load() replaced the index meanwhile
+                    return 0
+                changed = np.fromiter(self._changed, dtype=np.int64, count=len(self._changed))
+                self._changed = None
+                self._centroids = centroids
+                keep = ~np.isin(live, changed)
+                self._assign[live[keep]] = assign[keep]
+                changed = changed[self._assign[changed] >= 0]
+                self._assign[changed] = self._nearest_list(self._vectors[changed])
+                self._trained_size = len(live)
+        finally:
+            self._train_lock.release()
+        logger.debug(f"Trained vector index: {len(live)} vectors in {nlist} lists")
+        return nlist
+
+    def search(self, vector: Any, k: int) -> List[Tuple[str, float]]:
+        """Up to ``k`` (id, cosine similarity) pairs, most similar first."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            if not self._slots or k <= 0:
+                return []
+            assign = self._assign[:len(self._ids)]
+            if self._centroids is None:
+                candidates = np.flatnonzero(assign >= 0)
+            else:
+                nprobe = min(self.nprobe, len(self._centroids))
+                closeness = self._centroids @ vector
+                probe = np.argpartition(-closeness, nprobe - 1)[:nprobe]
+                candidates = np.flatnonzero(np.isin(assign, probe))
+            if not len(candidates):
+                return []
+
+            scores = self._vectors[candidates] @ vector
+            top = np.arange(len(scores))
+            if k < len(scores):
+                top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._ids[candidates[i]], float(scores[i])) for i in top]
+
+    def save(self, path: Union[str, Path]) -> bool:
+        """Write the index atomically next to the database."""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with self._lock:
+            live = np.flatnonzero(self._assign[:len(self._ids)] >= 0)
+            ids = np.array([self._ids[slot] for slot in live], dtype=str)
+            vectors = self._vectors[live]
+            centroids = self._centroids if self._centroids is not None \
+                else np.zeros((0, self.dim), dtype=np.float32)
+            trained_size = self._trained_size
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, version=np.array(INDEX_VERSION), dim=np.array(self.dim),
+                         ids=ids, vectors=vectors, centroids=centroids,
+                         trained_size=np.array(trained_size))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to save vector index: {e}")
+            return False
+        return True
+
+    def load(self, path: Union[str, Path]) -> bool:
+        """Replace the index with a saved one. False if missing or incompatible."""
+        path = Path(path)
+        if not path.exists():
+            return False
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != INDEX_VERSION or int(data["dim"]) != self.dim:
+                    logger.info(f"Ignoring vector index {path}: built with other settings")
+                    return False
+                ids = [str(memory_id) for memory_id in data["ids"]]
+                vectors = data["vectors"].astype(np.float32)
+                centroids = data["centroids"].astype(np.float32)
+                trained_size = int(data["trained_size"])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable vector index {path}: {e}")
+            return False
+
+        with self._lock:
+            self._reset()
+            self._centroids = centroids if len(centroids) else None
+            self._trained_size = trained_size
+            self._ids = list(ids)
+            self._slots = {memory_id: slot for slot, memory_id in enumerate(ids)}
+            self._grow(len(ids))
+            self._vectors[:len(ids)] = vectors
+            self._assign[:len(ids)] = self._nearest_list(vectors)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "vectors": len(self._slots),
+                "dim": self.dim,
+                "lists": len(self._centroids) if self._centroids is not None else 0,
+                "nprobe": self.nprobe,
+                "trained_size": self._trained_size,
+                "needs_training": self.needs_training
+            }
@@ -43,6 +43,95 @@ def color(text: str, c: str) -> str:
     return f"{c}{text}{Colors.ENDC}"
 
 
+# =============================================================================
+# Configuration
+# =============================================================================
+
+CONFIG_PATH = Path(__file__).parent / "config.yaml"
+
+
+def _load_config() -> Dict[str, Any]:
+    """config.yaml as a dict; empty (all defaults) if missing or unreadable."""
+    if not CONFIG_PATH.exists():
+        return {}
+    try:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except (yaml.YAMLError, OSError) as e:
+        logger.warning(f"Could not read {CONFIG_PATH}, using defaults: {e}")
+        return {}
+
+
+def _data_path(path: str) -> str:
+    """Resolve a configured path against the NEMESIS directory, creating its parent."""
+    resolved = Path(path).expanduser()
+    if not resolved.is_absolute():
+        resolved = Path(__file__).parent / resolved
+    resolved.parent.mkdir(parents=True, exist_ok=True)
+    return str(resolved)
+
+
+def _open_memory(config: Dict[str, Any]):
+    """LongTermMemory built from the ``memory`` section of config.yaml."""
+    from memory.ltm import LongTermMemory
+
+    memory = config.get("memory") or {}
+    consolidation = memory.get("consolidation") or {}
+    maintenance = memory.get("maintenance") or {}
+    return LongTermMemory(
+        db_path=_data_path(memory.get("db_path", "data/nemesis_memory.db")),
+        default_ttl_hours=memory.get("default_ttl_hours", 24 * 30),
+        cleanup_interval_hours=memory.get("cleanup_interval_hours", 1.0),
+        access_flush_interval_seconds=maintenance.get("access_flush_interval_seconds", 30.0),
+        maintenance=maintenance.get("enabled", True),
+        expire_batch_size=maintenance.get("expire_batch_size", 1000),
+        consolidate_interval_hours=consolidation.get("interval_hours", 24.0)
+        if consolidation.get("enabled", True) else 0,
+        optimize_interval_hours=maintenance.get("optimize_interval_hours", 6.0),
+        checkpoint_interval_seconds=maintenance.get("checkpoint_interval_seconds", 300.0),
+        vacuum_interval_hours=maintenance.get("vacuum_interval_hours", 24.0),
+        vacuum_pages=maintenance.get("vacuum_pages", 1000),
+        vector_train_interval_seconds=maintenance.get("vector_train_interval_seconds", 60.0)
+    )
+
+
+def _open_cache(config: Dict[str, Any], hotset: bool = True):
+    """
+    ContextCache built from the ``cache`` section of config.yaml. With
+    ``hotset`` off the hot set is neither prewarmed nor recorded, so
+    short-lived commands leave the persisted cache state alone.
+    """
+    from memory.cache import ContextCache
+
+    cache = config.get("cache") or {}
+    l1, l2, l3 = (cache.get(level) or {} for level in ("l1", "l2", "l3"))
+    persistence_file = l2.get("persistence_file")
+    return ContextCache(
+        l1_size=l1.get("max_size", 1000),
+        l1_memory_mb=l1.get("max_memory_mb", 100),
+        l1_shards=l1.get("shards", 1),
+        l2_size=l2.get("max_size", 10000),
+        l2_persistence=_data_path(persistence_file) if persistence_file else None,
+        l2_fsync=l2.get("fsync", "everysec"),
+        l2_snapshot_interval_seconds=l2.get("snapshot_interval_seconds", 300.0),
+        l2_codec=l2.get("codec"),
+        l2_socket=l2.get("socket"),
+        l3_backend=l3.get("backend", "files"),
+        l3_codec=l3.get("codec"),
+        l3_dir=_data_path(l3.get("cache_dir", ".cache/l3")),
+        l3_size_mb=l3.get("max_size_mb", 1000),
+        l3_low_watermark=l3.get("low_watermark"),
+        l3_high_watermark=l3.get("high_watermark"),
+        default_ttl_seconds=cache.get("default_ttl_seconds", 3600),
+        # 0 in the config means expire on read only
+        expiry_tick_seconds=cache.get("expiry_tick_seconds") or None,
+        metrics=cache.get("metrics", False),
+        hotset_size=cache.get("hotset_size", 0) if hotset else 0,
+        refresh_workers=cache.get("refresh_workers", 2),
+        refresh_queue_size=cache.get("refresh_queue_size", 64)
+    )
+
+
 # =============================================================================
 # CLI Commands
 # =============================================================================
@@ -166,9 +255,9 @@ def cmd_verify(args):
 
 def cmd_memory(args):
     """Manage long-term memory."""
-    from memory.ltm import LongTermMemory, MemoryType, AccessLevel
+    from memory.ltm import MemoryType, AccessLevel
 
-    ltm = LongTermMemory()
+    ltm = _open_memory(_load_config())
 
     if args.action == "stats":
         print(color("\n=== NEMESIS Memory Stats ===", Colors.HEADER))
@@ -187,13 +276,19 @@ def cmd_memory(args):
         entry = ltm.store(
             content=args.content,
             memory_type=MemoryType(args.type or "fact"),
+            tags=args.tags.split(",") if args.tags else None,
             importance=args.importance or 0.5
         )
         print(f"{color('Stored:', Colors.GREEN)} {entry.id}")
 
     elif args.action == "search":
         print(color(f"\n=== Memory Search: {args.query} ===", Colors.HEADER))
-        results = ltm.search(query=args.query, limit=args.limit or 10)
+        results = ltm.search(
+            query=args.query,
+            tags=args.tags.split(",") if args.tags else None,
+            match_all_tags=args.all_tags,
+            limit=args.limit or 10
+        )
         for entry in results:
             print(f"\n{color(entry.id, Colors.CYAN)} ({entry.memory_type.value})")
             print(f"  Content: {str(entry.content)[:100]}...")
@@ -203,22 +298,53 @@ def cmd_memory(args):
         ltm.consolidate()
         print(color("Memory consolidation complete", Colors.GREEN))
 
+    elif args.action == "enable-vacuum":
+        if ltm.enable_incremental_vacuum():
+            print(color("Memory database converted to incremental auto-vacuum", Colors.GREEN))
+        else:
+            print("Memory database already uses incremental auto-vacuum")
+
+    elif args.action == "maintain":
+        print(color("\n=== NEMESIS Memory Maintenance ===", Colors.HEADER))
+        ltm.run_maintenance()
+        for job, timing in ltm.get_stats()['maintenance'].items():
+            print(f"  {job}: {timing['last_ms']:.1f}ms (result: {timing['last_result']})")
+
+    ltm.close()
+
 
 def cmd_cache(args):
     """Manage cache."""
-    from memory.cache import ContextCache
-
-    cache = ContextCache()
+    # A prewarm would promote L3 entries and journal their hits while the
+    # stats below are read
+    cache = _open_cache(_load_config(), hotset=False)
 
     if args.action == "stats":
         print(color("\n=== NEMESIS Cache Stats ===", Colors.HEADER))
         stats = cache.stats()
 
-        for level, level_stats in stats.items():
+        for level in ("l1", "l2", "l3"):
+            level_stats = stats[level]
             print(f"\n{color(level.upper(), Colors.BLUE)} ({level_stats['type']}):")
             print(f"  Entries: {level_stats['entries']}")
             print(f"  Hits: {level_stats['hits']} | Misses: {level_stats['misses']}")
             print(f"  Hit Rate: {level_stats['hit_rate']:.2%}")
+            print(f"  Evicted: {level_stats.get('evictions', 0)} (capacity) | "
+                  f"{level_stats.get('expired', 0)} (expired)")
+            # Only a shared cache daemon has served traffic worth timing; this
+            # process's own cache was just created
+            daemon_metrics = level_stats.get("metrics")
+            if daemon_metrics:
+                print(f"  Daemon requests: {level_stats.get('requests', 0)}")
+                for op, latency in daemon_metrics["latency"].get(level, {}).items():
+                    print(f"  {op}: p50 {latency['p50_ms']:.3f}ms | p95 {latency['p95_ms']:.3f}ms | "
+                          f"p99 {latency['p99_ms']:.3f}ms ({latency['count']} ops)")
+
+        if "expiry" in stats:
+            expiry = stats["expiry"]
+            print(f"\n{color('EXPIRY', Colors.BLUE)} (tick {expiry['tick_seconds']}s):")
+            print(f"  Pending: {expiry['pending']} | Expired: {sum(expiry['expired'].values())}")
+            print(f"  Lag: avg {expiry['lag_ms']['avg']:.0f}ms | max {expiry['lag_ms']['max']:.0f}ms")
 
     elif args.action == "clear":
         levels = args.levels.split(',') if args.levels else None
@@ -229,6 +355,8 @@ def cmd_cache(args):
         cache.persist()
         print(color("L2 cache persisted to disk", Colors.GREEN))
 
+    cache.close()
+
 
 def cmd_stats(args):
     """Show system statistics."""
@@ -255,7 +383,7 @@ def cmd_stats(args):
 
 def cmd_config(args):
     """Show/edit configuration."""
-    config_path = Path(__file__).parent / "config.yaml"
+    config_path = CONFIG_PATH
 
     if args.action == "show":
         print(color("\n=== NEMESIS Configuration ===", Colors.HEADER))
@@ -377,6 +505,7 @@ def cmd_demo(args):
 
     retrieved = ltm.retrieve(entry.id)
     print(f"  Retrieved: {retrieved.content}")
+    ltm.close()
 
     # Demo 5: Cache
     print(color("\n=== Demo 5: Multi-Level Cache ===", Colors.HEADER))
@@ -545,12 +674,16 @@ Examples:
 
     # Memory command
     memory_parser = subparsers.add_parser("memory", help="Manage memory")
-    memory_parser.add_argument("action", choices=["stats", "store", "search", "consolidate"])
+    memory_parser.add_argument("action", choices=["stats", "store", "search", "consolidate",
+                                                  "maintain", "enable-vacuum"])
     memory_parser.add_argument("--content", help="Content to store")
     memory_parser.add_argument("--query", "-q", help="Search query")
     memory_parser.add_argument("--type", help="Memory type")
     memory_parser.add_argument("--importance", type=float, help="Importance score")
     memory_parser.add_argument("--limit", type=int, help="Result limit")
+    memory_parser.add_argument("--tags", help="Tags (comma-separated)")
+    memory_parser.add_argument("--all-tags", action="store_true",
+                               help="Match memories with all --tags instead of any")
 
     # Cache command
     cache_parser = subparsers.add_parser("cache", help="Manage cache")
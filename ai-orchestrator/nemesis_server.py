@@ -13,7 +13,7 @@ Endpoints:
     POST /cancel/<id>     - Cancel running analysis
 
 Usage:
-    python nemesis_server.py [--port 8765] [--host 127.0.0.1]
+    python nemesis_server.py [--port 8765] [--host 127.0.0.1] [--no-cache-daemon]
 """
 
 import os
@@ -27,6 +27,7 @@ import logging
 import argparse
 import threading
 import subprocess
+import yaml
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -482,13 +483,58 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 
+def load_cache_config() -> Dict[str, Any]:
+    """The ``cache`` section of config.yaml; empty (all defaults) if unavailable."""
+    try:
+        with open(NEMESIS_DIR / "config.yaml", 'r', encoding='utf-8') as f:
+            return (yaml.safe_load(f) or {}).get("cache") or {}
+    except (yaml.YAMLError, OSError) as e:
+        logger.warning(f"Could not read config.yaml, using cache defaults: {e}")
+        return {}
+
+
+def start_cache_daemon(socket_path: Path):
+    """
+    Serve a shared L2 cache to the job subprocesses, which find it through
+    NEMESIS_CACHE_SOCKET. Jobs fall back to a private L2 if this fails.
+    """
+    sys.path.insert(0, str(NEMESIS_DIR))
+    from memory.cache_daemon import CacheDaemon, UNIX_SOCKETS_AVAILABLE
+
+    if not UNIX_SOCKETS_AVAILABLE:
+        logger.info("Unix sockets unavailable; jobs will use private caches")
+        return None
+    cache_config = load_cache_config()
+    try:
+        daemon = CacheDaemon(
+            str(socket_path),
+            max_size=(cache_config.get("l2") or {}).get("max_size", 10000),
+            persistence_file=str(DATA_DIR / "l2_shared.json"),
+            # 0 in the config means expire on read only
+            expiry_tick_seconds=cache_config.get("expiry_tick_seconds", 1.0) or None
+        )
+    except Exception as e:
+        logger.warning(f"Shared cache daemon not started: {e}")
+        return None
+    daemon.start()
+    os.environ["NEMESIS_CACHE_SOCKET"] = str(socket_path)
+    return daemon
+
+
 def main():
     parser = argparse.ArgumentParser(description="NEMESIS HTTP Service")
     parser.add_argument('--host', default='127.0.0.1', help='Host to bind to')
     parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--cache-socket', default=str(DATA_DIR / "cache.sock"),
+                        help='Unix socket for the shared job cache')
+    parser.add_argument('--no-cache-daemon', action='store_true',
+                        help='Give every job its own private cache')
     args = parser.parse_args()
 
+    if not args.no_cache_daemon:
+        start_cache_daemon(Path(args.cache_socket))
+
     # Register signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
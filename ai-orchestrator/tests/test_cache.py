@@ -0,0 +1,1578 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the NEMESIS multi-level context cache.
+Tests cache levels, L3 storage backends and the ContextCache facade.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.cache import (
+    MISS, AccessJournal, CacheEntry, CapacityJanitor, CompactCacheEntry, ContextCache,
+    L1MemoryCache, L2RedisLikeCache, L3DiskCache, ShardedL1Cache, is_negative
+)
+from memory.cache_daemon import MAX_KEY_BYTES, UNIX_SOCKETS_AVAILABLE, CacheDaemon, RemoteL2Cache
+from memory.codecs import ZSTD_AVAILABLE, EncodedValue, ValueCodec, create_codec
+from memory.eviction import EVICTION_POLICIES, create_policy
+from memory.expiry import ExpirySweeper, TimingWheel
+from memory.hotset import HotSetManifest
+from memory.key_index import KeyIndex
+from memory.metrics import InstrumentedLevel, LatencyHistogram
+from memory.sizing import DeepSizer, fast_size, json_size
+from memory.singleflight import SingleFlight
+from memory.segment_store import L3SegmentCache, SegmentStore
+
+
+class TestEvictionPolicies(unittest.TestCase):
+    """Tests for pluggable eviction policies."""
+
+    def test_lru_order(self):
+        """Test the default policy keeps recently used entries."""
+        cache = L1MemoryCache(max_size=2)
+        cache.set("a", CacheEntry(key="a", value=1))
+        cache.set("b", CacheEntry(key="b", value=2))
+        cache.get("a")
+        cache.set("c", CacheEntry(key="c", value=3))
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+    def test_policies_respect_capacity(self):
+        """Test every policy stays within capacity and tracks the same keys."""
+        for name in EVICTION_POLICIES:
+            cache = L2RedisLikeCache(max_size=20, eviction_policy=name)
+            for i in range(200):
+                key = f"key{i % 50}"
+                if cache.get(key) is None:
+                    cache.set(key, CacheEntry(key=key, value=i))
+                if i % 7 == 0:
+                    cache.delete(f"key{i % 13}")
+            self.assertLessEqual(cache.stats()["entries"], 20, name)
+            self.assertEqual(cache.stats()["eviction"]["tracked"], cache.stats()["entries"], name)
+
+    def test_tinylfu_resists_scans(self):
+        """Test a one-off scan does not flush frequently used entries."""
+        cache = L1MemoryCache(max_size=100, eviction_policy="tinylfu")
+        for _ in range(5):
+            for i in range(50):
+                key = f"hot{i}"
+                if cache.get(key) is None:
+                    cache.set(key, CacheEntry(key=key, value=i))
+        for i in range(1000):
+            cache.set(f"scan{i}", CacheEntry(key=f"scan{i}", value=i))
+
+        survivors = sum(cache.get(f"hot{i}") is not None for i in range(50))
+        self.assertGreater(survivors, 40)
+
+    def test_gds_keeps_expensive_entries(self):
+        """Test cost-aware eviction drops cheap entries before expensive ones."""
+        cache = L1MemoryCache(max_size=2, eviction_policy="gds")
+        cache.set("expensive", CacheEntry(key="expensive", value="x", cost=10.0))
+        cache.set("cheap", CacheEntry(key="cheap", value="x", cost=0.1))
+        cache.set("new", CacheEntry(key="new", value="x", cost=1.0))
+
+        self.assertIsNotNone(cache.get("expensive"))
+        self.assertIsNone(cache.get("cheap"))
+
+    def test_unknown_policy(self):
+        """Test unknown policy names are rejected."""
+        with self.assertRaises(ValueError):
+            create_policy("random", 10)
+
+
+class TestSizingAndCompactEntries(unittest.TestCase):
+    """Tests for L1 size accounting and slotted entries."""
+
+    def test_fast_sizer(self):
+        """Test str/bytes fast path and bounded walk for containers."""
+        self.assertEqual(fast_size("x" * 1000), 1000)
+        self.assertEqual(fast_size(b"x" * 10), 10)
+        self.assertGreater(fast_size({"text": "x" * 1000}), 1000)
+
+    def test_deep_sizer_extrapolates_large_containers(self):
+        """Test the walk samples big containers instead of visiting every item."""
+        sizer = DeepSizer(max_items=10)
+        small = sizer(["abcd"] * 10)
+        large = sizer(["abcd"] * 1000)
+        self.assertGreater(large, small * 50)
+
+    def test_size_hint_skips_sizer(self):
+        """Test a caller-supplied size is used as-is."""
+        calls = []
+
+        def sizer(value):
+            calls.append(value)
+            return json_size(value)
+
+        cache = L1MemoryCache(sizer=sizer)
+        cache.set("hinted", CacheEntry(key="hinted", value="abc", size_bytes=42))
+        cache.set("sized", CacheEntry(key="sized", value="abc"))
+
+        self.assertEqual(calls, ["abc"])
+        self.assertEqual(cache.get("hinted").size_bytes, 42)
+
+    def test_compact_entry_interface(self):
+        """Test CompactCacheEntry matches CacheEntry behaviour."""
+        entry = CompactCacheEntry(key="k", value=[1], expires_at=time.time() - 1)
+        self.assertFalse(hasattr(entry, "__dict__"))
+        self.assertTrue(entry.is_expired)
+        entry.touch()
+        self.assertEqual(entry.hit_count, 1)
+        entry.metadata["source"] = "test"
+
+        restored = CompactCacheEntry.from_dict(entry.to_dict())
+        self.assertEqual(restored.value, [1])
+        self.assertEqual(CacheEntry.from_dict(entry.to_dict()).hit_count, 1)
+
+    def test_context_cache_compact_entries(self):
+        """Test ContextCache stores compact entries when asked."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = ContextCache(l3_dir=temp_dir, compact_entries=True)
+            cache.set("key", {"a": 1}, size_hint=100)
+            entry = cache.l1.get("key")
+            self.assertIsInstance(entry, CompactCacheEntry)
+            self.assertEqual(entry.size_bytes, 100)
+            cache.close()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class TestShardedL1Cache(unittest.TestCase):
+    """Tests for the lock-striped L1."""
+
+    def test_same_api_and_aggregated_stats(self):
+        """Test sharded L1 behaves like one cache from the outside."""
+        cache = ShardedL1Cache(max_size=1000, shards=8)
+        for i in range(100):
+            cache.set(f"key{i}", CacheEntry(key=f"key{i}", value=i))
+        self.assertEqual(cache.get("key42").value, 42)
+        self.assertIsNone(cache.get("missing"))
+        self.assertTrue(cache.delete("key0"))
+        self.assertFalse(cache.delete("key0"))
+
+        stats = cache.stats()
+        self.assertEqual(stats["shards"], 8)
+        self.assertEqual(stats["entries"], 99)
+        self.assertEqual(sum(stats["shard_entries"]), 99)
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+        cache.clear()
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_each_shard_enforces_its_budget(self):
+        """Test entry and memory budgets are split across shards."""
+        cache = ShardedL1Cache(max_size=40, max_memory_mb=1, shards=4)
+        for i in range(400):
+            cache.set(f"key{i}", CacheEntry(key=f"key{i}", value=i, size_bytes=100))
+        self.assertTrue(all(n <= 10 for n in cache.stats()["shard_entries"]))
+
+        cache.set("big", CacheEntry(key="big", value="x", size_bytes=300 * 1024))
+        self.assertIsNone(cache.get("big"))  # over one shard's 256 KB budget
+
+    def test_concurrent_access(self):
+        """Test shards stay consistent under many threads."""
+        cache = ShardedL1Cache(max_size=500, shards=8)
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(2000):
+                    key = f"key{(offset + i) % 800}"
+                    if cache.get(key) is None:
+                        cache.set(key, CacheEntry(key=key, value=key))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n * 100,)) for n in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        stats = cache.stats()
+        self.assertLessEqual(stats["entries"], 8 * 63)
+        self.assertEqual(stats["hits"] + stats["misses"], 16 * 2000)
+
+    def test_context_cache_uses_shards(self):
+        """Test ContextCache builds a sharded L1 when asked."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = ContextCache(l3_dir=temp_dir, l1_shards=4)
+            self.assertIsInstance(cache.l1, ShardedL1Cache)
+            cache.set("key", "value")
+            self.assertEqual(cache.get("key"), "value")
+            self.assertEqual(cache.stats()["l1"]["type"], "memory-sharded")
+            cache.close()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_rejects_shared_policy_instance(self):
+        """Test a single policy object cannot be shared by several shards."""
+        with self.assertRaises(ValueError):
+            ShardedL1Cache(eviction_policy=create_policy("lru", 10), shards=2)
+
+
+class TestSegmentStore(unittest.TestCase):
+    """Tests for the log-structured L3 backend."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _store(self, **kwargs):
+        kwargs.setdefault("compaction_interval_seconds", 0)
+        return SegmentStore(self.temp_dir, **kwargs)
+
+    def test_put_get_delete(self):
+        """Test basic record operations."""
+        store = self._store()
+        store.put("a", b"alpha")
+        store.put("b", b"beta")
+        store.put("a", b"alpha-2")
+
+        self.assertEqual(store.get("a"), b"alpha-2")
+        self.assertEqual(store.get("b"), b"beta")
+        self.assertTrue(store.delete("b"))
+        self.assertIsNone(store.get("b"))
+        self.assertFalse(store.delete("b"))
+        store.close()
+
+    def test_index_rebuilt_after_restart(self):
+        """Test sealed footers and the unsealed tail are both replayed."""
+        store = self._store(max_segment_bytes=128)
+        for i in range(20):
+            store.put(f"key{i}", f"value{i}".encode() * 4)
+        store.delete("key3")
+        store.close()
+
+        reopened = self._store(max_segment_bytes=128)
+        self.assertGreater(reopened.stats()["segments"], 1)
+        self.assertEqual(len(reopened), 19)
+        self.assertIsNone(reopened.get("key3"))
+        self.assertEqual(reopened.get("key7"), b"value7" * 4)
+        reopened.close()
+
+    def test_torn_tail_is_truncated(self):
+        """Test a partially written record is dropped on startup."""
+        store = self._store()
+        store.put("good", b"value")
+        store.close()
+
+        segment = sorted(Path(self.temp_dir).glob("seg-*.log"))[-1]
+        with open(segment, "ab") as f:
+            f.write(b"\x01\x05\x00")
+
+        reopened = self._store()
+        self.assertEqual(reopened.get("good"), b"value")
+        reopened.put("next", b"ok")
+        self.assertEqual(reopened.get("next"), b"ok")
+        reopened.close()
+
+    def test_compaction_reclaims_dead_records(self):
+        """Test compaction keeps live data and drops overwritten records."""
+        store = self._store(max_segment_bytes=256)
+        for round_number in range(5):
+            for i in range(10):
+                store.put(f"key{i}", f"round{round_number}".encode())
+        before = store.stats()
+
+        self.assertGreater(store.compact(), 0)
+        after = store.stats()
+        self.assertLess(after["dead_bytes"], before["dead_bytes"])
+        for i in range(10):
+            self.assertEqual(store.get(f"key{i}"), b"round4")
+        store.close()
+
+        reopened = self._store(max_segment_bytes=256)
+        self.assertEqual(reopened.get("key9"), b"round4")
+        reopened.close()
+
+    def test_compaction_keeps_only_tombstones_that_shadow_puts(self):
+        """Test a compacted tombstone moves forward only if an older segment holds its key."""
+        store = self._store(max_segment_bytes=256)
+        store.put("old", b"v" * 10)
+        for i in range(7):
+            store.put(f"keep{i}", b"v" * 10)
+        store.put("new", b"v" * 10)
+        store.delete("new")
+        store.delete("old")
+        for _ in range(10):
+            store.put("churn", b"x" * 40)
+
+        self.assertGreater(store.compact(), 0)
+        tombstones = [key for op, key, *_ in store._active.records if op == 2]
+        self.assertEqual(tombstones, ["old"])
+        store.close()
+
+        reopened = self._store(max_segment_bytes=256)
+        self.assertIsNone(reopened.get("old"))
+        self.assertIsNone(reopened.get("new"))
+        self.assertEqual(reopened.get("keep6"), b"v" * 10)
+        self.assertEqual(reopened.get("churn"), b"x" * 40)
+        reopened.close()
+
+
+class TestL3SegmentCache(unittest.TestCase):
+    """Tests for L3SegmentCache behind the CacheLevel interface."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_entry_roundtrip_and_expiry(self):
+        """Test entries survive a restart and expired entries are dropped."""
+        cache = L3SegmentCache(cache_dir=self.temp_dir, compaction_interval_seconds=0)
+        cache.set("live", CacheEntry(key="live", value={"data": [1, 2]}))
+        cache.set("dead", CacheEntry(key="dead", value="x", expires_at=time.time() - 1))
+        cache.close()
+
+        cache = L3SegmentCache(cache_dir=self.temp_dir, compaction_interval_seconds=0)
+        self.assertEqual(cache.get("live").value, {"data": [1, 2]})
+        self.assertIsNone(cache.get("dead"))
+        self.assertEqual(cache.stats()["entries"], 1)
+        cache.close()
+
+    def test_context_cache_backend_selection(self):
+        """Test ContextCache can run on the segment backend."""
+        cache = ContextCache(l3_dir=self.temp_dir, l3_backend="segments")
+        self.assertIsInstance(cache.l3, L3SegmentCache)
+
+        cache.set("key", "value", levels=["l3"])
+        self.assertEqual(cache.get("key"), "value")
+        self.assertEqual(cache.stats()["l3"]["type"], "segments")
+        cache.close()
+
+        with self.assertRaises(ValueError):
+            ContextCache(l3_dir=self.temp_dir, l3_backend="unknown")
+
+
+class TestAccessJournal(unittest.TestCase):
+    """Tests for write-behind L3 access metadata."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_hits_do_not_rewrite_entry_files(self):
+        """Test L3 reads leave entry files untouched."""
+        cache = L3DiskCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0)
+        cache.set("key", CacheEntry(key="key", value="value"))
+        path = cache._key_to_path("key")
+        before = path.read_bytes()
+
+        for _ in range(5):
+            self.assertEqual(cache.get("key").value, "value")
+
+        self.assertEqual(path.read_bytes(), before)
+        self.assertEqual(cache.stats()["access_journal"]["dirty"], 1)
+        cache.close()
+
+    def test_metadata_survives_restart(self):
+        """Test persist() flushes hit counts that are replayed on startup."""
+        cache = L3DiskCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0)
+        cache.set("key", CacheEntry(key="key", value="value"))
+        for _ in range(3):
+            cache.get("key")
+        cache.persist()
+        cache.close()
+
+        cache = L3DiskCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0)
+        self.assertEqual(cache.get("key").hit_count, 4)
+        cache.close()
+
+    def test_forgotten_keys_stay_forgotten_and_are_compacted(self):
+        """Test deletes survive a restart and rewrites drop their tombstones."""
+        path = Path(self.temp_dir) / "access.journal"
+        journal = AccessJournal(path, flush_interval_seconds=0)
+        for i in range(100):
+            journal.record(f"key{i}", time.time(), 1)
+        journal.flush()
+        for i in range(99):
+            journal.forget(f"key{i}")
+        journal.close()
+
+        journal = AccessJournal(path, flush_interval_seconds=0, max_journal_bytes=0)
+        self.assertEqual(set(journal.snapshot()), {"key99"})
+        journal.record("key99", time.time(), 2)
+        journal.flush()
+        journal.close()
+        self.assertEqual(path.read_text().count("\n"), 1)
+        self.assertNotIn("key0", path.read_text())
+
+    def test_threshold_wakes_flusher(self):
+        """Test the background flusher writes once the dirty map fills up."""
+        journal = AccessJournal(Path(self.temp_dir) / "access.journal",
+                                flush_interval_seconds=60, flush_threshold=10)
+        for i in range(10):
+            journal.record(f"key{i}", time.time(), 1)
+
+        deadline = time.time() + 2
+        while journal.stats()["dirty"] and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(journal.stats()["dirty"], 0)
+        self.assertEqual(journal.stats()["flushes"], 1)
+        journal.close()
+
+
+class TestL3Capacity(unittest.TestCase):
+    """Tests for L3 byte budgets, size counters and the watermark janitor."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _fill(self, cache, start, stop):
+        for i in range(start, stop):
+            cache.set(f"k{i}", CacheEntry(key=f"k{i}", value="x" * 1000))
+
+    def test_writes_evict_least_recently_used(self):
+        """Test writes past the budget evict in LRU order, for both backends."""
+        for factory in (
+            lambda: L3DiskCache(cache_dir=self.temp_dir, max_size_mb=0.008),
+            lambda: L3SegmentCache(cache_dir=self.temp_dir, max_size_mb=0.008,
+                                   compaction_interval_seconds=0),
+        ):
+            cache = factory()
+            self._fill(cache, 0, 4)
+            cache.get("k0")
+            self._fill(cache, 4, 8)
+            self.assertLessEqual(cache.used_bytes(), cache.max_size_bytes)
+            self.assertIsNotNone(cache.get("k0"))
+            self.assertIsNone(cache.get("k1"))
+            self.assertGreater(cache.stats()["evictions"], 0)
+            cache.clear()
+            self.assertEqual(cache.used_bytes(), 0)
+            cache.close()
+
+    def test_size_counter_survives_restart(self):
+        """Test the running byte counter matches the files after updates and a restart."""
+        cache = L3DiskCache(cache_dir=self.temp_dir)
+        self._fill(cache, 0, 5)
+        cache.set("k0", CacheEntry(key="k0", value="short"))
+        cache.delete("k1")
+        used = cache.used_bytes()
+        on_disk = sum(p.stat().st_size for p in Path(self.temp_dir).glob("*/*.json"))
+        self.assertEqual(used, on_disk)
+        cache.close()
+
+        cache = L3DiskCache(cache_dir=self.temp_dir)
+        self.assertEqual(cache.used_bytes(), used)
+        cache.close()
+
+    def test_janitor_evicts_to_low_watermark(self):
+        """Test the janitor only acts above the high watermark and stops at the low one."""
+        cache = L3DiskCache(cache_dir=self.temp_dir, max_size_mb=0.01,
+                            low_watermark=0.5, high_watermark=0.8, janitor_interval_seconds=0)
+        self._fill(cache, 0, 7)
+        self.assertEqual(cache._janitor.run_once(), 0)
+
+        self._fill(cache, 7, 9)
+        self.assertGreater(cache._janitor.run_once(), 0)
+        self.assertLessEqual(cache.used_bytes(), cache.max_size_bytes * 0.5)
+        self.assertIsNotNone(cache.get("k8"))
+        self.assertEqual(cache.stats()["janitor"]["runs"], 2)
+        cache.close()
+
+        with self.assertRaises(ValueError):
+            CapacityJanitor(cache, low=0.9, high=0.5, interval_seconds=0)
+
+
+@unittest.skipUnless(UNIX_SOCKETS_AVAILABLE, "requires Unix domain sockets")
+class TestCacheDaemon(unittest.TestCase):
+    """Tests for the shared L2 daemon and its RemoteL2Cache client."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, "cache.sock")
+        self.daemon = None
+
+    def tearDown(self):
+        if self.daemon is not None:
+            self.daemon.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _start(self):
+        self.daemon = CacheDaemon(self.socket_path, expiry_tick_seconds=None)
+        self.daemon.start()
+
+    def test_clients_share_entries_with_pipelined_batches(self):
+        """Test two clients see each other's writes and batches take one round trip."""
+        self._start()
+        writer = RemoteL2Cache(self.socket_path, batch_size=2)
+        reader = RemoteL2Cache(self.socket_path, batch_size=2)
+
+        writer.set_many({f"k{i}": CacheEntry(key=f"k{i}", value={"n": i}) for i in range(5)})
+        found = reader.get_many([f"k{i}" for i in range(6)])
+        self.assertEqual({key: entry.value["n"] for key, entry in found.items()},
+                         {f"k{i}": i for i in range(5)})
+        self.assertEqual(reader.stats()["client"]["round_trips"], 1)
+
+        self.assertEqual(reader.stats()["metrics"]["latency"]["l2"]["get_many"]["count"], 3)
+        self.assertTrue(reader.contains("k0"))
+        self.assertEqual(writer.delete_many(["k0", "k1", "missing"]), 2)
+        self.assertIsNone(reader.get("k0"))
+        self.assertEqual(reader.stats()["type"], "remote")
+        writer.close()
+        reader.close()
+
+    def test_falls_back_and_reconnects(self):
+        """Test a missing daemon falls back to the local L2, then reconnects."""
+        client = RemoteL2Cache(self.socket_path, retry_interval_seconds=0)
+        client.set("local", CacheEntry(key="local", value=1))
+        self.assertEqual(client.get("local").value, 1)
+        self.assertEqual(client.stats()["type"], "remote (local fallback)")
+
+        self._start()
+        client.set("shared", CacheEntry(key="shared", value=2))
+        self.assertEqual(self.daemon.level.get("shared").value, 2)
+        self.assertIsNone(client.get("local"))
+
+        # A daemon restart drops pooled connections without raising
+        self.daemon.close()
+        self.daemon = None
+        self.assertIsNone(client.get("shared"))
+        self.assertGreaterEqual(client.stats()["client"]["fallbacks"], 2)
+        client.close()
+
+    def test_daemon_errors_fall_back_and_long_keys_rejected(self):
+        """Test an error reply uses the local L2 and over-long keys fail before sending."""
+        class FailingLevel(L2RedisLikeCache):
+            def get_many(self, keys):
+                raise RuntimeError("disk full")
+
+        self.daemon = CacheDaemon(self.socket_path, level=FailingLevel(), expiry_tick_seconds=None)
+        self.daemon.start()
+        client = RemoteL2Cache(self.socket_path, retry_interval_seconds=60)
+        client.fallback.set("k", CacheEntry(key="k", value="local"))
+
+        self.assertEqual(client.get("k").value, "local")
+        self.assertFalse(client.connected)
+        self.assertEqual(client.stats()["client"]["fallbacks"], 1)
+        with self.assertRaises(ValueError):
+            client.set("x" * (MAX_KEY_BYTES + 1), CacheEntry(key="x", value=1))
+        client.close()
+
+    def test_prune_checks_remote_keys_in_one_round_trip(self):
+        """Test pruning the key index batches its existence checks against the daemon."""
+        self._start()
+        cache = ContextCache(l3_dir=os.path.join(self.temp_dir, "l3"), l2_socket=self.socket_path)
+        keys = [f"k{i}" for i in range(300)]
+        cache.set_many({key: 1 for key in keys}, levels=["l2"])
+        self.daemon.level.delete_many(keys[:100])
+
+        before = cache.l2.stats()["client"]["round_trips"]
+        self.assertEqual(cache.prune_index(), 100)
+        # One for the prune, with two pipelined chunks, plus the stats() call above
+        self.assertEqual(cache.l2.stats()["client"]["round_trips"] - before, 2)
+        self.assertEqual(len(cache._keys), 200)
+        cache.close()
+
+    def test_context_caches_share_l2(self):
+        """Test separate ContextCache instances share L2 through the daemon."""
+        self._start()
+        first = ContextCache(l3_dir=os.path.join(self.temp_dir, "a"), l2_socket=self.socket_path)
+        second = ContextCache(l3_dir=os.path.join(self.temp_dir, "b"), l2_socket=self.socket_path)
+
+        first.set("analysis", {"score": 0.9}, levels=["l2"])
+        self.assertEqual(second.get("analysis"), {"score": 0.9})
+        self.assertEqual(second.l1.get("analysis").value, {"score": 0.9})
+        first.close()
+        second.close()
+
+
+class TestCodecs(unittest.TestCase):
+    """Tests for L2/L3 value compression."""
+
+    TEXT = "The synthesis agent summarised the findings. " * 200
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip_and_size_tiers(self):
+        """Test codecs are picked by payload size and decode transparently."""
+        codec = ValueCodec(rules=[(0, "identity"), (256, "zlib"), (4096, "lzma")])
+        small = b'{"value": "tiny"}'
+        medium = self.TEXT[:2000].encode()
+        large = self.TEXT.encode()
+
+        self.assertEqual(codec.encode(small), small)
+        self.assertEqual(codec.encode(medium)[0], 1)
+        self.assertEqual(codec.encode(large)[0], 2)
+        for data in (small, medium, large):
+            self.assertEqual(codec.decode(codec.encode(data)), data)
+
+        stats = codec.stats()
+        self.assertGreater(stats["ratio"], 5)
+        self.assertEqual(stats["codecs"]["lzma"]["decodes"], 1)
+        self.assertIn("encode_ms", stats["codecs"]["zlib"])
+
+    def test_incompressible_payload_stored_raw(self):
+        """Test payloads that do not shrink are left unencoded."""
+        codec = create_codec("zlib")
+        data = os.urandom(4096)
+        while data[0] in (1, 2, 3, 4):
+            data = os.urandom(4096)
+        self.assertEqual(codec.encode(data), data)
+
+    def test_unknown_codec_rejected(self):
+        """Test misconfigured codec names fail fast."""
+        with self.assertRaises(ValueError):
+            create_codec("brotli")
+
+    @unittest.skipUnless(ZSTD_AVAILABLE, "zstandard not installed")
+    def test_zstd_dictionary_training(self):
+        """Test a trained dictionary is persisted and used for new payloads."""
+        dict_path = Path(self.temp_dir) / "zstd.dict"
+        codec = ValueCodec(rules=[(0, "zstd")], dictionary_path=dict_path, train_samples=200)
+        samples = [f'{{"key": "k{i}", "value": "result {i} for prompt"}}'.encode() for i in range(200)]
+        for sample in samples:
+            codec.encode(sample)
+        self.assertTrue(dict_path.exists())
+        encoded = codec.encode(samples[0])
+        self.assertEqual(encoded[0], 4)
+
+        reopened = ValueCodec(rules=[(0, "zstd")], dictionary_path=dict_path)
+        self.assertEqual(reopened.decode(encoded), samples[0])
+
+    def test_l3_compresses_on_disk_and_reads_legacy_files(self):
+        """Test L3 entry files shrink and pre-codec files stay readable."""
+        plain = L3DiskCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0)
+        plain.set("old", CacheEntry(key="old", value=self.TEXT))
+        raw_size = plain._key_to_path("old").stat().st_size
+        plain.close()
+
+        cache = L3DiskCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0, codec="auto")
+        cache.set("new", CacheEntry(key="new", value=self.TEXT))
+        self.assertLess(cache._key_to_path("new").stat().st_size * 5, raw_size)
+        self.assertEqual(cache.get("old").value, self.TEXT)
+        self.assertEqual(cache.get("new").value, self.TEXT)
+        self.assertGreater(cache.stats()["codec"]["ratio"], 5)
+        cache.close()
+
+    def test_segment_l3_codec(self):
+        """Test the segment backend stores compressed records."""
+        cache = L3SegmentCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0,
+                               compaction_interval_seconds=0, codec="zlib")
+        cache.set("key", CacheEntry(key="key", value=self.TEXT))
+        self.assertEqual(cache.get("key").value, self.TEXT)
+        self.assertLess(cache.stats()["size_mb"] * 1024 * 1024, len(self.TEXT) / 5)
+        cache.close()
+
+    def test_l2_holds_compressed_copy(self):
+        """Test L2 compresses its own copy and survives a restart without the codec."""
+        path = str(Path(self.temp_dir) / "l2.json")
+        cache = L2RedisLikeCache(persistence_file=path, codec="zlib")
+        entry = CacheEntry(key="key", value=self.TEXT)
+        cache.set("key", entry)
+
+        self.assertEqual(entry.value, self.TEXT)  # caller's entry untouched
+        self.assertIsInstance(cache._cache["key"].value, EncodedValue)
+        self.assertEqual(cache.get("key").value, self.TEXT)
+        cache.close()
+
+        reopened = L2RedisLikeCache(persistence_file=path)
+        self.assertEqual(reopened.get("key").value, self.TEXT)
+        reopened.persist()
+        reopened.close()
+
+        reopened = L2RedisLikeCache(persistence_file=path)
+        self.assertEqual(reopened.get("key").value, self.TEXT)
+        reopened.close()
+
+
+class TestL2Persistence(unittest.TestCase):
+    """Tests for L2 journal + snapshot persistence."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = str(Path(self.temp_dir) / "l2.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _open(self, **kwargs):
+        return L2RedisLikeCache(persistence_file=self.path, **kwargs)
+
+    def test_journal_recovers_without_persist(self):
+        """Test sets and deletes survive a crash before any snapshot."""
+        cache = self._open(fsync="always")
+        cache.set("a", CacheEntry(key="a", value=1))
+        cache.set("b", CacheEntry(key="b", value=2))
+        cache.set("a", CacheEntry(key="a", value=3))
+        cache.delete("b")
+
+        # Simulate a crash: read the files while the first instance is still open
+        recovered = self._open()
+        self.assertEqual(recovered.get("a").value, 3)
+        self.assertIsNone(recovered.get("b"))
+        recovered.close()
+        cache.close()
+
+    def test_snapshot_truncates_journal(self):
+        """Test persist() writes a line-oriented snapshot and resets the journal."""
+        cache = self._open()
+        for i in range(20):
+            cache.set(f"key{i}", CacheEntry(key=f"key{i}", value=i))
+        cache.persist()
+        self.assertEqual(cache.stats()["journal_bytes"], 0)
+        self.assertEqual(cache.stats()["snapshots"], 1)
+        cache.set("late", CacheEntry(key="late", value="journal only"))
+        cache.close()
+
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 21)  # header + one line per entry
+
+        cache = self._open()
+        self.assertEqual(cache.stats()["entries"], 21)
+        self.assertEqual(cache.get("key7").value, 7)
+        self.assertEqual(cache.get("late").value, "journal only")
+        cache.close()
+
+    def test_torn_journal_tail_is_ignored(self):
+        """Test a half-written final journal record does not block recovery."""
+        cache = self._open()
+        cache.set("a", CacheEntry(key="a", value=1))
+        cache.close()
+        with open(self.path + ".journal", 'a') as f:
+            f.write('{"op": "set", "entry": {"key": "b"')
+
+        cache = self._open()
+        self.assertEqual(cache.get("a").value, 1)
+        self.assertIsNone(cache.get("b"))
+        cache.close()
+
+    def test_interrupted_snapshot_replays_rewrite_journal(self):
+        """Test records moved aside by a failed snapshot are still recovered."""
+        cache = self._open()
+        cache.set("a", CacheEntry(key="a", value=1))
+        cache.close()
+        Path(self.path + ".journal").rename(self.path + ".journal.rewrite")
+
+        cache = self._open()
+        cache.set("b", CacheEntry(key="b", value=2))
+        self.assertEqual(cache.get("a").value, 1)
+        cache.persist()
+        self.assertFalse(Path(self.path + ".journal.rewrite").exists())
+        cache.close()
+
+        cache = self._open()
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.close()
+
+    def test_loads_legacy_snapshot(self):
+        """Test single-document snapshots from older versions still load."""
+        with open(self.path, 'w') as f:
+            json.dump({"old": CacheEntry(key="old", value="v").to_dict()}, f)
+
+        cache = self._open()
+        self.assertEqual(cache.get("old").value, "v")
+        cache.close()
+
+    def test_rejects_unknown_fsync_policy(self):
+        """Test invalid fsync settings fail fast."""
+        with self.assertRaises(ValueError):
+            self._open(fsync="sometimes")
+
+
+class TestExpirySweeper(unittest.TestCase):
+    """Tests for timing-wheel TTL expiry."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_wheel_fires_each_key_once_when_due(self):
+        """Test items surface on their tick, across level cascades."""
+        wheel = TimingWheel(tick_seconds=1.0, slot_bits=2, levels=3, now=0)
+        expiries = {"a": 1.5, "b": 3, "c": 10, "d": 37.2, "e": 500}  # e is past the horizon
+        for key, expires_at in expiries.items():
+            wheel.schedule(key, expires_at)
+        self.assertEqual(len(wheel), 5)
+
+        fired = {}
+        for now in range(0, 600):
+            for bucket in wheel.advance(now):
+                for key, _ in bucket:
+                    self.assertNotIn(key, fired)
+                    fired[key] = now
+
+        self.assertEqual(fired, {"a": 2, "b": 3, "c": 10, "d": 38, "e": 500})
+        self.assertEqual(len(wheel), 0)
+
+    def test_sweeper_drops_expired_entries_from_all_levels(self):
+        """Test expired entries leave L1, L2 and L3 without being read."""
+        cache = ContextCache(l3_dir=self.temp_dir)
+        sweeper = ExpirySweeper({"l1": cache.l1, "l2": cache.l2, "l3": cache.l3}, tick_seconds=0.05)
+        cache._sweeper = sweeper
+
+        cache.set("short", "value", ttl_seconds=0.1)
+        cache.set("long", "value", ttl_seconds=60)
+        self.assertEqual(sweeper.sweep(time.time() + 0.5), 1)
+
+        for level in (cache.l1, cache.l2, cache.l3):
+            self.assertEqual(level.stats()["entries"], 1)
+        stats = cache.stats()["expiry"]
+        self.assertEqual(stats["expired"], {"l1": 1, "l2": 1, "l3": 1})
+        self.assertGreater(stats["lag_ms"]["max"], 0)
+        self.assertEqual(stats["pending"], 1)
+        cache.close()
+
+    def test_reset_key_is_not_expired_early(self):
+        """Test a key re-set with a longer TTL survives its old schedule."""
+        cache = ContextCache(l3_dir=self.temp_dir)
+        sweeper = ExpirySweeper({"l1": cache.l1, "l2": cache.l2, "l3": cache.l3}, tick_seconds=0.05)
+        cache._sweeper = sweeper
+        cache.set("key", "old", ttl_seconds=0.1)
+        cache.set("key", "new", ttl_seconds=60)
+
+        self.assertEqual(sweeper.sweep(time.time() + 0.5), 0)
+        self.assertEqual(cache.get("key"), "new")
+        cache.close()
+
+    def test_background_sweep_and_seeding(self):
+        """Test the sweeper thread expires entries loaded from disk."""
+        l3 = L3DiskCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0)
+        l3.set("stale", CacheEntry(key="stale", value="v", expires_at=time.time() + 0.1))
+        l3.close()
+
+        cache = ContextCache(l3_dir=self.temp_dir, expiry_tick_seconds=0.05)
+        self.assertEqual(cache.stats()["expiry"]["pending"], 1)
+        deadline = time.time() + 3
+        while cache.l3.stats()["entries"] and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(cache.l3.stats()["entries"], 0)
+        cache.close()
+
+    def test_segment_and_sharded_levels_expire(self):
+        """Test expire_many on the segment L3 and the sharded L1."""
+        now = time.time()
+        l1 = ShardedL1Cache(shards=4)
+        l3 = L3SegmentCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0,
+                            compaction_interval_seconds=0)
+        for level in (l1, l3):
+            level.set("dead", CacheEntry(key="dead", value=1, expires_at=now - 1))
+            level.set("live", CacheEntry(key="live", value=1, expires_at=now + 60))
+            self.assertEqual(sorted(k for k, _ in level.iter_expiry()), ["dead", "live"])
+            self.assertEqual(level.expire_many(["dead", "live", "missing"], now), ["dead"])
+            self.assertEqual(level.stats()["entries"], 1)
+        l3.close()
+
+
+class TestBulkOperations(unittest.TestCase):
+    """Tests for batched multi-key operations."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_levels_batch_operations(self):
+        """Test get_many/set_many/delete_many on every level implementation."""
+        levels = [
+            L1MemoryCache(),
+            ShardedL1Cache(shards=4),
+            L2RedisLikeCache(),
+            L3DiskCache(cache_dir=str(Path(self.temp_dir) / "files"), access_flush_interval_seconds=0),
+            L3SegmentCache(cache_dir=str(Path(self.temp_dir) / "segments"),
+                           access_flush_interval_seconds=0, compaction_interval_seconds=0),
+        ]
+        entries = {f"key{i}": CacheEntry(key=f"key{i}", value=i) for i in range(10)}
+        for level in levels:
+            level.set_many(entries)
+            found = level.get_many(["key1", "key5", "missing"])
+            self.assertEqual({k: e.value for k, e in found.items()}, {"key1": 1, "key5": 5})
+            self.assertEqual(level.delete_many(["key1", "key2", "missing"]), 2)
+            self.assertEqual(level.stats()["entries"], 8)
+            level.close()
+
+    def test_l3_batch_saves_index_once(self):
+        """Test set_many and delete_many write index.json once per batch."""
+        cache = L3DiskCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0)
+        saves = []
+        original = cache._save_index
+        cache._save_index = lambda: (saves.append(1), original())
+
+        cache.set_many({f"key{i}": CacheEntry(key=f"key{i}", value=i) for i in range(20)})
+        cache.delete_many([f"key{i}" for i in range(10)])
+        self.assertEqual(len(saves), 2)
+
+        reopened = L3DiskCache(cache_dir=self.temp_dir, access_flush_interval_seconds=0)
+        self.assertEqual(reopened.stats()["entries"], 10)
+        reopened.close()
+        cache.close()
+
+    def test_context_cache_bulk_and_promotion(self):
+        """Test ContextCache bulk calls span tiers and promote lower-level hits."""
+        cache = ContextCache(l3_dir=self.temp_dir)
+        cache.set_many({"a": 1, "b": 2, "c": 3})
+        cache.l1.clear()
+        cache.l2.delete("c")
+
+        self.assertEqual(cache.get_many(["a", "b", "c", "d"]), {"a": 1, "b": 2, "c": 3})
+        self.assertEqual(cache.l1.stats()["entries"], 3)
+        self.assertIsNotNone(cache.l2.get("c"))
+
+        cache.delete_many(["a", "b"])
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"c": 3})
+        cache.close()
+
+    def test_parallel_warm_up(self):
+        """Test warm_up promotes batches from L3 on the I/O pool."""
+        cache = ContextCache(l3_dir=self.temp_dir)
+        cache.set_many({f"key{i}": i for i in range(100)}, levels=["l3"])
+
+        self.assertEqual(cache.warm_up([f"key{i}" for i in range(100)] + ["missing"], batch_size=16), 100)
+        self.assertEqual(cache.l1.stats()["entries"], 100)
+        self.assertEqual(cache.l2.stats()["entries"], 100)
+        cache.close()
+
+    def test_async_bulk(self):
+        """Test aset_many and aget_many round-trip through the lower tiers."""
+        cache = ContextCache(l3_dir=self.temp_dir)
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(cache.aset_many({"x": "1", "y": "2"}))
+            cache.l1.clear()
+            found = loop.run_until_complete(cache.aget_many(["x", "y", "z"]))
+        finally:
+            loop.close()
+        self.assertEqual(found, {"x": "1", "y": "2"})
+        cache.close()
+
+
+class TestInvalidation(unittest.TestCase):
+    """Tests for tag/prefix invalidation and request_cache cleanup."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_key_index_prefix_matching(self):
+        """Test prefixes match whole and partial segments, and removal prunes."""
+        index = KeyIndex()
+        for key in ("req:1:a", "req:1:b", "req:12:a", "req:1", "synth:x", "plain"):
+            index.add(key, tags=["all"])
+
+        self.assertEqual(sorted(index.keys_with_prefix("req:1:")), ["req:1:a", "req:1:b"])
+        self.assertEqual(sorted(index.keys_with_prefix("req:1")),
+                         ["req:1", "req:12:a", "req:1:a", "req:1:b"])
+        self.assertEqual(index.keys_with_prefix("pl"), ["plain"])
+        self.assertEqual(index.keys_with_prefix("nope:"), [])
+        self.assertEqual(len(index.keys_with_prefix("")), 6)
+
+        index.remove_many(["req:1:a", "req:1:b", "req:12:a", "req:1"])
+        self.assertEqual(index.keys_with_prefix("req"), [])
+        self.assertNotIn("req", index._root.children)
+        self.assertEqual(sorted(index.keys_with_tag("all")), ["plain", "synth:x"])
+
+    def test_invalidate_tag_and_prefix_across_levels(self):
+        """Test invalidation removes keys from every level."""
+        cache = ContextCache(l3_dir=self.temp_dir)
+        cache.set("proj:a:1", "v", tags=["proj-a"])
+        cache.set_many({"proj:a:2": "v", "proj:b:1": "v"}, tags=["proj-a"])
+        cache.set("other", "v")
+
+        self.assertEqual(cache.invalidate_prefix("proj:b:"), 1)
+        self.assertIsNone(cache.l3.get("proj:b:1"))
+        self.assertEqual(cache.invalidate_tag("proj-a"), 2)
+        self.assertEqual(cache.get_many(["proj:a:1", "proj:a:2", "other"]), {"other": "v"})
+        self.assertEqual(cache.invalidate_tag("proj-a"), 0)
+        cache.close()
+
+    def test_request_cache_cleans_up(self):
+        """Test request-scoped entries are dropped from L1 only when the context exits."""
+        cache = ContextCache(l3_dir=self.temp_dir)
+        cache.set("long-lived", "keep")
+        lower_deletes = []
+        cache.l2.delete_many = cache.l3.delete_many = lower_deletes.append
+        with cache.request_cache("r1") as put:
+            put("a", 1)
+            put("b", 2)
+            self.assertEqual(cache.get("req:r1:a"), 1)
+
+        self.assertIsNone(cache.get("req:r1:a"))
+        self.assertEqual(cache.l1.stats()["entries"], 1)
+        self.assertEqual(lower_deletes, [])
+        self.assertEqual(cache.invalidate_prefix("req:r1:"), 0)
+        self.assertEqual(cache.get("long-lived"), "keep")
+        cache.close()
+
+    def test_cached_tags_and_stale_pruning(self):
+        """Test decorator results can be invalidated and evicted keys get pruned."""
+        cache = ContextCache(l1_size=10, l2_size=10, l3_dir=self.temp_dir)
+        calls = []
+
+        @cache.cached(tags=["llm"])
+        def answer(x):
+            calls.append(x)
+            return x * 2
+
+        answer(1)
+        cache.invalidate_tag("llm")
+        answer(1)
+        self.assertEqual(calls, [1, 1])
+
+        cache.l3.clear()
+        for i in range(30):
+            cache.set(f"k{i}", i, levels=["l1"])
+        self.assertEqual(cache.prune_index(), 20)
+        self.assertEqual(len(cache._keys), 11)  # ten L1 keys plus the decorator's, still in L2
+        cache.close()
+
+
+class TestCacheMetrics(unittest.TestCase):
+    """Tests for latency histograms and traffic attribution."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_histogram_percentiles(self):
+        """Test percentiles land within one log bucket of the true value."""
+        histogram = LatencyHistogram()
+        for micros in range(1, 1001):
+            histogram.record(micros / 1e6)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 1000)
+        for p, expected_ms in ((50, 0.5), (95, 0.95), (99, 0.99)):
+            self.assertGreaterEqual(snapshot[f"p{p}_ms"], expected_ms)
+            self.assertLessEqual(snapshot[f"p{p}_ms"], expected_ms * 1.2)
+        self.assertAlmostEqual(snapshot["max_ms"], 1.0)
+        self.assertEqual(LatencyHistogram().percentile(99), 0.0)
+
+    def test_instrumented_cache_attributes_traffic(self):
+        """Test per-level latency, promotions, bytes and evictions by reason."""
+        cache = ContextCache(l1_size=2, l3_dir=self.temp_dir, metrics=True)
+        cache.set("a", "x" * 100, levels=["l3"])
+        cache.get("a")
+        cache.get("a")
+        for key in ("b", "c", "d"):
+            cache.set(key, key, levels=["l1"], tags=["t"])
+        cache.invalidate_tag("t")
+
+        metrics = cache.stats()["metrics"]
+        self.assertEqual(metrics["latency"]["l3"]["get"]["count"], 1)
+        self.assertEqual(metrics["latency"]["l1"]["get"]["count"], 2)
+        self.assertIn("p99_ms", metrics["latency"]["l2"]["get"])
+        self.assertEqual(metrics["promotions"], {"l3->l1": 1, "l3->l2": 1})
+        self.assertGreater(metrics["bytes"]["l3"]["read"], 0)
+        self.assertEqual(metrics["evictions"]["l1"]["capacity"], 2)
+        self.assertEqual(metrics["invalidated"], 3)
+        cache.close()
+
+    def test_disabled_metrics_leave_levels_unwrapped(self):
+        """Test a cache without metrics uses the levels directly."""
+        cache = ContextCache(l3_dir=self.temp_dir)
+        self.assertIsInstance(cache.l1, L1MemoryCache)
+        self.assertNotIn("metrics", cache.stats())
+        cache.close()
+
+        cache = ContextCache(l3_dir=self.temp_dir, metrics=True)
+        self.assertIsInstance(cache.l1, InstrumentedLevel)
+        self.assertEqual(cache.l1.stats()["type"], "memory")
+        cache.close()
+
+
+class TestHotSetPrewarm(unittest.TestCase):
+    """Tests for the hot-set manifest and startup prewarming."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_manifest_ranks_by_decayed_frequency(self):
+        """Test ranking, merging with the previous manifest and the size cap."""
+        manifest = HotSetManifest(os.path.join(self.temp_dir, "hotset.json"), size=3,
+                                  half_life_seconds=100)
+        now = 1000.0
+        manifest.write([("stale", now - 1000, 50), ("old", now - 100, 50),
+                        ("warm", now, 5), ("cold", now, 0)], now=now)
+        self.assertEqual(manifest.load(), ["old", "warm", "cold"])
+
+        manifest.write([("new", now + 10, 20)], now=now + 10)
+        self.assertEqual(manifest.load(), ["old", "new", "warm"])
+
+    def test_restart_prewarms_hot_keys(self):
+        """Test keys hit before shutdown are back in L1 and L2 after a restart."""
+        cache = ContextCache(l3_dir=self.temp_dir, hotset_size=10)
+        for i in range(20):
+            cache.set(f"k{i}", i, levels=["l3"])
+        for _ in range(3):
+            for i in range(5):
+                cache.get(f"k{i}")
+        cache.close()
+
+        cache = ContextCache(l3_dir=self.temp_dir, hotset_size=10)
+        self.assertEqual(cache._prewarm_future.result(timeout=5), 5)
+        for i in range(5):
+            self.assertIsNotNone(cache.l1.get(f"k{i}"))
+            self.assertIsNotNone(cache.l2.get(f"k{i}"))
+        self.assertIsNone(cache.l1.get("k10"))
+        self.assertEqual(cache.stats()["hotset"]["warmed"], 5)
+        cache.close()
+
+    def test_prewarm_respects_l1_budget(self):
+        """Test prewarming stops once L1 reaches its fill limit."""
+        cache = ContextCache(l3_dir=self.temp_dir, hotset_size=200)
+        for i in range(200):
+            cache.set(f"k{i}", i, levels=["l3"])
+            cache.get(f"k{i}")
+        cache.close()
+
+        cache = ContextCache(l3_dir=self.temp_dir, l1_size=64, hotset_size=200)
+        cache._prewarm_future.result(timeout=5)
+        self.assertLessEqual(cache.l1.stats()["entries"], 64)
+        self.assertLess(cache.stats()["hotset"]["warmed"], 200)
+        cache.close()
+
+
+class TestNegativeCaching(unittest.TestCase):
+    """Tests for the MISS sentinel and negative caching in ContextCache.cached."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ContextCache(l3_dir=self.temp_dir)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_get_distinguishes_miss_from_cached_none(self):
+        """Test a cached None is returned as None, a miss as the default."""
+        self.cache.set("none", None)
+        self.assertIsNone(self.cache.get("none", MISS))
+        self.assertIs(self.cache.get("absent", MISS), MISS)
+        self.assertIsNone(self.cache.get("absent"))
+        self.assertFalse(MISS)
+
+        self.assertTrue(is_negative(None))
+        self.assertTrue(is_negative([]))
+        self.assertFalse(is_negative(0))
+        self.assertFalse(is_negative(["x"]))
+
+    def test_none_results_are_not_recomputed(self):
+        """Test functions returning None are computed once."""
+        calls = []
+
+        @self.cache.cached()
+        def lookup(query):
+            calls.append(query)
+            return None
+
+        self.assertIsNone(lookup("q"))
+        self.assertIsNone(lookup("q"))
+        self.assertEqual(calls, ["q"])
+
+    def test_negative_ttl(self):
+        """Test empty results get the negative TTL and skip L3; 0 disables them."""
+        calls = []
+
+        @self.cache.cached(ttl_seconds=3600, key_prefix="neg:", negative_ttl_seconds=0.05)
+        def lookup(query):
+            calls.append(query)
+            return [] if query == "empty" else [query]
+
+        lookup("empty")
+        lookup("full")
+        self.assertEqual(self.cache.l3.stats()["entries"], 1)
+        lookup("empty")
+        self.assertEqual(calls, ["empty", "full"])
+
+        time.sleep(0.1)
+        lookup("empty")
+        lookup("full")
+        self.assertEqual(calls, ["empty", "full", "empty"])
+
+        @self.cache.cached(negative_ttl_seconds=0)
+        def never_cached():
+            calls.append("never")
+
+        never_cached()
+        never_cached()
+        self.assertEqual(calls.count("never"), 2)
+
+    def test_async_negative_results(self):
+        """Test async functions returning None are computed once."""
+        calls = []
+
+        @self.cache.cached(negative_ttl_seconds=60)
+        async def lookup(query):
+            calls.append(query)
+            return None
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(lookup("q"))
+            self.assertIsNone(loop.run_until_complete(lookup("q")))
+        finally:
+            loop.close()
+        self.assertEqual(calls, ["q"])
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+    """Tests for stale serving and refresh-ahead in ContextCache.cached."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ContextCache(l3_dir=self.temp_dir)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _wait_for_refreshes(self):
+        deadline = time.time() + 5
+        while self.cache.stats()["refresh"]["in_flight"] and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_stale_entries_survive_persistence(self):
+        """Test stale_at round-trips through the lower levels."""
+        self.cache.set("key", "value", ttl_seconds=60, stale_ttl_seconds=30)
+        entry = self.cache.l3.get("key")
+        self.assertAlmostEqual(entry.expires_at - entry.stale_at, 30, places=3)
+        self.assertFalse(entry.is_stale)
+
+    def test_stale_hit_returns_old_value_and_refreshes_once(self):
+        """Test stale hits return immediately and trigger a single refresh."""
+        calls = []
+        release = threading.Event()
+
+        @self.cache.cached(ttl_seconds=0.05, stale_ttl_seconds=60)
+        def synthesize():
+            calls.append(1)
+            if len(calls) > 1:
+                release.wait(5)
+            return len(calls)
+
+        self.assertEqual(synthesize(), 1)
+        time.sleep(0.1)
+        results = [synthesize() for _ in range(5)]
+        self.assertEqual(results, [1] * 5)
+        self.assertEqual(len(calls), 2)
+
+        release.set()
+        self._wait_for_refreshes()
+        self.assertEqual(synthesize(), 2)
+        stats = self.cache.stats()["refresh"]
+        # Five stale hits, but the per-key dedupe let only one start a refresh
+        self.assertEqual(stats["refreshes"], 1)
+        self.assertEqual(stats["stale_refreshes"], 1)
+
+    def test_refresh_ahead_and_failed_refresh(self):
+        """Test hits near expiry refresh early, and failures keep the old value."""
+        calls = []
+
+        @self.cache.cached(ttl_seconds=0.2, refresh_ahead_seconds=0.15)
+        def enrich():
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("upstream down")
+            return len(calls)
+
+        self.assertEqual(enrich(), 1)
+        self.assertEqual(enrich(), 1)
+        self.assertEqual(len(calls), 1)
+
+        time.sleep(0.1)
+        self.assertEqual(enrich(), 1)
+        self._wait_for_refreshes()
+        self.assertEqual(self.cache.stats()["refresh"]["errors"], 1)
+
+        self.assertEqual(enrich(), 1)
+        self._wait_for_refreshes()
+        self.assertEqual(enrich(), 3)
+
+    def test_refreshes_do_not_block_io_pool(self):
+        """Test slow refreshes run on their own bounded pool, not the I/O executor."""
+        cache = ContextCache(l3_dir=self.temp_dir, io_workers=1, refresh_workers=1,
+                             refresh_queue_size=2)
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+
+        try:
+            for key in ("a", "b", "c"):
+                cache._schedule_refresh(key, slow)
+            self.assertTrue(started.wait(5))
+            self.assertEqual(cache.stats()["refresh"]["dropped"], 1)
+            self.assertIsNone(cache._io_executor.submit(lambda: None).result(timeout=1))
+        finally:
+            release.set()
+            cache.close()
+        self.assertEqual(cache.stats()["refresh"]["refreshes"], 2)
+
+    def test_async_stale_hit(self):
+        """Test async functions serve stale values and refresh in a task."""
+        calls = []
+
+        @self.cache.cached(ttl_seconds=0.05, stale_ttl_seconds=60)
+        async def synthesize():
+            calls.append(1)
+            return len(calls)
+
+        async def main():
+            first = await synthesize()
+            await asyncio.sleep(0.1)
+            stale = await synthesize()
+            while self.cache.stats()["refresh"]["in_flight"]:
+                await asyncio.sleep(0.01)
+            return first, stale, await synthesize()
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(loop.run_until_complete(main()), (1, 1, 2))
+        finally:
+            loop.close()
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for request coalescing in ContextCache.cached."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ContextCache(l3_dir=self.temp_dir)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run_threads(self, target, count=8):
+        results, errors = [], []
+
+        def runner():
+            try:
+                results.append(target())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=runner) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_misses_compute_once(self):
+        """Test N concurrent misses run the function once."""
+        calls = []
+
+        @self.cache.cached(ttl_seconds=60)
+        def slow(x):
+            calls.append(x)
+            time.sleep(0.1)
+            return x * 2
+
+        results, errors = self._run_threads(lambda: slow(21))
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_exception_propagates_to_waiters(self):
+        """Test every waiter sees the leader's exception."""
+        calls = []
+
+        @self.cache.cached(ttl_seconds=60)
+        def failing():
+            calls.append(1)
+            time.sleep(0.1)
+            raise RuntimeError("boom")
+
+        results, errors = self._run_threads(failing)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 8)
+        self.assertTrue(all(isinstance(e, RuntimeError) for e in errors))
+        self.assertEqual(len(calls), 1)
+
+    def test_wait_timeout(self):
+        """Test waiters give up after the configured timeout."""
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def leader():
+            started.set()
+            time.sleep(0.3)
+            return "done"
+
+        thread = threading.Thread(target=lambda: flight.do("key", leader))
+        thread.start()
+        started.wait()
+        with self.assertRaises(TimeoutError):
+            flight.do("key", lambda: "other", timeout=0.05)
+        thread.join()
+
+    def test_async_concurrent_misses_compute_once(self):
+        """Test coroutine functions are coalesced on the event loop."""
+        calls = []
+
+        @self.cache.cached(ttl_seconds=60)
+        async def slow(x):
+            calls.append(x)
+            await asyncio.sleep(0.05)
+            return x + 1
+
+        async def main():
+            return await asyncio.gather(*(slow(1) for _ in range(10)))
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(loop.run_until_complete(main()), [2] * 10)
+        finally:
+            loop.close()
+        self.assertEqual(len(calls), 1)
+
+
+class SlowLevel(L2RedisLikeCache):
+    """Cache level with blocking I/O latency, standing in for a busy disk."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    def get(self, key):
+        time.sleep(self.delay)
+        return super().get(key)
+
+
+class TestAsyncContextCache(unittest.TestCase):
+    """Tests for the asyncio ContextCache API."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ContextCache(l3_dir=self.temp_dir)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_aset_aget_adelete(self):
+        """Test the async API round-trips through every level."""
+        async def main():
+            await self.cache.aset("key", {"v": 1})
+            self.cache.l1.clear()
+            self.cache.l2.clear()
+            value = await self.cache.aget("key")
+            many = await self.cache.aget_many(["key", "missing"])
+            await self.cache.adelete("key")
+            return value, many, await self.cache.aget("key")
+
+        value, many, after = self.loop.run_until_complete(main())
+        self.assertEqual(value, {"v": 1})
+        self.assertEqual(many, {"key": {"v": 1}})
+        self.assertIsNone(after)
+
+    def test_event_loop_lag_stays_flat(self):
+        """Test slow lower-level lookups do not block the event loop."""
+        self.cache.l3 = SlowLevel(delay=0.05)
+        for i in range(8):
+            self.cache.set(f"hot{i}", i, levels=["l1"])
+            self.cache.l3.set(f"cold{i}", CacheEntry(key=f"cold{i}", value=i))
+
+        async def ticker(stop, lags):
+            while not stop.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - started - 0.005)
+
+        async def main():
+            stop, lags = asyncio.Event(), []
+            tick = asyncio.ensure_future(ticker(stop, lags))
+            await asyncio.sleep(0.01)
+            reads = [self.cache.aget(f"cold{i}") for i in range(8)]
+            reads += [self.cache.aget(f"hot{i}") for i in range(8)]
+            values = await asyncio.gather(*reads)
+            stop.set()
+            await tick
+            return values, lags
+
+        values, lags = self.loop.run_until_complete(main())
+        self.assertEqual(values, list(range(8)) * 2)
+        self.assertLess(max(lags), 0.04)
+
+
+def run_tests():
+    """Run all cache tests."""
+    print("="*60)
+    print("            CONTEXT CACHE UNIT TESTS")
+    print("="*60)
+    print()
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    # Add test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestEvictionPolicies))
+    suite.addTests(loader.loadTestsFromTestCase(TestSizingAndCompactEntries))
+    suite.addTests(loader.loadTestsFromTestCase(TestShardedL1Cache))
+    suite.addTests(loader.loadTestsFromTestCase(TestSegmentStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestL3SegmentCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestAccessJournal))
+    suite.addTests(loader.loadTestsFromTestCase(TestL3Capacity))
+    suite.addTests(loader.loadTestsFromTestCase(TestCodecs))
+    suite.addTests(loader.loadTestsFromTestCase(TestL2Persistence))
+    suite.addTests(loader.loadTestsFromTestCase(TestCacheDaemon))
+    suite.addTests(loader.loadTestsFromTestCase(TestExpirySweeper))
+    suite.addTests(loader.loadTestsFromTestCase(TestBulkOperations))
+    suite.addTests(loader.loadTestsFromTestCase(TestInvalidation))
+    suite.addTests(loader.loadTestsFromTestCase(TestCacheMetrics))
+    suite.addTests(loader.loadTestsFromTestCase(TestHotSetPrewarm))
+    suite.addTests(loader.loadTestsFromTestCase(TestNegativeCaching))
+    suite.addTests(loader.loadTestsFromTestCase(TestStaleWhileRevalidate))
+    suite.addTests(loader.loadTestsFromTestCase(TestSingleFlight))
+    suite.addTests(loader.loadTestsFromTestCase(TestAsyncContextCache))
+
+    # Run with verbosity
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print()
+    print("="*60)
+    print("                    SUMMARY")
+    print("="*60)
+    print(f"  Tests Run: {result.testsRun}")
+    print(f"  Failures: {len(result.failures)}")
+    print(f"  Errors: {len(result.errors)}")
+
+    return len(result.failures) == 0 and len(result.errors) == 0
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,751 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the NEMESIS long-term memory store.
+Tests schema migrations, search, tag filters, connections, bulk writes,
+access counting, maintenance and semantic recall.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.ltm import AccessLevel, LongTermMemory, MemoryType, fts_query, search_text
+from memory.maintenance import MaintenanceScheduler
+from memory.vector_index import NUMPY_AVAILABLE, HashingEmbedder, VectorIndex
+
+
+class LTMTestCase(unittest.TestCase):
+    """Gives each test its own database file and closes what it opens."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "memory.db")
+        self._opened = []
+
+    def tearDown(self):
+        for memory in self._opened:
+            memory.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def open(self, db_path=None, **kwargs):
+        memory = LongTermMemory(db_path or self.db_path, **kwargs)
+        self._opened.append(memory)
+        return memory
+
+    def contents(self, entries):
+        return [entry.content for entry in entries]
+
+
+class TestFullTextSearch(LTMTestCase):
+    """Test FTS5 indexing and BM25-ranked search."""
+
+    def setUp(self):
+        super().setUp()
+        self.memory = self.open()
+
+    def test_query_translation(self):
+        """Test terms are quoted, ANDed, and keep phrases and prefixes."""
+        self.assertEqual(fts_query("quick fox"), '"quick" AND "fox"')
+        self.assertEqual(fts_query('"brown fox" jump*'), '"brown fox" AND "jump"*')
+        self.assertEqual(fts_query('AND OR( x"y'), '"AND" AND "OR(" AND "x""y"')
+        self.assertEqual(fts_query('* ""'), "")
+
+    def test_search_text_uses_string_leaves(self):
+        """Test JSON keys are not indexed."""
+        text = search_text({"title": "alpha", "body": ["beta", {"n": 3}]})
+        self.assertEqual(text, "alpha beta 3")
+
+    def test_ranks_by_relevance(self):
+        """Test more relevant matches come first at equal importance."""
+        self.memory.store("the fox", MemoryType.FACT)
+        self.memory.store("fox fox fox hunt", MemoryType.FACT)
+        self.memory.store("lazy dog", MemoryType.FACT)
+
+        self.assertEqual(self.contents(self.memory.search("fox")), ["fox fox fox hunt", "the fox"])
+
+    def test_importance_and_recency_weight_ranking(self):
+        """Test importance lifts, and age lowers, an equally relevant match."""
+        self.memory.store("report deadline", MemoryType.FACT, importance=0.1)
+        important = self.memory.store("deadline report", MemoryType.FACT, importance=0.9)
+        self.assertEqual(self.memory.search("deadline")[0].id, important.id)
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE memories SET updated_at = ? WHERE id = ?",
+                         (time.time() - 365 * 86400, important.id))
+        self.assertNotEqual(self.memory.search("deadline")[0].id, important.id)
+
+    def test_phrase_and_prefix(self):
+        """Test phrase queries match word order and prefixes match stems."""
+        self.memory.store({"text": "the quick brown fox"}, MemoryType.FACT)
+        self.memory.store("brown and quick, a fox migrated", MemoryType.FACT)
+
+        self.assertEqual(self.contents(self.memory.search('"quick brown"')),
+                         [{"text": "the quick brown fox"}])
+        self.assertEqual(self.contents(self.memory.search("migr*")),
+                         ["brown and quick, a fox migrated"])
+        self.assertEqual(len(self.memory.search("quick fox")), 2)
+
+    def test_index_follows_update_and_delete(self):
+        """Test the index tracks content changes and removals."""
+        entry = self.memory.store("lazy dog", MemoryType.FACT)
+
+        self.memory.update(entry.id, content="lazy cat")
+        self.assertEqual(self.contents(self.memory.search("cat")), ["lazy cat"])
+        self.assertEqual(self.memory.search("dog"), [])
+
+        self.memory.delete(entry.id)
+        self.assertEqual(self.memory.search("lazy"), [])
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM memories_fts").fetchone()[0], 0)
+
+    def test_expired_memories_leave_index(self):
+        """Test expiry cleanup removes index rows through the trigger."""
+        self.memory.store("short lived", MemoryType.FACT, ttl_hours=1e-9)
+        time.sleep(0.01)
+        self.memory._cleanup_expired()
+
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM memories_fts").fetchone()[0], 0)
+
+    def test_filters_apply_to_matches(self):
+        """Test type, owner and privacy filters still apply."""
+        self.memory.store("shared plan", MemoryType.FACT, owner_agent="a")
+        self.memory.store("secret plan", MemoryType.FACT, owner_agent="a",
+                          access_level=AccessLevel.PRIVATE)
+        self.memory.store("plan step", MemoryType.DECISION, owner_agent="b")
+
+        self.assertEqual(len(self.memory.search("plan", requester_agent="b")), 2)
+        self.assertEqual(len(self.memory.search("plan", requester_agent="a")), 3)
+        decisions = self.memory.search("plan", memory_type=MemoryType.DECISION)
+        self.assertEqual(self.contents(decisions), ["plan step"])
+
+    def test_encrypted_memories_not_indexed_by_default(self):
+        """Test encrypted content stays out of the index unless opted in."""
+        self.memory.store("classified launch", MemoryType.FACT, access_level=AccessLevel.ENCRYPTED)
+        self.assertEqual(self.memory.search("launch"), [])
+
+        indexed = self.open(os.path.join(self.tmpdir, "indexed.db"), index_encrypted=True)
+        indexed.store("classified launch", MemoryType.FACT, access_level=AccessLevel.ENCRYPTED)
+        self.assertEqual(self.contents(indexed.search("launch")), ["classified launch"])
+
+    def test_like_fallback(self):
+        """Test full_text=False keeps the substring search."""
+        memory = self.open(full_text=False)
+        memory.store("substring", MemoryType.FACT)
+
+        self.assertFalse(memory.get_stats()["full_text"])
+        self.assertEqual(self.contents(memory.search("bstr")), ["substring"])
+
+    def test_runs_without_fts5(self):
+        """Test a failed FTS migration leaves the other migrations and LIKE search working."""
+        class NoFTSMemory(LongTermMemory):
+            def _migrate_fts_index(self, conn):
+                raise sqlite3.OperationalError("no such module: fts5")
+
+        memory = NoFTSMemory(os.path.join(self.tmpdir, "nofts.db"))
+        self._opened.append(memory)
+        memory.store("deploy the service", MemoryType.FACT, tags=["ops"])
+        memory.store("write the report", MemoryType.FACT, tags=["docs"])
+
+        self.assertFalse(memory.get_stats()["full_text"])
+        self.assertEqual(self.contents(memory.search("deploy")), ["deploy the service"])
+        self.assertEqual(self.contents(memory.search(tags=["docs"])), ["write the report"])
+        with memory._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0],
+                             len(LongTermMemory.MIGRATIONS))
+
+    def test_migrates_existing_database(self):
+        """Test a database created before the index is backfilled on open."""
+        legacy_path = os.path.join(self.tmpdir, "legacy.db")
+        legacy = self.open(legacy_path, full_text=False)
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("DROP TRIGGER memories_fts_delete")
+            conn.execute("DROP TABLE memories_fts")
+            conn.execute("PRAGMA user_version = 1")
+        legacy.store("written before migration", MemoryType.FACT)
+
+        migrated = self.open(legacy_path)
+        self.assertTrue(migrated.get_stats()["full_text"])
+        self.assertEqual(self.contents(migrated.search("migration")), ["written before migration"])
+        with sqlite3.connect(legacy_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0],
+                             len(LongTermMemory.MIGRATIONS))
+
+
+class TestTagFilters(LTMTestCase):
+    """Test tag filters run in SQL against memory_tags."""
+
+    def setUp(self):
+        super().setUp()
+        self.memory = self.open()
+        self.both = self.memory.store("both", MemoryType.FACT, tags=["red", "blue"])
+        self.red = self.memory.store("red only", MemoryType.FACT, tags=["red"])
+        self.memory.store("green", MemoryType.FACT, tags=["green"])
+
+    def test_any_and_all(self):
+        """Test ANY matches either tag, ALL requires every tag."""
+        self.assertEqual(sorted(self.contents(self.memory.search(tags=["red", "blue"]))),
+                         ["both", "red only"])
+        self.assertEqual(self.contents(self.memory.search(tags=["red", "blue"],
+                                                          match_all_tags=True)), ["both"])
+        self.assertEqual(sorted(self.contents(self.memory.search(tags=["red", "red"],
+                                                                 match_all_tags=True))),
+                         ["both", "red only"])
+
+    def test_filter_applies_before_limit(self):
+        """Test matches beyond the first LIMIT rows are still returned."""
+        for i in range(20):
+            self.memory.store(f"noise {i}", MemoryType.FACT, tags=["noise"], importance=0.9)
+
+        self.assertEqual(len(self.memory.search(tags=["red"], limit=2)), 2)
+
+    def test_combines_with_query(self):
+        """Test tag filters apply to full-text matches."""
+        self.memory.store("red only", MemoryType.FACT, tags=["green"])
+
+        self.assertEqual([e.id for e in self.memory.search("only", tags=["red"])], [self.red.id])
+
+    def test_tags_follow_update_and_delete(self):
+        """Test tag rows track updates and removals."""
+        self.memory.update(self.red.id, tags=["green"])
+        self.assertEqual(self.contents(self.memory.search(tags=["red"])), ["both"])
+
+        self.memory.delete(self.both.id)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute(
+                "SELECT COUNT(*) FROM memory_tags WHERE memory_id = ?", (self.both.id,)
+            ).fetchone()[0], 0)
+
+    def test_migrates_existing_tags(self):
+        """Test tags stored before the table existed are backfilled."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DROP TRIGGER memory_tags_delete")
+            conn.execute("DROP TABLE memory_tags")
+            conn.execute("PRAGMA user_version = 2")
+
+        migrated = self.open()
+        self.assertEqual(self.contents(migrated.search(tags=["blue"])), ["both"])
+
+
+class TestConnections(LTMTestCase):
+    """Test persistent per-thread connections."""
+
+    def test_reuses_connection_per_thread(self):
+        """Test calls on one thread share a connection and threads get their own."""
+        memory = self.open()
+        entry = memory.store("reused", MemoryType.FACT)
+        for _ in range(5):
+            memory.retrieve(entry.id)
+        self.assertEqual(memory.get_stats()["connections"]["opened"], 1)
+
+        seen = []
+        worker = threading.Thread(target=lambda: seen.append(memory.retrieve(entry.id)))
+        worker.start()
+        worker.join()
+        self.assertEqual(seen[0].content, "reused")
+        self.assertEqual(memory.get_stats()["connections"]["opened"], 2)
+
+    def test_applies_pragmas(self):
+        """Test connections are configured with WAL, mmap and cache size."""
+        memory = self.open(mmap_size_mb=8, cache_size_mb=4)
+        with memory._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA mmap_size").fetchone()[0], 8 * 1024 * 1024)
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -4 * 1024)
+
+    def test_in_memory_database_shared_across_threads(self):
+        """Test ":memory:" keeps one database across calls and threads."""
+        memory = self.open(":memory:")
+        entry = memory.store("in memory", MemoryType.FACT, tags=["demo"])
+        self.assertEqual(memory.retrieve(entry.id).content, "in memory")
+
+        seen = []
+        worker = threading.Thread(target=lambda: seen.extend(memory.search(tags=["demo"])))
+        worker.start()
+        worker.join()
+        self.assertEqual(self.contents(seen), ["in memory"])
+
+        other = self.open(":memory:")
+        self.assertEqual(other.get_stats()["total_memories"], 0)
+
+    def test_uncommitted_work_rolled_back(self):
+        """Test a failed call does not leave a transaction open."""
+        memory = self.open()
+        with self.assertRaises(RuntimeError):
+            with memory._get_connection() as conn:
+                conn.execute("DELETE FROM memories")
+                raise RuntimeError("boom")
+        with memory._get_connection() as conn:
+            self.assertFalse(conn.in_transaction)
+
+    def test_close_and_reopen(self):
+        """Test close() drops connections and the next call reopens one."""
+        memory = self.open()
+        entry = memory.store("persisted", MemoryType.FACT)
+        memory.close()
+        self.assertEqual(memory.get_stats()["connections"]["open"], 1)
+        self.assertEqual(memory.retrieve(entry.id).content, "persisted")
+
+
+class TestBulkWrites(LTMTestCase):
+    """Test store_many and update_many."""
+
+    def setUp(self):
+        super().setUp()
+        self.memory = self.open()
+
+    def items(self, count):
+        return [{"content": f"fact number {i}", "memory_type": MemoryType.FACT,
+                 "tags": [f"t{i % 3}"], "importance": i / count} for i in range(count)]
+
+    def test_store_many(self):
+        """Test a batch is stored, indexed and tagged like single stores."""
+        entries = self.memory.store_many(self.items(30))
+
+        self.assertEqual(len(entries), 30)
+        self.assertEqual(self.memory.get_stats()["total_memories"], 30)
+        self.assertEqual(self.memory.retrieve(entries[7].id).content, "fact number 7")
+        self.assertEqual(len(self.memory.search("number", limit=100)), 30)
+        self.assertEqual(len(self.memory.search(tags=["t1"], limit=100)), 10)
+        self.assertEqual(self.memory.store_many([]), [])
+
+    def test_store_many_on_thread_pool(self):
+        """Test pooled preparation keeps every entry, in order."""
+        entries = self.memory.store_many(self.items(50), workers=3, chunk_size=7)
+
+        self.assertEqual([e.content for e in entries], [f"fact number {i}" for i in range(50)])
+        self.assertEqual(self.memory.get_stats()["total_memories"], 50)
+
+    def test_store_many_is_atomic(self):
+        """Test a bad item stores nothing."""
+        items = self.items(3) + [{"content": "no type"}]
+        with self.assertRaises(TypeError):
+            self.memory.store_many(items)
+        self.assertEqual(self.memory.get_stats()["total_memories"], 0)
+
+    def test_update_many(self):
+        """Test updates apply together and count only existing memories."""
+        first, second = self.memory.store_many(self.items(2))
+
+        updated = self.memory.update_many([
+            {"memory_id": first.id, "content": "rewritten fact"},
+            {"memory_id": first.id, "importance": 0.9},
+            {"memory_id": second.id, "tags": ["fresh"]},
+            {"memory_id": "mem_missing"}
+        ])
+
+        self.assertEqual(updated, 3)
+        entry = self.memory.retrieve(first.id)
+        self.assertEqual((entry.content, entry.importance), ("rewritten fact", 0.9))
+        self.assertEqual(self.contents(self.memory.search("rewritten")), ["rewritten fact"])
+        self.assertEqual([e.id for e in self.memory.search(tags=["fresh"])], [second.id])
+        self.assertEqual(self.memory.search(tags=["t1"]), [])
+
+    def test_update_keeps_single_call_behaviour(self):
+        """Test update() still reports whether the memory existed."""
+        entry = self.memory.store("short", MemoryType.FACT, ttl_hours=1)
+
+        self.assertTrue(self.memory.update(entry.id, extend_ttl_hours=1))
+        self.assertAlmostEqual(self.memory.retrieve(entry.id).expires_at,
+                               entry.expires_at + 3600, places=3)
+        self.assertFalse(self.memory.update("mem_missing", importance=1.0))
+
+
+class TestAccessCounts(LTMTestCase):
+    """Test buffered access counting."""
+
+    def stored_count(self, memory_id):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT access_count FROM memories WHERE id = ?",
+                                (memory_id,)).fetchone()[0]
+
+    def test_retrieve_does_not_write(self):
+        """Test reads are buffered and reported until flushed."""
+        memory = self.open(access_flush_interval_seconds=0)
+        entry = memory.store("read often", MemoryType.FACT)
+        with memory._get_connection() as conn:
+            changes = conn.total_changes
+
+        self.assertEqual([memory.retrieve(entry.id).access_count for _ in range(3)], [1, 2, 3])
+        self.assertEqual(memory.search("often")[0].access_count, 3)
+        with memory._get_connection() as conn:
+            self.assertEqual(conn.total_changes, changes)
+        self.assertEqual(self.stored_count(entry.id), 0)
+
+        self.assertEqual(memory.flush_access_counts(), 1)
+        self.assertEqual(self.stored_count(entry.id), 3)
+        self.assertEqual(memory.retrieve(entry.id).access_count, 4)
+
+    def test_counts_in_flight_stay_visible(self):
+        """Test counts swapped out by a flush are still reported until it commits."""
+        memory = self.open(access_flush_interval_seconds=0)
+        entry = memory.store("read often", MemoryType.FACT)
+        for _ in range(3):
+            memory.retrieve(entry.id)
+
+        # Holding the write lock parks the flush between its swap and its commit
+        with memory._lock:
+            flush = threading.Thread(target=memory.flush_access_counts)
+            flush.start()
+            while not memory._flushing_access:
+                time.sleep(0.001)
+            self.assertEqual(memory.search("often")[0].access_count, 3)
+            self.assertEqual(memory.retrieve(entry.id).access_count, 4)
+            self.assertEqual(memory.get_stats()["pending_access"], 1)
+        flush.join()
+
+        self.assertEqual(self.stored_count(entry.id), 3)
+        self.assertEqual(memory.search("often")[0].access_count, 4)
+
+    def test_consolidate_and_close_flush(self):
+        """Test consolidate() and close() write pending counts first."""
+        memory = self.open(access_flush_interval_seconds=0)
+        entry = memory.store("popular", MemoryType.FACT)
+        for _ in range(3):
+            memory.retrieve(entry.id)
+
+        memory.consolidate(min_age_hours=0, min_access_count=3)
+        self.assertEqual(self.stored_count(entry.id), 3)
+        self.assertAlmostEqual(memory.retrieve(entry.id).importance, 0.6)
+
+        memory.close()
+        self.assertEqual(self.stored_count(entry.id), 4)
+
+    def test_background_flush(self):
+        """Test the flusher thread writes counts on its interval."""
+        memory = self.open(access_flush_interval_seconds=0.05)
+        entry = memory.store("background", MemoryType.FACT)
+        memory.retrieve(entry.id)
+
+        deadline = time.time() + 2
+        while self.stored_count(entry.id) == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.stored_count(entry.id), 1)
+        self.assertEqual(memory.get_stats()["pending_access"], 0)
+
+    def test_expired_memory_not_returned(self):
+        """Test an expired read returns nothing and leaves deletion to cleanup."""
+        memory = self.open(access_flush_interval_seconds=0)
+        entry = memory.store("gone", MemoryType.FACT, ttl_hours=1e-9)
+        time.sleep(0.01)
+
+        self.assertIsNone(memory.retrieve(entry.id))
+        self.assertEqual(memory.get_stats()["total_memories"], 1)
+
+
+class TestMaintenance(LTMTestCase):
+    """Test the maintenance scheduler and jobs."""
+
+    def test_scheduler_runs_jobs_on_interval(self):
+        """Test due jobs run in the background and their timings are kept."""
+        scheduler = MaintenanceScheduler()
+        ran = threading.Event()
+        scheduler.add("tick", lambda: ran.set() or 7, 0.05)
+        scheduler.add("manual", lambda: 1 / 0, 0)
+        scheduler.start()
+        try:
+            self.assertTrue(ran.wait(2))
+            self.assertEqual(scheduler.run_now(["manual"]), {"manual": None})
+        finally:
+            scheduler.close()
+
+        stats = scheduler.stats()
+        self.assertGreaterEqual(stats["tick"]["runs"], 1)
+        self.assertEqual(stats["tick"]["last_result"], 7)
+        self.assertEqual((stats["manual"]["runs"], stats["manual"]["errors"]), (1, 1))
+        self.assertIn("division", stats["manual"]["last_error"])
+
+    def test_request_path_leaves_expiry_to_maintenance(self):
+        """Test expired rows are hidden from reads but only removed by the expire job."""
+        memory = self.open(maintenance=False, expire_batch_size=10)
+        memory.store_many([{"content": f"stale {i}", "memory_type": MemoryType.FACT,
+                            "ttl_hours": 1e-9} for i in range(25)])
+        time.sleep(0.01)
+        memory.store("fresh", MemoryType.FACT)
+
+        self.assertEqual(self.contents(memory.search()), ["fresh"])
+        self.assertEqual(memory.get_stats()["total_memories"], 26)
+
+        self.assertEqual(memory.run_maintenance(["expire"]), {"expire": 25})
+        self.assertEqual(memory.get_stats()["total_memories"], 1)
+
+    def test_all_jobs_report_timings(self):
+        """Test every job runs and reports through get_stats()."""
+        memory = self.open(maintenance=False)
+        memory.store("kept", MemoryType.FACT)
+
+        results = memory.run_maintenance()
+        self.assertEqual(set(results),
+                         {"flush_access", "expire", "consolidate", "optimize", "checkpoint", "vacuum",
+                          "train_vectors"})
+        self.assertEqual(results["checkpoint"]["busy"], 0)
+        for job, timing in memory.get_stats()["maintenance"].items():
+            self.assertEqual((timing["runs"], timing["errors"]), (1, 0), job)
+            self.assertGreater(timing["last_ms"], 0)
+
+    def test_incremental_vacuum_frees_pages(self):
+        """Test the vacuum job returns pages left free by deletes."""
+        memory = self.open(maintenance=False, vacuum_pages=100000)
+        with memory._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        entries = memory.store_many([{"content": "x" * 2000, "memory_type": MemoryType.FACT}
+                                     for _ in range(200)])
+        for entry in entries:
+            memory.delete(entry.id)
+
+        self.assertGreater(memory.run_maintenance(["vacuum"])["vacuum"], 0)
+        with memory._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA freelist_count").fetchone()[0], 0)
+
+    def test_existing_database_converted_only_on_request(self):
+        """Test the vacuum job skips a database without incremental auto-vacuum until it is converted."""
+        self.open(maintenance=False).close()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA auto_vacuum = NONE")
+            conn.execute("VACUUM")
+
+        memory = self.open(maintenance=False)
+        entry = memory.store(content="kept across the conversion", memory_type=MemoryType.FACT)
+        self.assertEqual(memory.run_maintenance(["vacuum"])["vacuum"], 0)
+        with memory._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 0)
+
+        self.assertTrue(memory.enable_incremental_vacuum())
+        self.assertFalse(memory.enable_incremental_vacuum())
+        with memory._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self.assertEqual(memory.retrieve(entry.id).content, "kept across the conversion")
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestVectorIndex(unittest.TestCase):
+    """Test the hashing embedder and the IVF index."""
+
+    def setUp(self):
+        self.embedder = HashingEmbedder(dim=128)
+
+    def test_embedding_is_stable_and_normalized(self):
+        """Test equal text embeds equally, to unit length, and shares n-grams."""
+        import numpy as np
+        first = self.embedder.embed("Deploy the service")
+        self.assertTrue(np.allclose(first, self.embedder.embed("deploy THE service")))
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+        self.assertGreater(float(self.embedder.embed("deployment") @ self.embedder.embed("deploy")),
+                           float(self.embedder.embed("deployment") @ self.embedder.embed("cat")))
+        self.assertEqual(float(np.linalg.norm(self.embedder.embed("!!"))), 0.0)
+
+    def test_exact_then_trained_search(self):
+        """Test search finds a stored vector before and after training."""
+        index = VectorIndex(dim=128, nprobe=4, train_threshold=200)
+        texts = [f"record {i} topic{i % 25} detail{i % 7}" for i in range(400)]
+        index.add_many([f"m{i}" for i in range(100)],
+                       [self.embedder.embed(t) for t in texts[:100]])
+        self.assertEqual(index.stats()["lists"], 0)
+        self.assertEqual(index.search(self.embedder.embed(texts[42]), 1)[0][0], "m42")
+        self.assertFalse(index.needs_training)
+
+        index.add_many([f"m{i}" for i in range(100, 400)],
+                       [self.embedder.embed(t) for t in texts[100:]])
+        self.assertEqual(index.stats()["lists"], 0)
+        self.assertTrue(index.needs_training)
+        self.assertEqual(index.train(), 20)
+        self.assertFalse(index.needs_training)
+        self.assertEqual(index.search(self.embedder.embed(texts[321]), 1)[0][0], "m321")
+
+    def test_writes_during_training_are_reassigned(self):
+        """Test slots added or removed while train() runs end up in the right lists."""
+        index = VectorIndex(dim=128, nprobe=1, train_threshold=100)
+        texts = [f"record {i} topic{i % 25} detail{i % 7}" for i in range(300)]
+        index.add_many([f"m{i}" for i in range(200)], [self.embedder.embed(t) for t in texts[:200]])
+
+        nearest = index._nearest_list
+        def write_then_assign(vectors, centroids=None):
+            if centroids is not None and index._changed is not None and not index._changed:
+                index.add_many([f"m{i}" for i in range(200, 300)],
+                               [self.embedder.embed(t) for t in texts[200:]])
+                index.remove_many(["m0"])
+            return nearest(vectors, centroids)
+        index._nearest_list = write_then_assign
+
+        self.assertEqual(index.train(), 14)
+        self.assertEqual(len(index), 299)
+        self.assertEqual(index.search(self.embedder.embed(texts[250]), 1)[0][0], "m250")
+        self.assertNotIn("m0", [memory_id for memory_id, _ in
+                                index.search(self.embedder.embed(texts[0]), 10)])
+
+    def test_remove_and_reuse_slots(self):
+        """Test removed ids are not returned and their slots are reused."""
+        index = VectorIndex(dim=128)
+        index.add_many(["a", "b"], [self.embedder.embed("alpha"), self.embedder.embed("beta")])
+        index.remove_many(["a"])
+        self.assertEqual([memory_id for memory_id, _ in index.search(self.embedder.embed("alpha"), 5)],
+                         ["b"])
+
+        index.add_many(["c"], [self.embedder.embed("gamma")])
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.ids(), {"b", "c"})
+
+    def test_save_and_load(self):
+        """Test a saved index loads with the same contents."""
+        path = os.path.join(tempfile.mkdtemp(), "index.npz")
+        try:
+            index = VectorIndex(dim=128)
+            index.add_many(["a", "b"], [self.embedder.embed("alpha"), self.embedder.embed("beta")])
+            self.assertTrue(index.save(path))
+
+            loaded = VectorIndex(dim=128)
+            self.assertTrue(loaded.load(path))
+            self.assertEqual(loaded.search(self.embedder.embed("beta"), 1)[0][0], "b")
+            self.assertFalse(VectorIndex(dim=64).load(path))
+        finally:
+            shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+class TestSemanticSearch(LTMTestCase):
+    """Test search_semantic on LongTermMemory."""
+
+    def setUp(self):
+        super().setUp()
+        self.memory = self.open()
+        self.memory.store("The deployment pipeline failed on the staging cluster",
+                          MemoryType.FACT, owner_agent="ops")
+        self.memory.store("User prefers concise answers in French", MemoryType.PREFERENCE)
+        self.memory.store("Decided to roll back the staging deploy", MemoryType.DECISION,
+                          owner_agent="ops", importance=0.9)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_recalls_related_phrasing(self):
+        """Test memories sharing no exact phrase are still recalled."""
+        results = self.memory.search_semantic("staging deployments", k=2)
+        self.assertEqual(len(results), 2)
+        self.assertNotIn("French", " ".join(str(e.content) for e in results))
+        self.assertEqual(self.memory.search("staging deployments"), [])
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_filters_apply(self):
+        """Test type, importance and privacy filters narrow the candidates."""
+        decisions = self.memory.search_semantic("staging", k=5, memory_type=MemoryType.DECISION)
+        self.assertEqual(self.contents(decisions), ["Decided to roll back the staging deploy"])
+        self.assertEqual(len(self.memory.search_semantic("staging", k=5, min_importance=0.8)), 1)
+
+        self.memory.store("private staging credentials rotated", MemoryType.FACT,
+                          owner_agent="ops", access_level=AccessLevel.PRIVATE)
+        self.assertEqual(len(self.memory.search_semantic("staging", k=5, requester_agent="ops")), 3)
+        self.assertEqual(len(self.memory.search_semantic("staging", k=5, requester_agent="other")), 2)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_index_tracks_updates_and_deletes(self):
+        """Test the index follows content updates and deletions."""
+        entry = self.memory.store("kubernetes node drained", MemoryType.FACT)
+        self.assertEqual(self.memory.search_semantic("kubernetes nodes", k=1, min_score=0.3)[0].id,
+                         entry.id)
+
+        self.memory.update(entry.id, content="espresso machine descaled")
+        self.assertEqual(self.memory.search_semantic("kubernetes nodes", k=1, min_score=0.3), [])
+        self.assertEqual(self.memory.search_semantic("espresso", k=1)[0].id, entry.id)
+
+        self.memory.delete(entry.id)
+        self.assertNotIn(entry.id, [e.id for e in self.memory.search_semantic("espresso", k=5)])
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_index_persists_and_reconciles(self):
+        """Test the saved index reloads and picks up rows written without it."""
+        self.memory.search_semantic("staging", k=1)
+        self.memory.close()
+        self.assertTrue(os.path.exists(f"{self.db_path}.vectors.npz"))
+
+        plain = self.open(semantic=False)
+        plain.store("espresso machine descaled", MemoryType.FACT)
+        plain.close()
+
+        reopened = self.open()
+        self.assertFalse(reopened.get_stats()["vector_index"]["loaded"])
+        self.assertEqual(self.contents(reopened.search_semantic("espresso", k=1)),
+                         ["espresso machine descaled"])
+        self.assertEqual(reopened.get_stats()["vector_index"]["vectors"], 4)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_index_loads_lazily(self):
+        """Test writes before the first semantic search are picked up when the index loads."""
+        self.memory.search_semantic("staging", k=1)
+        self.memory.close()
+        reopened = self.open()
+        entry = reopened.store("espresso machine descaled", MemoryType.FACT)
+        reopened.delete(reopened.search("deployment pipeline")[0].id)
+        self.assertEqual(reopened.get_stats()["vector_index"]["vectors"], 0)
+
+        self.assertEqual(reopened.search_semantic("espresso", k=1)[0].id, entry.id)
+        self.assertEqual(reopened.get_stats()["vector_index"]["vectors"], 3)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_training_runs_as_maintenance(self):
+        """Test crossing the training threshold leaves the retrain to the train_vectors job."""
+        memory = self.open(os.path.join(self.tmpdir, "train.db"), maintenance=False)
+        memory._vectors.train_threshold = 50
+        memory.search_semantic("warm up", k=1)
+        memory.store_many([{"content": f"note {i} about topic{i % 9}", "memory_type": MemoryType.FACT}
+                           for i in range(64)])
+        self.assertTrue(memory.get_stats()["vector_index"]["needs_training"])
+
+        self.assertEqual(memory.run_maintenance(["train_vectors"]), {"train_vectors": 8})
+        self.assertEqual(memory.get_stats()["vector_index"]["lists"], 8)
+        self.assertEqual(memory.run_maintenance(["train_vectors"]), {"train_vectors": 0})
+
+    def test_falls_back_without_index(self):
+        """Test semantic search degrades to full-text search when disabled."""
+        memory = self.open(os.path.join(self.tmpdir, "plain.db"), semantic=False)
+        memory.store("staging cluster healthy", MemoryType.FACT)
+
+        self.assertIsNone(memory.get_stats()["vector_index"])
+        self.assertEqual(self.contents(memory.search_semantic("staging", k=3)),
+                         ["staging cluster healthy"])
+
+
+def run_tests():
+    """Run all LTM tests."""
+    print("="*60)
+    print("       NEMESIS LONG-TERM MEMORY - UNIT TESTS")
+    print("="*60)
+    print()
+
+    # Create test suite
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    # Add test cases
+    suite.addTests(loader.loadTestsFromTestCase(TestFullTextSearch))
+    suite.addTests(loader.loadTestsFromTestCase(TestTagFilters))
+    suite.addTests(loader.loadTestsFromTestCase(TestConnections))
+    suite.addTests(loader.loadTestsFromTestCase(TestBulkWrites))
+    suite.addTests(loader.loadTestsFromTestCase(TestAccessCounts))
+    suite.addTests(loader.loadTestsFromTestCase(TestMaintenance))
+    suite.addTests(loader.loadTestsFromTestCase(TestVectorIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestSemanticSearch))
+
+    # Run with verbosity
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print()
+    print("="*60)
+    print("                    SUMMARY")
+    print("="*60)
+    print(f"  Tests Run: {result.testsRun}")
+    print(f"  Failures: {len(result.failures)}")
+    print(f"  Errors: {len(result.errors)}")
+
+    return len(result.failures) == 0 and len(result.errors) == 0
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)